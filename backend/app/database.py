@@ -1,25 +1,2 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-# ✅ Use SQLite database in local file (change to PostgreSQL in prod)
-SQLALCHEMY_DATABASE_URL = "sqlite:///./vrjob.db"
-
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-# ✅ Base for all models to inherit from
-Base = declarative_base()
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Kept for older imports; the engine, sessions and Base live in app/db/database.py
+from .db.database import Base, SessionLocal, engine, get_db  # noqa: F401
@@ -1,22 +1,23 @@
-from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
+from typing import AsyncIterator
 import os
 from dotenv import load_dotenv
+from .engine import make_engine
 
 load_dotenv()
 
 # Choose from environment or default to SQLite
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./vrjob.db")
+# Optional read replica for stats and GET endpoints
+REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
 
-print(f"Using DATABASE_URL: {DATABASE_URL}")
-
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {},
-)
+engine = make_engine(DATABASE_URL)
+read_engine = make_engine(REPLICA_URL) if REPLICA_URL else engine
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 Base = declarative_base()
 
 def get_db():
@@ -25,3 +26,69 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    """Session on the read replica, or the primary when none is configured"""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def async_database_url(url: str) -> str:
+    """The async-driver form of a sync URL: aiosqlite for SQLite, asyncpg for Postgres"""
+    scheme, sep, rest = url.partition("://")
+    driver = scheme.split("+")[0]
+    if driver == "sqlite":
+        return f"sqlite+aiosqlite{sep}{rest}"
+    if driver in ("postgresql", "postgres"):
+        return f"postgresql+asyncpg{sep}{rest}"
+    return url
+
+
+# Async engines are created on first use, so scripts on the sync path
+# do not need aiosqlite/asyncpg installed. role -> (engine, session factory)
+_async = {}
+
+
+def _async_pair(role: str):
+    if role == "replica" and not REPLICA_URL:
+        role = "primary"
+    if role not in _async:
+        url = REPLICA_URL if role == "replica" else DATABASE_URL
+        async_engine = make_engine(async_database_url(url), is_async=True)
+        # expire_on_commit=False: attributes stay readable after commit
+        # without an implicit refresh query
+        _async[role] = (async_engine, async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False))
+    return _async[role]
+
+
+def get_async_engine():
+    return _async_pair("primary")[0]
+
+
+def AsyncSessionLocal() -> AsyncSession:
+    return _async_pair("primary")[1]()
+
+
+def AsyncReadSessionLocal() -> AsyncSession:
+    return _async_pair("replica")[1]()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db() -> AsyncIterator[AsyncSession]:
+    """Async session on the read replica, or the primary when none is configured"""
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+
+async def dispose_async_engine():
+    for async_engine, _ in list(_async.values()):
+        await async_engine.dispose()
+    _async.clear()
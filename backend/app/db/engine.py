@@ -0,0 +1,104 @@
+"""
+Engine construction with named performance profiles.
+
+DB_PROFILE picks the profile; by default it follows the URL's dialect.
+The "*-default" profiles keep driver and SQLAlchemy defaults and exist as
+a baseline for benchmarks (backend/benchmarks/bench_db_profiles.py).
+"""
+from typing import Dict
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from ..telemetry import instrument_engine
+import os
+
+PROFILES: Dict[str, Dict] = {
+    "sqlite": {
+        # WAL lets readers run alongside the writer; synchronous=NORMAL is
+        # durable across application crashes and only fsyncs at checkpoints
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+            "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+            "cache_size": -64 * 1024,  # KiB
+            "temp_store": "MEMORY",
+        },
+        "engine": {"query_cache_size": 1200},
+    },
+    "sqlite-default": {
+        "pragmas": {"busy_timeout": 5000},
+        "engine": {},
+    },
+    "postgres": {
+        "engine": {
+            "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+            "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "20")),
+            "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+            "pool_timeout": 30,
+            "pool_pre_ping": True,
+            "query_cache_size": 1200,
+        },
+    },
+    "postgres-default": {
+        "engine": {},
+    },
+}
+
+
+def resolve_profile(url: str, profile: str = None) -> str:
+    name = profile or os.getenv("DB_PROFILE") or ("sqlite" if url.startswith("sqlite") else "postgres")
+    if name not in PROFILES:
+        raise ValueError(f"Unknown DB_PROFILE {name!r}; expected one of {', '.join(PROFILES)}")
+    return name
+
+
+def _configure_sqlite(engine: Engine, pragmas: Dict):
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    @event.listens_for(engine, "savepoint")
+    def on_savepoint(conn, name):
+        # pysqlite only opens a transaction on the first DML statement, so a
+        # SAVEPOINT issued before any write would become the outermost
+        # transaction and its RELEASE would commit. Open one first.
+        dbapi_connection = conn.connection.dbapi_connection
+        if not getattr(dbapi_connection, "in_transaction", True):
+            conn.exec_driver_sql("BEGIN")
+
+
+def make_engine(url: str, profile: str = None, is_async: bool = False):
+    """
+    A sync Engine (or AsyncEngine with ``is_async``) for ``url`` configured
+    by the named profile: SQLite pragmas on every new connection, pool
+    sizing and pre-ping for Postgres. Every statement is timed for /metrics.
+    """
+    settings = PROFILES[resolve_profile(url, profile)]
+    kwargs = dict(settings.get("engine", {}))
+    sqlite = url.startswith("sqlite")
+    if sqlite:
+        # Pool sizing only applies to server databases
+        for key in ("pool_size", "max_overflow", "pool_recycle", "pool_timeout"):
+            kwargs.pop(key, None)
+        if not is_async:
+            kwargs["connect_args"] = {"check_same_thread": False}
+        elif ":memory:" not in url and "mode=memory" not in url:
+            # aiosqlite defaults to NullPool: a new connection, and a new
+            # round of pragmas, for every session
+            kwargs["poolclass"] = AsyncAdaptedQueuePool
+
+    if is_async:
+        engine = create_async_engine(url, **kwargs)
+        sync_engine = engine.sync_engine
+    else:
+        engine = sync_engine = create_engine(url, **kwargs)
+
+    if sqlite:
+        _configure_sqlite(sync_engine, settings.get("pragmas", {}))
+    instrument_engine(sync_engine)
+    return engine
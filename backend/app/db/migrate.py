@@ -0,0 +1,48 @@
+"""
+Schema migrations (backend/migrations) run from the app.
+
+    python -m backend.app.db.migrate [revision]
+
+Databases created by ``Base.metadata.create_all`` before migrations existed
+have tables but no alembic_version; they are stamped at the baseline
+revision (the original schema) first. Such a database may have been
+created by any version of the models up to migrations, so revisions
+0001a-0001e inspect what already exists and only add what is missing.
+"""
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+import os
+from .database import engine as default_engine
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+ALEMBIC_INI = os.path.join(BACKEND_DIR, "alembic.ini")
+BASELINE_REVISION = "0001"
+
+
+def alembic_config(connection=None) -> Config:
+    config = Config(ALEMBIC_INI)
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    # Leave the application's logging configuration alone
+    config.attributes["configure_logger"] = False
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+def upgrade_database(engine: Engine = default_engine, revision: str = "head"):
+    with engine.begin() as connection:
+        tables = inspect(connection).get_table_names()
+        config = alembic_config(connection)
+        if "alembic_version" not in tables and "users" in tables:
+            print(f"📌 Existing schema without migrations, stamping baseline {BASELINE_REVISION}")
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, revision)
+
+
+if __name__ == "__main__":
+    import sys
+
+    upgrade_database(revision=sys.argv[1] if len(sys.argv) > 1 else "head")
+    print("✅ Database schema up to date")
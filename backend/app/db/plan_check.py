@@ -0,0 +1,145 @@
+"""
+Query-plan regression check for the hot read paths.
+
+Runs the real service functions against a database migrated to head,
+captures the SELECTs they emit and asks the planner how it would run each
+one. A check fails when its expected index is not used or a hot table is
+read with a full scan.
+
+    python -m backend.app.db.plan_check               # fresh SQLite database
+    DATABASE_URL=postgresql://... python -m backend.app.db.plan_check --use-configured
+
+Exits non-zero on any failure, so it can gate CI.
+"""
+from typing import Callable, List, Tuple, Union
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+import os
+import sys
+import tempfile
+
+from ..services.stats import status_counts, average_response_time, resume_version_count
+from ..services.email_status import ApplicationIndex
+from ..services.job_ingest import _lookup_ids
+from ..services import listing
+from ..services.job_index import search_jobs
+from ..services.job_dedup import _stored_candidates, collapse_duplicates
+from ..users.models import Job
+from .engine import make_engine
+
+HOT_TABLES = ("job_applications", "resume_versions", "base_resumes", "jobs", "job_lsh_buckets")
+
+def _run_page(db: Session, build):
+    """One listing page past a cursor, the way users/routes.py runs it"""
+    cursor = listing.encode_cursor("2026-01-01 00:00:00", 1000)
+    query = build(1, db.get_bind().dialect.name, cursor=cursor)
+    return db.execute(query.limit(listing.DEFAULT_PAGE_SIZE + 1)).all()
+
+
+# Either index is a range read of one user's applications; which one the
+# planner picks depends on table statistics
+PER_USER_APPLICATIONS = ("ix_job_applications_user_status", "ix_job_applications_user_created")
+
+# (name, call, expected index or any of a tuple of indexes)
+CHECKS: List[Tuple[str, Callable[[Session], object], Union[str, Tuple[str, ...]]]] = [
+    ("applications by user and status", lambda db: status_counts(db, 1), "ix_job_applications_user_status"),
+    ("response time by user", lambda db: average_response_time(db, 1), PER_USER_APPLICATIONS),
+    ("open applications for email matching", lambda db: ApplicationIndex.for_user(db, 1), PER_USER_APPLICATIONS),
+    ("resume versions by base resume", lambda db: resume_version_count(db, 1), "ix_resume_versions_base_resume_created"),
+    ("jobs by URL", lambda db: _lookup_ids(db, [("linkedin", "https://example.com/jobs/1")]),
+     "ix_jobs_normalized_url"),
+    ("applications page after a cursor", lambda db: _run_page(db, listing.applications_query),
+     "ix_job_applications_user_created"),
+    ("resume versions page after a cursor", lambda db: _run_page(db, listing.resume_versions_query),
+     "ix_resume_versions_base_resume_created"),
+    # SQLite reports the FTS5 table as a virtual table scan with a MATCH constraint
+    ("full-text job search", lambda db: search_jobs(db, "python engineer", source="remoteok"),
+     ("jobs_fts VIRTUAL TABLE INDEX", "ix_jobs_search_vector")),
+    # The primary key (bucket, job_id) serves the lookup
+    ("near-duplicate candidates by LSH bucket", lambda db: _stored_candidates(db, {1, 2, 3}),
+     ("sqlite_autoindex_job_lsh_buckets_1", "job_lsh_buckets_pkey")),
+    ("applied clusters of a user", lambda db: collapse_duplicates(db, 1, [Job(id=1, cluster_id=1)]),
+     PER_USER_APPLICATIONS),
+]
+
+
+def capture_selects(engine: Engine, call: Callable[[Session], object]) -> List[Tuple[str, object]]:
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    db = Session(bind=engine)
+    try:
+        call(db)
+    finally:
+        db.close()
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return statements
+
+
+def explain(engine: Engine, statement: str, parameters) -> List[str]:
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        if engine.dialect.name == "sqlite":
+            cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            return [row[-1] for row in cursor.fetchall()]
+        # Empty tables make a sequential scan the cheapest plan; rule it out
+        # so the plan shows whether an index is available at all
+        cursor.execute("SET enable_seqscan = off")
+        cursor.execute(f"EXPLAIN {statement}", parameters)
+        return [row[0] for row in cursor.fetchall()]
+    finally:
+        raw.close()
+
+
+def full_scans(plan: List[str]) -> List[str]:
+    scans = []
+    for line in plan:
+        for table in HOT_TABLES:
+            # SQLite: "SCAN jobs" / "SCAN TABLE jobs"; Postgres: "Seq Scan on jobs"
+            if (line.startswith(("SCAN " + table, "SCAN TABLE " + table)) and "INDEX" not in line) \
+                    or f"Seq Scan on {table}" in line:
+                scans.append(line.strip())
+    return scans
+
+
+def run_checks(engine: Engine) -> List[str]:
+    """Names of the failed checks; details are printed"""
+    failures = []
+    for name, call, index in CHECKS:
+        plans = [explain(engine, statement, params) for statement, params in capture_selects(engine, call)]
+        lines = [line for plan in plans for line in plan]
+        problems = []
+        indexes = (index,) if isinstance(index, str) else index
+        if not any(name in line for name in indexes for line in lines):
+            problems.append(f"does not use {' or '.join(indexes)}")
+        problems += [f"full scan: {scan}" for scan in full_scans(lines)]
+        status = "ok" if not problems else "FAIL"
+        print(f"{status:<4} {name}")
+        for problem in problems:
+            print(f"       {problem}")
+        for line in lines:
+            print(f"       | {line}")
+        if problems:
+            failures.append(name)
+    return failures
+
+
+if __name__ == "__main__":
+    from .migrate import upgrade_database
+
+    if "--use-configured" in sys.argv:
+        from .database import engine
+    else:
+        path = os.path.join(tempfile.mkdtemp(), "plan_check.db")
+        engine = make_engine(f"sqlite:///{path}")
+    upgrade_database(engine)
+
+    failures = run_checks(engine)
+    print(f"{len(CHECKS) - len(failures)}/{len(CHECKS)} checks passed")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import Optional
+from ..db.database import get_async_read_db
+from ..schemas.listing import JobSearchPage
+from ..services.job_index import search_query, DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT, MAX_SEARCH_OFFSET
+
+router = APIRouter()
+
+
+@router.get("/search", response_model=JobSearchPage)
+async def search_jobs(
+    q: str = Query(..., min_length=1, max_length=200),
+    source: Optional[str] = None,
+    company: Optional[str] = None,
+    location: Optional[str] = None,
+    posted_after: Optional[datetime] = None,
+    limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+    offset: int = Query(0, ge=0, le=MAX_SEARCH_OFFSET),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """Ranked full-text search over stored postings (see services/job_index.py)"""
+    try:
+        query = search_query(db.bind.dialect.name, q, source=source, company=company, location=location,
+                             posted_after=posted_after)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    rows = (await db.execute(query.limit(limit + 1).offset(offset))).all()
+    return {
+        "items": [dict(row._mapping) for row in rows[:limit]],
+        "next_offset": offset + limit if len(rows) > limit else None,
+    }
@@ -1,26 +1,76 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from backend.app.db.database import get_db, engine, Base
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from backend.app.db.database import get_async_db, dispose_async_engine, engine, Base, SessionLocal
+from backend.app.db.engine import resolve_profile
 from backend.app.users.routes import router as user_router
-from backend.app.users import models
+from backend.app.jobs.routes import router as job_router
+from backend.app.telemetry import RequestMetricsMiddleware, render
+from backend.app.services.run_queue import register_queue_metrics
+import os
 
-print("🚀 Starting database initialization...")
-print(f"📂 Database URL: {engine.url}")
+# Migrate the schema on startup. Production deploys run
+# `python -m backend.app.db.migrate` before rollout and set this to 0.
+SCHEMA_CHECK = os.getenv("DB_SCHEMA_CHECK", "1") == "1"
 
-# Ensure all models are imported and registered with Base
-print("📋 Registered models:")
-for table in Base.metadata.tables:
-    print(f"- {table}")
 
-# Create tables
-try:
-    Base.metadata.create_all(bind=engine)
-    print("✅ Tables created successfully!")
-except Exception as e:
-    print(f"❌ Error creating tables: {str(e)}")
+def init_database():
+    url = engine.url.render_as_string(hide_password=True)
+    print(f"📂 Database URL: {url} (profile {resolve_profile(url)})")
+    print(f"📋 Registered models: {', '.join(Base.metadata.tables)}")
+    if not SCHEMA_CHECK:
+        print("⏭️ DB_SCHEMA_CHECK=0, skipping migrations")
+        return
 
-app = FastAPI(title="VRJob AI API")
+    # Bring the schema up to date (see backend/migrations); alembic is only imported here
+    try:
+        from backend.app.db.migrate import upgrade_database
+        upgrade_database(engine)
+        print("✅ Database schema up to date!")
+    except Exception as e:
+        # Serving on a half-migrated schema fails later and less clearly
+        print(f"❌ Error migrating database: {str(e)}")
+        raise
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    print("🚀 Starting VRJob AI API...")
+    await run_in_threadpool(init_database)
+
+    # Workers draining queued /search-jobs runs; RUN_WORKERS=0 leaves that to
+    # a separate `python -m backend.app.services.run_queue` process
+    from backend.app.services.run_queue import RunWorkerPool, RUN_WORKERS
+    run_workers = None
+    if RUN_WORKERS > 0:
+        run_workers = RunWorkerPool(SessionLocal, workers=RUN_WORKERS)
+        await run_in_threadpool(run_workers.start)
+
+    # Scheduled searches for all users; off unless SEARCH_SCHEDULE_INTERVAL is
+    # set, usually run as `python -m backend.app.services.scheduler` instead
+    from backend.app.services.scheduler import SearchScheduler, SCHEDULE_INTERVAL
+    scheduler = None
+    if SCHEDULE_INTERVAL > 0:
+        scheduler = SearchScheduler(SessionLocal, SCHEDULE_INTERVAL)
+        scheduler.start()
+
+    yield
+
+    if scheduler is not None:
+        await run_in_threadpool(scheduler.stop)
+    if run_workers is not None:
+        await run_in_threadpool(run_workers.stop)
+    from backend.app.services.resume_text import shutdown_extract_pool
+    shutdown_extract_pool()
+    await dispose_async_engine()
+    engine.dispose()
+
+
+app = FastAPI(title="VRJob AI API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -28,9 +78,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
+# Added last so it is outermost and times the whole request
+app.add_middleware(RequestMetricsMiddleware)
+register_queue_metrics(SessionLocal)
 
 app.include_router(user_router, prefix="/users", tags=["users"])
+app.include_router(job_router, prefix="/jobs", tags=["jobs"])
 
 @app.get("/")
 async def root():
@@ -38,10 +93,23 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+@app.get("/cache/stats")
+async def cache_stats():
+    from .resume_cache import get_resume_cache
+    return get_resume_cache().stats()
+@app.get("/prompt/stats")
+async def prompt_stats():
+    from .prompt_builder import metrics
+    from .resume_delta import metrics as delta_metrics
+    return {**metrics, **delta_metrics}
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    # Sync so the queue-depth query runs in the threadpool
+    return PlainTextResponse(render(), media_type="text/plain; version=0.0.4")
 @app.get("/db")
-async def db_check(db: Session = Depends(get_db)):
+async def db_check(db: AsyncSession = Depends(get_async_db)):
     try:
-        db.execute("SELECT 1")
+        await db.execute(text("SELECT 1"))
         return {"status": "healthy"}
     except Exception as e:
         return {"status": "unhealthy", "error": str(e)}
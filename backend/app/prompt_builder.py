@@ -0,0 +1,320 @@
+"""
+Token-budgeted prompt construction for ResumeAgent.
+
+The resume is split into sections and blocks (paragraphs / bullets), each
+block is scored against the job description's terms, and only the most
+relevant blocks that fit the budget are kept, in their original order.
+Left-out blocks and sections are replaced by ``[[omitted N]]`` markers,
+which the model copies through and ``restore_omitted`` swaps back for the
+original text, so a full rewrite never drops a section it was not shown.
+The job description is stripped of boilerplate (EEO statements, benefits,
+"about us") and capped to its own budget.
+"""
+from typing import List, Dict, Tuple
+import math
+import os
+import re
+import threading
+
+from .telemetry import callback
+
+RESUME_TOKEN_BUDGET = int(os.getenv("RESUME_PROMPT_TOKEN_BUDGET", "2500"))
+JOB_TOKEN_BUDGET = int(os.getenv("JOB_PROMPT_TOKEN_BUDGET", "1000"))
+
+try:
+    import tiktoken
+except ImportError:  # optional; fall back to an estimate
+    tiktoken = None
+
+_encodings = {}
+
+WORD_RE = re.compile(r"[a-z0-9][a-z0-9+#.\-]*[a-z0-9+#]|[a-z0-9]")
+STOPWORDS = set("""
+a an and are as at be by for from has have in is it its of on or our that the their this to was were
+will with you your we us they them who what which while within without about across into over than
+also more most such any all can may must should would could other others etc including include
+""".split())
+
+HEADINGS = {
+    "summary", "professional summary", "profile", "objective", "about", "about me",
+    "experience", "work experience", "professional experience", "employment", "employment history",
+    "skills", "technical skills", "core skills", "core competencies", "education", "projects",
+    "certifications", "certificates", "awards", "publications", "languages", "interests",
+    "volunteer", "volunteering", "leadership", "achievements",
+}
+# Sections that go in the prompt before any scored block, budget permitting
+PINNED_HEADINGS = {"summary", "professional summary", "profile", "objective", "skills",
+                   "technical skills", "core skills", "core competencies"}
+
+BOILERPLATE_RE = re.compile(
+    r"equal opportunity|equal employment|eeo\b|affirmative action|regardless of (race|gender|age)|"
+    r"reasonable accommodation|background check|e-verify|privacy (policy|notice)|"
+    r"^\s*(benefits|perks|what we offer|why join us|about (us|the company)|who we are|our (mission|values))\b|"
+    r"401\(?k\)?|paid time off|\bpto\b|health, dental|dental,? (and )?vision|parental leave|"
+    r"apply (now|today)|click apply|to apply,",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+_metrics_lock = threading.Lock()
+metrics = {"prompts": 0, "tokens_before": 0, "tokens_after": 0}
+callback("vrjob_prompts_built_total", "Full-rewrite prompts built", lambda: metrics["prompts"], kind="counter")
+callback("vrjob_prompt_tokens_total", "Prompt tokens before and after trimming",
+         lambda: {"before": metrics["tokens_before"], "after": metrics["tokens_after"]}, ("stage",), kind="counter")
+
+
+def _encoding(model: str):
+    encoding = _encodings.get(model)
+    if encoding is None:
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding("cl100k_base")
+        _encodings[model] = encoding
+    return encoding
+
+
+def count_tokens(text: str, model: str = "gpt-4") -> int:
+    """Token count with tiktoken when installed, else a ~4 chars/token estimate"""
+    if not text:
+        return 0
+    if tiktoken is not None:
+        return len(_encoding(model).encode(text))
+    return max(1, math.ceil(len(text) / 4))
+
+
+def truncate_tokens(text: str, budget: int, model: str = "gpt-4") -> str:
+    """The first ``budget`` tokens of ``text``, cut wherever they end"""
+    if tiktoken is not None:
+        encoding = _encoding(model)
+        return encoding.decode(encoding.encode(text)[:budget])
+    return text[:budget * 4]
+
+
+def terms(text: str) -> List[str]:
+    return [t for t in WORD_RE.findall((text or "").lower()) if t not in STOPWORDS and len(t) > 1]
+
+
+def _is_heading(line: str) -> bool:
+    stripped = line.strip().rstrip(":").strip()
+    if not stripped or len(stripped) > 40:
+        return False
+    if stripped.lower() in HEADINGS:
+        return True
+    return stripped.isupper() and len(stripped.split()) <= 4
+
+
+BULLET_RE = re.compile(r"\s*([-*•▪●]|\d+[.)])\s+")
+# Added to full-rewrite prompts whose resume excerpt has markers
+OMITTED_NOTE = ("Lines like [[omitted 1]] stand for parts of the resume not shown here; "
+                "copy each one through unchanged, on its own line, where it appears.")
+OMITTED_RE = re.compile(r"\[\[\s*omitted\s+(\d+)\s*\]\]", re.IGNORECASE)
+
+
+def section_layout(lines: List[str]) -> List[Dict]:
+    """
+    [{"heading": line index or None, "blocks": [(start, end), ...]}] over
+    ``lines``, with ``end`` exclusive. The text before the first heading
+    (name, contact) is a section with no heading.
+    """
+    sections = [{"heading": None, "blocks": []}]
+    start = None
+
+    def close_block(end):
+        nonlocal start
+        if start is not None:
+            sections[-1]["blocks"].append((start, end))
+            start = None
+
+    for i, line in enumerate(lines):
+        if _is_heading(line):
+            close_block(i)
+            sections.append({"heading": i, "blocks": []})
+        elif not line.strip():
+            close_block(i)
+        elif BULLET_RE.match(line):
+            # Each bullet is its own block so it can be ranked on its own
+            close_block(i)
+            start = i
+        elif start is None:
+            start = i
+    close_block(len(lines))
+    return [s for s in sections if s["heading"] is not None or s["blocks"]]
+
+
+def split_sections(resume: str) -> List[Dict]:
+    """
+    [{"heading": str or None, "blocks": [str, ...]}] in document order. The
+    text before the first heading (name, contact) is a section with no heading.
+    """
+    lines = (resume or "").splitlines()
+    return [
+        {
+            "heading": lines[s["heading"]].strip() if s["heading"] is not None else None,
+            "blocks": ["\n".join(line.rstrip() for line in lines[a:b]) for a, b in s["blocks"]],
+        }
+        for s in section_layout(lines)
+    ]
+
+
+def trim_job_description(description: str, budget: int = JOB_TOKEN_BUDGET, model: str = "gpt-4") -> str:
+    """Drop boilerplate paragraphs and lines from a posting, then cap it at ``budget`` tokens"""
+    kept = []
+    for paragraph in re.split(r"\n\s*\n", description or ""):
+        if BOILERPLATE_RE.search(paragraph.strip().splitlines()[0] if paragraph.strip() else ""):
+            continue
+        lines = [line for line in paragraph.splitlines() if not BOILERPLATE_RE.search(line)]
+        if lines:
+            kept.append("\n".join(lines))
+    text = "\n\n".join(kept).strip()
+
+    if count_tokens(text, model) <= budget:
+        return text
+    # Keep whole sentences from the start until the budget runs out
+    out, used = [], 0
+    for sentence in re.split(r"(?<=[.!?])\s+|\n", text):
+        cost = count_tokens(sentence, model)
+        if used + cost > budget:
+            break
+        out.append(sentence)
+        used += cost
+    if not out:
+        # Not even the first sentence fits (a scraped posting on one unpunctuated line)
+        return truncate_tokens(text, budget, model).strip()
+    return " ".join(out)
+
+
+def _score(block_terms: List[str], job_weights: Dict[str, float]) -> float:
+    if not block_terms:
+        return 0.0
+    hits = sum(job_weights.get(t, 0.0) for t in set(block_terms))
+    # Mild length normalization so long blocks don't win on volume alone
+    return hits / math.sqrt(len(block_terms))
+
+
+def select_blocks(sections: List[Dict], job_description: str, budget: int = RESUME_TOKEN_BUDGET,
+                  model: str = "gpt-4") -> set:
+    """
+    {(section index, block index)} of the blocks of ``split_sections`` output
+    that go into the prompt: pinned sections first, in document order, then
+    the blocks that score highest against the job description. Both count
+    against ``budget``.
+    """
+    job_terms = terms(job_description)
+    counts: Dict[str, int] = {}
+    for t in job_terms:
+        counts[t] = counts.get(t, 0) + 1
+    # Saturating term frequency, like BM25's k1 term
+    job_weights = {t: n / (n + 1.0) for t, n in counts.items()}
+
+    candidates: List[Tuple[float, int, int]] = []  # (score, section index, block index)
+    pinned_blocks: List[Tuple[int, int]] = []
+    chosen = set()
+    used = 0
+    for si, section in enumerate(sections):
+        heading = (section["heading"] or "").rstrip(":").strip().lower()
+        pinned = section["heading"] is None or heading in PINNED_HEADINGS
+        if section["heading"]:
+            used += count_tokens(section["heading"], model)
+        for bi, block in enumerate(section["blocks"]):
+            if pinned:
+                pinned_blocks.append((si, bi))
+            else:
+                candidates.append((_score(terms(block), job_weights), si, bi))
+
+    for si, bi in pinned_blocks:
+        cost = count_tokens(sections[si]["blocks"][bi], model)
+        if used + cost > budget:
+            continue
+        chosen.add((si, bi))
+        used += cost
+    for score, si, bi in sorted(candidates, key=lambda c: (-c[0], c[1], c[2])):
+        cost = count_tokens(sections[si]["blocks"][bi], model)
+        if used + cost > budget:
+            continue
+        chosen.add((si, bi))
+        used += cost
+    return chosen
+
+
+def select_resume_content(resume: str, job_description: str, budget: int = RESUME_TOKEN_BUDGET,
+                          model: str = "gpt-4") -> Tuple[str, Dict[str, str]]:
+    """
+    The resume reduced to its most job-relevant blocks within ``budget``
+    tokens, each left-out run of blocks (or whole section) replaced by an
+    ``[[omitted N]]`` line, and {marker: original text} for restore_omitted.
+    """
+    if count_tokens(resume, model) <= budget:
+        return resume.strip(), {}
+
+    sections = split_sections(resume)
+    chosen = select_blocks(sections, job_description, budget, model)
+    omitted: Dict[str, str] = {}
+
+    def omit(text: str) -> str:
+        marker = f"[[omitted {len(omitted) + 1}]]"
+        omitted[marker] = text
+        return marker
+
+    out = []
+    for si, section in enumerate(sections):
+        heading, blocks = section["heading"], section["blocks"]
+        if heading and not any((si, bi) in chosen for bi in range(len(blocks))):
+            out.append(omit("\n".join([heading] + blocks)))
+            continue
+        parts = [heading] if heading else []
+        run = []
+        for bi, block in enumerate(blocks):
+            if (si, bi) not in chosen:
+                run.append(block)
+                continue
+            if run:
+                parts.append(omit("\n".join(run)))
+                run = []
+            parts.append(block)
+        if run:
+            parts.append(omit("\n".join(run)))
+        out.append("\n".join(parts))
+    return "\n\n".join(part for part in out if part).strip(), omitted
+
+
+def restore_omitted(text: str, omitted: Dict[str, str]) -> str:
+    """
+    ``text`` (the model's rewrite of a select_resume_content excerpt) with
+    each ``[[omitted N]]`` marker replaced by the original text. Parts whose
+    marker the model dropped are appended, so nothing is lost.
+    """
+    if not omitted:
+        return text
+    restored = set()
+
+    def original(match):
+        marker = f"[[omitted {match.group(1)}]]"
+        if marker not in omitted or marker in restored:
+            return ""
+        restored.add(marker)
+        return omitted[marker]
+
+    text = OMITTED_RE.sub(original, text)
+    missing = [part for marker, part in omitted.items() if marker not in restored]
+    return "\n\n".join([text.rstrip()] + missing) if missing else text
+
+
+def build_prompt_inputs(resume: str, job_description: str, resume_budget: int = RESUME_TOKEN_BUDGET,
+                        job_budget: int = JOB_TOKEN_BUDGET,
+                        model: str = "gpt-4") -> Tuple[str, str, Dict, Dict[str, str]]:
+    """
+    (resume excerpt, trimmed job description, stats, omitted parts) ready to
+    drop into a prompt; pass the reply and the omitted parts to
+    restore_omitted. ``stats`` has token counts before and after;
+    process-wide totals are kept in ``metrics``.
+    """
+    before = count_tokens(resume, model) + count_tokens(job_description, model)
+    job_text = trim_job_description(job_description, job_budget, model)
+    resume_text, omitted = select_resume_content(resume, job_text, resume_budget, model)
+    after = count_tokens(resume_text, model) + count_tokens(job_text, model)
+
+    with _metrics_lock:
+        metrics["prompts"] += 1
+        metrics["tokens_before"] += before
+        metrics["tokens_after"] += after
+    return resume_text, job_text, {"tokens_before": before, "tokens_after": after}, omitted
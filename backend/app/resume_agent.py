@@ -1,18 +1,120 @@
-from openai import OpenAI
+import os
+import threading
+from .resume_cache import ResumeCache, cache_key, get_resume_cache
+from .prompt_builder import build_prompt_inputs, restore_omitted, OMITTED_NOTE, count_tokens, trim_job_description, RESUME_TOKEN_BUDGET, JOB_TOKEN_BUDGET
+from .resume_delta import DeltaError, labelled_resume, parse_edits, apply_edits, record
+from .telemetry import histogram, timed
+
+MODEL = "gpt-4"
+# Ask for section edits instead of a full rewrite; set to 0 to always regenerate
+DELTA_MODE = os.getenv("RESUME_DELTA_MODE", "1") == "1"
+# Rough completion size charged to the tokens-per-minute budget with each prompt
+EXPECTED_COMPLETION_TOKENS = 1500
+# Bump whenever the prompts below change so cached results are not reused
+PROMPT_VERSION = f"app-3:{'delta' if DELTA_MODE else 'full'}:{RESUME_TOKEN_BUDGET}:{JOB_TOKEN_BUDGET}"
+
+# outcome is "cache", "delta", "full" or "error"
+CUSTOMIZE_SECONDS = histogram("vrjob_customize_resume_duration_seconds", "Time for one customize_resume call",
+                              ("outcome",), stage="customize")
+
+DELTA_PROMPT = """
+Given the resume blocks below, each tagged with an id like [2.3],
+and the job description: {job_text}
+
+Resume:
+{resume_blocks}
+
+Tailor the resume to highlight matching skills and experience by editing only
+the blocks that need it (typically the summary, skills and a few bullets).
+Respond with JSON only:
+{{"edits": [{{"op": "replace", "id": "<id>", "text": "<new block text>"}},
+           {{"op": "insert_after", "id": "<id>", "text": "<new bullet>"}},
+           {{"op": "delete", "id": "<id>"}}]}}
+Keep each block's formatting (bullet markers, line breaks). Do not repeat unchanged blocks.
+"""
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_openai_client():
+    """Process-wide OpenAI client, so every run reuses one connection pool"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                # openai is slow to import; load it on the first LLM call, not at startup
+                from openai import OpenAI
+
+                # Retries and backoff are handled by services/llm_executor.py.
+                # OPENAI_BASE_URL points the client at a fake server in benchmarks.
+                _client = OpenAI(
+                    api_key=os.getenv("OPENAI_API_KEY"),
+                    max_retries=int(os.getenv("OPENAI_MAX_RETRIES", "0")),
+                )
+    return _client
+
 
 class ResumeAgent:
-    def __init__(self):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    def __init__(self, cache: ResumeCache = None, client=None, limiter=None):
+        self.client = client or get_openai_client()
+        self.cache = cache or get_resume_cache()
+        # A services.llm_executor.RateLimiter charged before every API request,
+        # sized from the prompt actually sent; cache hits are never charged
+        self.limiter = limiter
+        # Token counts of the last prompt built, before and after trimming
+        self.last_prompt_stats = None
 
     def customize_resume(self, resume_content, job_description):
+        with timed(CUSTOMIZE_SECONDS, outcome="error") as labels:
+            key = cache_key(resume_content, job_description, MODEL, PROMPT_VERSION)
+            cached = self.cache.get(key)
+            if cached is not None:
+                labels["outcome"] = "cache"
+                return cached
+
+            content = None
+            if DELTA_MODE:
+                content = self._customize_by_delta(resume_content, job_description)
+                labels["outcome"] = "delta"
+            if content is None:
+                content = self._regenerate(resume_content, job_description)
+                labels["outcome"] = "full"
+            self.cache.set(key, content)
+            return content
+
+    def _complete(self, prompt):
+        if self.limiter is not None:
+            self.limiter.acquire(count_tokens(prompt, model=MODEL) + EXPECTED_COMPLETION_TOKENS)
+        return self.client.chat.completions.create(model=MODEL, messages=[{"role": "user", "content": prompt}])
+
+    def _customize_by_delta(self, resume_content, job_description):
+        """The base resume with the model's section edits applied, or None to fall back"""
+        job_text = trim_job_description(job_description, model=MODEL)
+        resume_blocks, blocks = labelled_resume(resume_content, job_text, model=MODEL)
+        response = self._complete(DELTA_PROMPT.format(job_text=job_text, resume_blocks=resume_blocks))
+        try:
+            edits = parse_edits(response.choices[0].message.content, blocks)
+            content = apply_edits(resume_content, edits)
+        except DeltaError as e:
+            print(f"⚠️ Resume delta rejected, regenerating in full: {e}")
+            record("delta_fallbacks")
+            return None
+        record("delta_applied", len(edits))
+        return content
+
+    def _regenerate(self, resume_content, job_description):
+        # Only the most relevant resume blocks and the non-boilerplate part
+        # of the posting go into the prompt, within the token budgets
+        resume_excerpt, job_text, self.last_prompt_stats, omitted = build_prompt_inputs(
+            resume_content, job_description, model=MODEL
+        )
         prompt = f"""
-        Given the resume: {resume_content}
-        and the job description: {job_description}
+        Given the resume: {resume_excerpt}
+        and the job description: {job_text}
 
         Return a tailored resume that highlights matching skills and experience.
+        {OMITTED_NOTE if omitted else ""}
         """
-        response = self.client.chat.completions.create(
-            model="gpt-4",
-            messages=[{"role": "user", "content": prompt}]
-        )
-        return response.choices[0].message.content
+        # Sections left out of the excerpt go back in unchanged
+        return restore_omitted(self._complete(prompt).choices[0].message.content, omitted)
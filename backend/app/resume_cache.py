@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from .telemetry import callback
+
+CACHE_PATH = os.getenv(
+    "RESUME_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "cache", "resume_cache.db"),
+)
+CACHE_TTL = int(os.getenv("RESUME_CACHE_TTL", str(7 * 24 * 3600)))
+MEMORY_ENTRIES = int(os.getenv("RESUME_CACHE_MEMORY_ENTRIES", "256"))
+DISK_ENTRIES = int(os.getenv("RESUME_CACHE_DISK_ENTRIES", "10000"))
+
+
+def cache_key(resume_content: str, job_description: str, model: str, prompt_version: str) -> str:
+    """Content address of one customize_resume call"""
+    payload = json.dumps([resume_content, job_description, model, prompt_version])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResumeCache:
+    """
+    Two-tier cache for tailored resumes: an in-memory LRU in front of a
+    SQLite file. Both tiers expire entries after ``ttl`` seconds and evict
+    the least recently used ones beyond their size limit.
+    """
+
+    def __init__(self, path: Optional[str] = CACHE_PATH, ttl: int = CACHE_TTL,
+                 memory_entries: int = MEMORY_ENTRIES, disk_entries: int = DISK_ENTRIES):
+        self.ttl = ttl
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self._memory = OrderedDict()  # key -> (stored_at, value)
+        self._lock = threading.Lock()
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+        self._conn = None
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS resume_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                " stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_resume_cache_accessed_at ON resume_cache (accessed_at)"
+            )
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if now - stored_at < self.ttl:
+                    self._memory.move_to_end(key)
+                    self.counters["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT value, stored_at FROM resume_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and now - row[1] < self.ttl:
+                    self._conn.execute(
+                        "UPDATE resume_cache SET accessed_at = ? WHERE key = ?", (now, key)
+                    )
+                    self._remember(key, row[1], row[0])
+                    self.counters["disk_hits"] += 1
+                    return row[0]
+
+            self.counters["misses"] += 1
+            return None
+
+    def set(self, key: str, value: str):
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, value)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO resume_cache (key, value, stored_at, accessed_at)"
+                    " VALUES (?, ?, ?, ?)",
+                    (key, value, now, now),
+                )
+                self._evict_disk(now)
+
+    def _remember(self, key: str, stored_at: float, value: str):
+        self._memory[key] = (stored_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    def _evict_disk(self, now: float):
+        expired = self._conn.execute(
+            "DELETE FROM resume_cache WHERE stored_at < ?", (now - self.ttl,)
+        ).rowcount
+        overflow = self._conn.execute(
+            "DELETE FROM resume_cache WHERE key IN ("
+            " SELECT key FROM resume_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.disk_entries,),
+        ).rowcount
+        self.counters["evictions"] += max(expired, 0) + max(overflow, 0)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.counters)
+            stats["memory_entries"] = len(self._memory)
+            lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+            stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+            return stats
+
+
+_cache: Optional[ResumeCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_resume_cache() -> ResumeCache:
+    """Process-wide cache shared by every ResumeAgent"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResumeCache()
+    return _cache
+
+
+def _cache_stats() -> dict:
+    # Scrapes must not create the cache (and its SQLite file) as a side effect
+    return _cache.stats() if _cache is not None else {}
+
+
+callback("vrjob_resume_cache_lookups_total", "Resume cache lookups by result",
+         lambda: {result: _cache_stats().get(result, 0) for result in ("memory_hits", "disk_hits", "misses")},
+         ("result",), kind="counter")
+callback("vrjob_resume_cache_evictions_total", "Resume cache entries expired or evicted",
+         lambda: _cache_stats().get("evictions", 0), kind="counter")
+callback("vrjob_resume_cache_memory_entries", "Entries in the in-memory tier",
+         lambda: _cache_stats().get("memory_entries", 0))
@@ -0,0 +1,165 @@
+"""
+Section-level delta generation for ResumeAgent.
+
+Instead of asking the model to re-emit the whole tailored resume, the
+prompt shows the selected resume blocks tagged with ids and asks for a
+small JSON list of edits:
+
+    {"edits": [{"op": "replace", "id": "3.2", "text": "..."},
+               {"op": "insert_after", "id": "3.2", "text": "..."},
+               {"op": "delete", "id": "4.0"}]}
+
+The edits are validated and applied to the base resume line by line, so
+every block the model did not touch is kept byte for byte. Anything that
+fails validation raises ``DeltaError`` and the caller falls back to full
+regeneration.
+"""
+from typing import List, Dict, Tuple
+import json
+import os
+import re
+import threading
+
+from .prompt_builder import (
+    RESUME_TOKEN_BUDGET, count_tokens, section_layout, split_sections, select_blocks,
+)
+from .telemetry import callback
+
+MAX_EDITS = int(os.getenv("RESUME_DELTA_MAX_EDITS", "25"))
+# A replacement may grow a block to this many times its size (plus some slack)
+MAX_GROWTH = 3.0
+EDIT_OPS = ("replace", "insert_after", "delete")
+
+_metrics_lock = threading.Lock()
+metrics = {"delta_applied": 0, "delta_fallbacks": 0, "edits_applied": 0}
+callback("vrjob_resume_delta_total", "Delta-mode customizations by outcome",
+         lambda: {"applied": metrics["delta_applied"], "fallback": metrics["delta_fallbacks"]},
+         ("outcome",), kind="counter")
+callback("vrjob_resume_delta_edits_total", "Section edits applied", lambda: metrics["edits_applied"], kind="counter")
+
+
+class DeltaError(ValueError):
+    """The model's edits could not be parsed, validated or applied"""
+
+
+def record(outcome: str, edits: int = 0):
+    with _metrics_lock:
+        metrics[outcome] += 1
+        metrics["edits_applied"] += edits
+
+
+def labelled_resume(resume: str, job_description: str, budget: int = RESUME_TOKEN_BUDGET,
+                    model: str = "gpt-4") -> Tuple[str, Dict[str, str]]:
+    """
+    (prompt text, {block id: block text}) for the blocks that fit the token
+    budget. Ids are "<section>.<block>" over the whole resume so they stay
+    valid when applying edits to the full text.
+    """
+    sections = split_sections(resume)
+    if count_tokens(resume, model) <= budget:
+        chosen = {(si, bi) for si, s in enumerate(sections) for bi in range(len(s["blocks"]))}
+    else:
+        chosen = select_blocks(sections, job_description, budget, model)
+
+    out, blocks = [], {}
+    for si, section in enumerate(sections):
+        ids = [bi for bi in range(len(section["blocks"])) if (si, bi) in chosen]
+        if not ids:
+            continue
+        if section["heading"]:
+            out.append(f"## {section['heading']}")
+        for bi in ids:
+            block_id = f"{si}.{bi}"
+            blocks[block_id] = section["blocks"][bi]
+            out.append(f"[{block_id}] {section['blocks'][bi]}")
+    return "\n".join(out), blocks
+
+
+def _json_object(raw: str) -> dict:
+    text = (raw or "").strip()
+    # Tolerate ```json fences and chatter around the object
+    fenced = re.search(r"```(?:json)?\s*(.*?)```", text, re.DOTALL)
+    if fenced:
+        text = fenced.group(1)
+    start, end = text.find("{"), text.rfind("}")
+    if start < 0 or end < start:
+        raise DeltaError("no JSON object in response")
+    try:
+        return json.loads(text[start:end + 1])
+    except ValueError as e:
+        raise DeltaError(f"invalid JSON: {e}")
+
+
+def parse_edits(raw: str, blocks: Dict[str, str]) -> List[Dict]:
+    """Validated edits from a model response. ``blocks`` are the ids the model was shown."""
+    payload = _json_object(raw)
+    edits = payload.get("edits") if isinstance(payload, dict) else None
+    if not isinstance(edits, list):
+        raise DeltaError("'edits' must be a list")
+    if len(edits) > MAX_EDITS:
+        raise DeltaError(f"{len(edits)} edits exceeds the limit of {MAX_EDITS}")
+
+    seen = set()
+    validated = []
+    for edit in edits:
+        if not isinstance(edit, dict):
+            raise DeltaError("edit must be an object")
+        op, block_id, text = edit.get("op"), str(edit.get("id", "")), edit.get("text")
+        if op not in EDIT_OPS:
+            raise DeltaError(f"unknown op {op!r}")
+        if block_id not in blocks:
+            raise DeltaError(f"unknown block id {block_id!r}")
+        if op != "insert_after":
+            if block_id in seen:
+                raise DeltaError(f"block {block_id} edited twice")
+            seen.add(block_id)
+        if op == "delete":
+            validated.append({"op": op, "id": block_id})
+            continue
+        if not isinstance(text, str) or not text.strip():
+            raise DeltaError(f"{op} on {block_id} has no text")
+        text = text.strip("\n")
+        if len(text) > MAX_GROWTH * len(blocks[block_id]) + 200:
+            raise DeltaError(f"{op} on {block_id} is implausibly long")
+        validated.append({"op": op, "id": block_id, "text": text})
+
+    if len({e["id"] for e in validated if e["op"] == "delete"}) >= len(blocks):
+        raise DeltaError("edits delete every block")
+    return validated
+
+
+def apply_edits(resume: str, edits: List[Dict]) -> str:
+    """The base resume with ``edits`` applied; untouched lines are kept as-is"""
+    lines = resume.splitlines()
+    spans = {
+        f"{si}.{bi}": span
+        for si, section in enumerate(section_layout(lines))
+        for bi, span in enumerate(section["blocks"])
+    }
+    replace, inserts = {}, {}
+    for edit in edits:
+        if edit["id"] not in spans:
+            raise DeltaError(f"unknown block id {edit['id']!r}")
+        start = spans[edit["id"]][0]
+        if edit["op"] == "insert_after":
+            inserts.setdefault(edit["id"], []).append(edit["text"])
+        else:
+            replace[start] = (edit["id"], edit.get("text"))
+
+    ends = {end: block_id for block_id, (_, end) in spans.items()}
+    out, skip_until = [], -1
+    for i in range(len(lines) + 1):
+        if i in ends and ends[i] in inserts:
+            out.extend(inserts[ends[i]])
+        if i == len(lines):
+            break
+        if i < skip_until:
+            continue
+        if i in replace:
+            block_id, text = replace[i]
+            skip_until = spans[block_id][1]
+            if text is not None:
+                out.append(text)
+            continue
+        out.append(lines[i])
+    return "\n".join(out)
@@ -0,0 +1,53 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+
+class ApplicationItem(BaseModel):
+    id: int
+    job_id: int
+    resume_version_id: int
+    status: str
+    rejection_reason: Optional[str] = None
+    last_status_update: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    title: str
+    company: str
+    location: str
+    source: str
+    url: str
+
+class JobItem(BaseModel):
+    id: int
+    title: str
+    company: str
+    location: str
+    source: str
+    url: str
+    posted_date: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+
+class ResumeVersionItem(BaseModel):
+    id: int
+    base_resume_id: int
+    job_id: int
+    created_at: Optional[datetime] = None
+
+class ApplicationPage(BaseModel):
+    items: List[ApplicationItem]
+    next_cursor: Optional[str] = None  # pass back as ?cursor= for the next page
+
+class JobPage(BaseModel):
+    items: List[JobItem]
+    next_cursor: Optional[str] = None
+
+class ResumeVersionPage(BaseModel):
+    items: List[ResumeVersionItem]
+    next_cursor: Optional[str] = None
+
+class JobSearchItem(JobItem):
+    score: float
+    snippet: Optional[str] = None  # description excerpt, matches in [brackets]
+
+class JobSearchPage(BaseModel):
+    items: List[JobSearchItem]
+    next_offset: Optional[int] = None
@@ -0,0 +1,205 @@
+from typing import List, Dict, Optional, Tuple
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from ..users.models import Job, JobApplication
+from ..utils.dates import as_utc, utcnow
+from .stats import record_status_transitions
+import re
+
+# (phrase, email status, rejection reason). Checked as one compiled regex.
+STATUS_PHRASES = [
+    ("rejection", "rejected", "not_selected"),
+    ("unfortunately", "rejected", "not_selected"),
+    ("not moving forward", "rejected", "not_selected"),
+    ("decided not to proceed", "rejected", "not_selected"),
+    ("other candidates", "rejected", "other_candidates"),
+    ("position has been filled", "rejected", "position_filled"),
+    ("application received", "received", None),
+    ("thank you for applying", "received", None),
+    ("thanks for applying", "received", None),
+    ("interview", "interview", None),
+    ("next steps", "interview", None),
+]
+# When a subject matches several statuses the first one listed here wins
+STATUS_PRIORITY = ("rejected", "received", "interview")
+
+# JobApplication status an email status moves an application to
+APPLICATION_STATUS = {"received": "seen", "interview": "interview", "rejected": "rejected"}
+# Transitions only move forward; 'ghosted' is revived by any reply
+STATUS_RANK = {"applied": 0, "ghosted": 0, "seen": 1, "interview": 2, "rejected": 3}
+
+# Domain of the (last) address in a From header: "Jobs <jobs@mail.stripe.com>" -> mail.stripe.com
+SENDER_DOMAIN = re.compile(r"@([a-z0-9.-]+)>?\s*$")
+COMPANY_SUFFIXES = re.compile(r"\b(inc|llc|ltd|corp|corporation|co|company|gmbh|plc)\b\.?", re.IGNORECASE)
+# Mail infrastructure domains that say nothing about the employer
+GENERIC_SENDER_LABELS = {"gmail", "mail", "email", "greenhouse", "lever", "workday", "myworkday",
+                         "smartrecruiters", "ashbyhq", "icims", "jobvite", "notifications", "noreply",
+                         "careers", "jobs", "recruiting", "talent", "hr"}
+
+
+class StatusClassifier:
+    """All status phrases compiled into a single alternation, scanned once per subject"""
+
+    def __init__(self, phrases=STATUS_PHRASES):
+        self.phrases = phrases
+        self.pattern = re.compile(
+            "|".join(f"(?P<p{i}>{re.escape(phrase)})" for i, (phrase, _, _) in enumerate(phrases)),
+            re.IGNORECASE,
+        )
+        self.priority = {status: rank for rank, status in enumerate(STATUS_PRIORITY)}
+
+    def classify(self, subject: str) -> Tuple[Optional[str], Optional[str]]:
+        """(email status, rejection reason) for a subject, or (None, None)"""
+        best = None
+        for match in self.pattern.finditer(subject or ""):
+            _, status, reason = self.phrases[int(match.lastgroup[1:])]
+            if best is None or self.priority[status] < self.priority[best[0]]:
+                best = (status, reason)
+                if self.priority[status] == 0:
+                    break
+        return best or (None, None)
+
+
+def company_phrase(name: str) -> str:
+    """Lower-cased company name without legal suffixes or punctuation, e.g. 'Goldman Sachs & Co.' -> 'goldman sachs'"""
+    name = COMPANY_SUFFIXES.sub("", (name or "").lower())
+    return re.sub(r"[^a-z0-9]+", " ", name).strip()
+
+
+def normalize_company(name: str) -> str:
+    """Company key as it appears in a sender domain, e.g. 'goldmansachs'"""
+    return company_phrase(name).replace(" ", "")
+
+
+def sender_labels(sender: str) -> List[str]:
+    """Candidate employer labels from a From header, e.g. jobs@mail.stripe.com -> ['stripe']"""
+    match = SENDER_DOMAIN.search((sender or "").lower())
+    if match is None:
+        return []
+    labels = match.group(1).split(".")[:-1]  # drop the TLD
+    return [label for label in labels if label and label not in GENERIC_SENDER_LABELS]
+
+
+class ApplicationIndex:
+    """
+    Open applications of one user keyed by normalized company, with every
+    company name indexed by its words for subject matching.
+    """
+
+    def __init__(self, rows: List[Tuple]):
+        # rows: (application id, status, rejection_reason, last_status_update, created_at, company).
+        # Timestamps are kept aware UTC, like the email dates they are compared with.
+        self.applications = {}
+        self.by_company: Dict[str, List[int]] = {}
+        self.phrases: Dict[str, str] = {}  # company phrase -> company key
+        for app_id, status, reason, last_update, created_at, company in rows:
+            key = normalize_company(company)
+            if not key:
+                continue
+            self.phrases[company_phrase(company)] = key
+            self.applications[app_id] = {
+                "status": status, "rejection_reason": reason,
+                "last_status_update": as_utc(last_update), "created_at": as_utc(created_at),
+            }
+            self.by_company.setdefault(key, []).append(app_id)
+        # Newest application first, so an email lands on the latest one for a company
+        for ids in self.by_company.values():
+            ids.sort(reverse=True)
+
+        # Subjects are matched by looking up their word n-grams: one dict hit
+        # per n-gram, however many companies the user applied to
+        self.max_words = max((len(phrase.split()) for phrase in self.phrases), default=0)
+
+    @classmethod
+    def for_user(cls, db: Session, user_id: int) -> "ApplicationIndex":
+        rows = (
+            db.query(JobApplication.id, JobApplication.status, JobApplication.rejection_reason,
+                     JobApplication.last_status_update, JobApplication.created_at, Job.company)
+            .join(Job, JobApplication.job_id == Job.id)
+            .filter(JobApplication.user_id == user_id, JobApplication.status != "rejected")
+            .all()
+        )
+        return cls(rows)
+
+    def match(self, sender: str, subject: str) -> Optional[int]:
+        """Application id an email refers to: sender domain first, then company names in the subject"""
+        for label in sender_labels(sender):
+            ids = self.by_company.get(label)
+            if ids:
+                return ids[0]
+        words = re.sub(r"[^a-z0-9]+", " ", (subject or "").lower()).split()
+        count = len(words)
+        # Leftmost company name in the subject, the longest one where several start
+        for start in range(count):
+            for end in range(min(count, start + self.max_words), start, -1):
+                key = self.phrases.get(" ".join(words[start:end]))
+                if key is not None:
+                    return self.by_company[key][0]
+        return None
+
+
+def _email_time(value: str) -> datetime:
+    """Aware UTC time of a Date header; a header without a zone is taken as UTC"""
+    try:
+        return as_utc(parsedate_to_datetime(value))
+    except (TypeError, ValueError):
+        return utcnow()
+
+
+_classifier = StatusClassifier()
+
+
+def classify_subject(subject: str) -> Optional[str]:
+    return _classifier.classify(subject)[0]
+
+
+def reconcile_statuses(db: Session, user_id: int, email_logs: List[Dict],
+                       classifier: StatusClassifier = _classifier) -> int:
+    """
+    Apply the status changes found in ``email_logs`` (as returned by
+    EmailScanner.scan_emails) to the user's applications with one bulk
+    UPDATE, keeping user_stats in step. Returns the number of applications
+    updated. The caller commits.
+    """
+    index = ApplicationIndex.for_user(db, user_id)
+    if not index.applications:
+        return 0
+
+    # Only status mails are dated, each once, and applied oldest first
+    status_logs = []
+    for log in email_logs:
+        status, reason = classifier.classify(log.get("subject", ""))
+        new_status = APPLICATION_STATUS.get(status)
+        if new_status:
+            status_logs.append((_email_time(log.get("date", "")), new_status, reason, log))
+    status_logs.sort(key=lambda entry: entry[0])
+
+    changes = {}
+    for when, new_status, reason, log in status_logs:
+        app_id = index.match(log.get("from", ""), log.get("subject", ""))
+        if app_id is None:
+            continue
+        current = changes.get(app_id, index.applications[app_id])
+        if STATUS_RANK[new_status] <= STATUS_RANK.get(current["status"], 0):
+            continue
+        changes[app_id] = {
+            "status": new_status,
+            "rejection_reason": reason if new_status == "rejected" else current["rejection_reason"],
+            "last_status_update": when,
+            "created_at": current["created_at"],
+        }
+
+    if not changes:
+        return 0
+
+    db.execute(update(JobApplication), [
+        {"id": app_id, "status": change["status"], "rejection_reason": change["rejection_reason"],
+         "last_status_update": change["last_status_update"]}
+        for app_id, change in changes.items()
+    ])
+    record_status_transitions(db, user_id, [
+        (index.applications[app_id], change) for app_id, change in changes.items()
+    ])
+    return len(changes)
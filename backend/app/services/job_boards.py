@@ -1,18 +1,76 @@
-from typing import List, Dict
+from typing import List, Dict, Optional, Callable, Iterable
 import requests
-from bs4 import BeautifulSoup
-from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
 from ..users.models import Job
+from .job_ingest import ingest_jobs
 from sqlalchemy.orm import Session
-import json
+from ..telemetry import counter, histogram, timed
+import contextvars
+import threading
+import time
 import os
 
+# Seconds a single board may take before its results are dropped
+BOARD_TIMEOUT = float(os.getenv("JOB_BOARD_TIMEOUT", "8"))
+# Seconds the whole fan-out may take; boards still running are abandoned
+SEARCH_DEADLINE = float(os.getenv("JOB_SEARCH_DEADLINE", "12"))
+# Connect timeout used for every board request
+CONNECT_TIMEOUT = 3.05
+# Board origins; overridden to point at a local fake (backend/benchmarks/fake_job_boards.py)
+REMOTEOK_URL = os.getenv("REMOTEOK_URL", "https://remoteok.com").rstrip("/")
+WEWORKREMOTELY_URL = os.getenv("WEWORKREMOTELY_URL", "https://weworkremotely.com").rstrip("/")
+
+# Boards whose search takes the user's location; the others only take keywords
+LOCATION_BOARDS = ("linkedin",)
+
+BOARD_FETCH_SECONDS = histogram("vrjob_board_fetch_duration_seconds", "Time for one job board adapter call",
+                                ("board",), stage="board")
+BOARD_TIMEOUTS = counter("vrjob_board_timeouts_total", "Board searches abandoned at their deadline", ("board",))
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """Process-wide keep-alive session shared by all board adapters"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16, max_retries=0)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
 class JobBoardService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, board_timeout: float = BOARD_TIMEOUT,
+                 search_deadline: float = SEARCH_DEADLINE,
+                 session: Optional[requests.Session] = None,
+                 board_timeouts: Optional[Dict[str, float]] = None):
         self.db = db
+        self.board_timeout = board_timeout
+        # Per-board overrides of board_timeout, keyed by board name
+        self.board_timeouts = board_timeouts or {}
+        self.search_deadline = search_deadline
+        self.session = session or get_http_session()
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
+        # Boards that missed their deadline on the last fan-out
+        self.timed_out_boards: List[str] = []
+
+    def _timeout(self, board: str) -> float:
+        """Read timeout of one board: its override, else board_timeout"""
+        return self.board_timeouts.get(board, self.board_timeout)
+
+    def _get(self, url: str, board: str) -> requests.Response:
+        return self.session.get(url, headers=self.headers,
+                                timeout=(CONNECT_TIMEOUT, self._timeout(board)))
     
     def search_linkedin(self, keywords: str, location: str = None) -> List[Dict]:
         """Search LinkedIn jobs using their API"""
@@ -55,8 +113,8 @@ class JobBoardService:
     def search_remoteok(self, keywords: str) -> List[Dict]:
         """Search RemoteOK jobs"""
         try:
-            url = f"https://remoteok.com/api?tags={keywords}"
-            response = requests.get(url, headers=self.headers)
+            url = f"{REMOTEOK_URL}/api?tags={keywords}"
+            response = self._get(url, "remoteok")
             data = response.json()
             
             jobs = []
@@ -76,9 +134,12 @@ class JobBoardService:
 
     def search_weworkremotely(self, keywords: str) -> List[Dict]:
         """Search WeWorkRemotely jobs"""
+        # Imported on first use; bs4 is only needed by this adapter
+        from bs4 import BeautifulSoup
+
         try:
-            url = f"https://weworkremotely.com/remote-jobs/search?term={keywords}"
-            response = requests.get(url, headers=self.headers)
+            url = f"{WEWORKREMOTELY_URL}/remote-jobs/search?term={keywords}"
+            response = self._get(url, "weworkremotely")
             soup = BeautifulSoup(response.text, 'html.parser')
             
             jobs = []
@@ -88,7 +149,7 @@ class JobBoardService:
                     "company": job.find('span', class_='company').text,
                     "description": job.find('span', class_='description').text,
                     "location": "Remote",
-                    "url": f"https://weworkremotely.com{job.find('a')['href']}",
+                    "url": f"{WEWORKREMOTELY_URL}{job.find('a')['href']}",
                     "posted_date": datetime.now().isoformat()
                 })
             return jobs
@@ -96,30 +157,83 @@ class JobBoardService:
             print(f"Error searching WeWorkRemotely: {str(e)}")
             return []
 
+    def _board_adapters(self, keywords: str, location: str = None) -> Dict[str, Callable[[], List[Dict]]]:
+        return {
+            "linkedin": lambda: self.search_linkedin(keywords, location),
+            "wellfound": lambda: self.search_wellfound(keywords),
+            "remoteok": lambda: self.search_remoteok(keywords),
+            "weworkremotely": lambda: self.search_weworkremotely(keywords),
+        }
+
+    @staticmethod
+    def _timed_adapter(name: str, fn: Callable[[], List[Dict]]) -> List[Dict]:
+        with timed(BOARD_FETCH_SECONDS, board=name):
+            return fn()
+
+    def fetch_all_boards(self, keywords: str, location: str = None,
+                         boards: Optional[Iterable[str]] = None) -> List[Dict]:
+        """
+        Run every board adapter (or only ``boards``) concurrently and return
+        the postings that arrived before their deadline. A board that is still
+        running when its own deadline (or the overall search deadline) passes
+        is skipped, so the call returns partial results instead of waiting on
+        the slowest board.
+        """
+        adapters = self._board_adapters(keywords, location)
+        if boards is not None:
+            wanted = set(boards)
+            adapters = {name: fn for name, fn in adapters.items() if name in wanted}
+        if not adapters:
+            return []
+        started = time.monotonic()
+        deadlines = {
+            name: started + min(self._timeout(name), self.search_deadline)
+            for name in adapters
+        }
+
+        all_jobs = []
+        self.timed_out_boards = []
+        executor = ThreadPoolExecutor(max_workers=len(adapters), thread_name_prefix="job-board")
+        try:
+            # Each adapter runs in a copy of this context so a request profile sees its timing
+            pending = {
+                executor.submit(contextvars.copy_context().run, self._timed_adapter, name, fn): name
+                for name, fn in adapters.items()
+            }
+            while pending:
+                remaining = min(deadlines[name] for name in pending.values()) - time.monotonic()
+                if remaining > 0:
+                    done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                else:
+                    done = [future for future in pending if future.done()]
+                for future in done:
+                    name = pending.pop(future)
+                    try:
+                        jobs = future.result()
+                    except Exception as e:
+                        print(f"Error searching {name}: {str(e)}")
+                        continue
+                    for job in jobs:
+                        job.setdefault("source", name)
+                    all_jobs.extend(jobs)
+
+                now = time.monotonic()
+                for future, name in list(pending.items()):
+                    if now >= deadlines[name]:
+                        del pending[future]
+                        future.cancel()
+                        self.timed_out_boards.append(name)
+                        BOARD_TIMEOUTS.inc(board=name)
+                        print(f"{name} missed its {deadlines[name] - started:.1f}s deadline, returning partial results")
+        finally:
+            # Never block on stragglers; their threads finish in the background
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return all_jobs
+
     def search_all_boards(self, keywords: str, location: str = None) -> List[Job]:
         """Search all job boards and save results to database"""
-        all_jobs = []
-        
-        # Search each job board
-        all_jobs.extend(self.search_linkedin(keywords, location))
-        all_jobs.extend(self.search_wellfound(keywords))
-        all_jobs.extend(self.search_remoteok(keywords))
-        all_jobs.extend(self.search_weworkremotely(keywords))
-        
-        # Save to database
-        saved_jobs = []
-        for job_data in all_jobs:
-            job = Job(
-                title=job_data["title"],
-                company=job_data["company"],
-                description=job_data["description"],
-                location=job_data["location"],
-                source=job_data.get("source", "unknown"),
-                url=job_data["url"],
-                posted_date=datetime.fromisoformat(job_data["posted_date"])
-            )
-            self.db.add(job)
-            saved_jobs.append(job)
+        all_jobs = self.fetch_all_boards(keywords, location)
         
-        self.db.commit()
-        return saved_jobs 
\ No newline at end of file
+        # Upsert on (source, url) so repeated searches reuse existing rows
+        return ingest_jobs(self.db, all_jobs)
@@ -0,0 +1,267 @@
+"""
+Cross-board near-duplicate detection.
+
+The same role is often posted on several boards under different URLs with
+slightly different text. Each job gets a MinHash signature over its title
+words, company words and description word shingles. The signature is cut
+into LSH bands, and each band is stored as a bucket key in
+job_lsh_buckets. A new job's duplicate candidates are the jobs sharing a
+bucket with it: one indexed ``bucket IN (...)`` lookup, however many jobs
+are stored. A candidate is a duplicate when the signatures estimate a
+Jaccard similarity of at least ``DUPLICATE_THRESHOLD`` and the titles
+and companies agree. The job then joins the candidate's cluster; otherwise it starts its
+own. ``jobs.cluster_id`` is the id of the cluster's first job.
+
+Ingest fingerprints new jobs (job_ingest.upsert_jobs). The pipeline tailors
+and applies once per cluster (job_search.py).
+
+    python -m backend.app.services.job_dedup backfill   # fingerprint jobs stored before clustering
+"""
+from typing import Dict, List, Sequence, Set, Tuple
+from collections import defaultdict
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+import numpy as np
+import os
+import zlib
+
+from ..users.models import Job, JobApplication, JobFingerprint, JobLshBucket
+from ..utils.text import word_tokens
+from .job_ingest import insert_ignoring_conflicts, INGEST_BATCH_SIZE
+
+# Estimated Jaccard similarity of two postings' features to count as one role
+DUPLICATE_THRESHOLD = float(os.getenv("DUPLICATE_THRESHOLD", "0.7"))
+# Title and company word overlap also required, so one company's roles
+# sharing a boilerplate description, or one role at two companies, stay apart
+TITLE_THRESHOLD = 0.6
+COMPANY_THRESHOLD = 0.5
+
+# 16 bands of 4 rows: pairs at Jaccard 0.7 share a bucket with p ~ 0.98
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+
+# Signatures and bucket keys are stored: these constants must never change
+_rng = np.random.RandomState(20261018)
+PERM_A = _rng.randint(0, 2 ** 64, NUM_PERM, dtype=np.uint64) | np.uint64(1)
+PERM_B = _rng.randint(0, 2 ** 64, NUM_PERM, dtype=np.uint64)
+BAND_MIX = _rng.randint(0, 2 ** 64, ROWS, dtype=np.uint64) | np.uint64(1)
+BAND_SALT = _rng.randint(0, 2 ** 64, BANDS, dtype=np.uint64)
+SHIFT_32 = np.uint64(32)
+
+# Words that vary between boards without changing the role
+TITLE_SYNONYMS = {"sr": "senior", "jr": "junior", "eng": "engineer", "dev": "developer", "swe": "engineer"}
+# Levels of one role at one company are separate openings
+SENIORITY = {"intern", "junior", "senior", "staff", "lead", "principal", "head"}
+COMPANY_SUFFIXES = {"inc", "llc", "ltd", "corp", "co", "corporation", "gmbh", "limited"}
+
+
+def _words(text: str) -> List[str]:
+    return [word.rstrip(".") for word in word_tokens(text) if word.rstrip(".")]
+
+
+def title_words(title: str) -> Set[str]:
+    return {TITLE_SYNONYMS.get(word, word) for word in _words(title)}
+
+
+def company_words(company: str) -> Set[str]:
+    return {word for word in _words(company) if word not in COMPANY_SUFFIXES}
+
+
+def features(title: str, company: str, description: str) -> Set[str]:
+    """Title words, company words and description shingles, tagged by field"""
+    found = {f"t:{word}" for word in title_words(title)}
+    found.update(f"c:{word}" for word in company_words(company))
+    words = _words(description)
+    found.update(f"d:{' '.join(words[i:i + SHINGLE_SIZE])}" for i in range(max(len(words) - SHINGLE_SIZE + 1, 0)))
+    if 0 < len(words) < SHINGLE_SIZE:
+        found.add(f"d:{' '.join(words)}")
+    return found
+
+
+def signatures(feature_sets: Sequence[Set[str]]) -> np.ndarray:
+    """
+    (jobs x NUM_PERM) uint32 MinHash signatures. Every feature of the batch
+    is hashed once; each permutation is then one vectorized pass with a
+    per-job minimum. The permutations are multiply-shift hashes: the top 32
+    bits of ``a * x + b`` modulo 2**64. Feature sets must not be empty.
+    """
+    hashes = np.fromiter(
+        (zlib.crc32(feature.encode()) for feature_set in feature_sets for feature in feature_set),
+        dtype=np.uint64,
+    )
+    starts = np.cumsum([0] + [len(feature_set) for feature_set in feature_sets[:-1]])
+    result = np.empty((len(feature_sets), NUM_PERM), dtype=np.uint32)
+    for i in range(NUM_PERM):
+        permuted = (hashes * PERM_A[i] + PERM_B[i]) >> SHIFT_32
+        result[:, i] = np.minimum.reduceat(permuted, starts)
+    return result
+
+
+def bucket_keys(signature_rows: np.ndarray) -> np.ndarray:
+    """(jobs x BANDS) int64 keys, one per band, salted so bands never collide with each other"""
+    bands = signature_rows.reshape(len(signature_rows), BANDS, ROWS).astype(np.uint64)
+    # uint64 arithmetic wraps, which is what a hash wants
+    return ((bands * BAND_MIX).sum(axis=2) + BAND_SALT).view(np.int64)
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    return float(np.count_nonzero(a == b)) / NUM_PERM
+
+
+def _jaccard(a: Set[str], b: Set[str]) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def _same_role(words: Set[str], other: Set[str]) -> bool:
+    return words & SENIORITY == other & SENIORITY and _jaccard(words, other) >= TITLE_THRESHOLD
+
+
+def _stored_candidates(db: Session, keys: Set[int]) -> Dict[int, List[int]]:
+    """bucket -> job ids already stored under it"""
+    found = defaultdict(list)
+    keys = list(keys)
+    for start in range(0, len(keys), INGEST_BATCH_SIZE):
+        rows = db.execute(
+            select(JobLshBucket.bucket, JobLshBucket.job_id)
+            .where(JobLshBucket.bucket.in_(keys[start:start + INGEST_BATCH_SIZE]))
+        )
+        for bucket, job_id in rows:
+            found[bucket].append(job_id)
+    return found
+
+
+def _load_candidates(db: Session, job_ids: Set[int]) -> Dict[int, Tuple[np.ndarray, int, Set[str], Set[str]]]:
+    """job id -> (signature, cluster id, title words, company words)"""
+    loaded = {}
+    job_ids = list(job_ids)
+    for start in range(0, len(job_ids), INGEST_BATCH_SIZE):
+        rows = db.execute(
+            select(Job.id, Job.cluster_id, Job.title, Job.company, JobFingerprint.signature)
+            .join(JobFingerprint, JobFingerprint.job_id == Job.id)
+            .where(Job.id.in_(job_ids[start:start + INGEST_BATCH_SIZE]))
+        )
+        for job_id, cluster_id, title, company, signature in rows:
+            loaded[job_id] = (np.frombuffer(signature, dtype=np.uint32), cluster_id or job_id,
+                              title_words(title), company_words(company))
+    return loaded
+
+
+def assign_clusters(db: Session, jobs: Sequence[Tuple[int, str, str, str]]) -> Dict[int, int]:
+    """
+    Fingerprint ``jobs`` ((id, title, company, description), in ingest
+    order) and put each in the cluster of its closest stored or earlier
+    duplicate, or its own. Writes job_fingerprints, job_lsh_buckets and
+    jobs.cluster_id; returns job id -> cluster id. The caller commits.
+    """
+    feature_sets = [features(title, company, description) for _, title, company, description in jobs]
+    # A job without a single word has nothing to compare; it is its own cluster
+    clusters = {job_id: job_id for (job_id, *_), found in zip(jobs, feature_sets) if not found}
+    jobs = [job for job, found in zip(jobs, feature_sets) if found]
+    feature_sets = [found for found in feature_sets if found]
+
+    if jobs:
+        sigs = signatures(feature_sets)
+        keys = bucket_keys(sigs)
+        stored = _stored_candidates(db, set(keys.ravel().tolist()))
+        known = _load_candidates(db, {job_id for ids in stored.values() for job_id in ids})
+        batch_buckets = defaultdict(list)
+
+        for row, (job_id, title, company, _) in enumerate(jobs):
+            words, employer = title_words(title), company_words(company)
+            candidates = {}
+            for key in keys[row].tolist():
+                for other in stored.get(key, ()):
+                    if other in known and other != job_id:
+                        candidates[other] = known[other]
+                for other in batch_buckets.get(key, ()):
+                    candidates[other] = known[other]
+            best, best_score = None, DUPLICATE_THRESHOLD
+            for other, (signature, cluster_id, other_words, other_employer) in candidates.items():
+                score = similarity(sigs[row], signature)
+                if score >= best_score and _same_role(words, other_words) \
+                        and _jaccard(employer, other_employer) >= COMPANY_THRESHOLD:
+                    best, best_score = cluster_id, score
+            clusters[job_id] = best or job_id
+            # Later jobs in this batch can match this one
+            known[job_id] = (sigs[row], clusters[job_id], words, employer)
+            for key in keys[row].tolist():
+                batch_buckets[key].append(job_id)
+
+        fingerprint_rows = [{"job_id": job_id, "signature": sigs[row].tobytes()}
+                            for row, (job_id, *_) in enumerate(jobs)]
+        bucket_rows = [{"bucket": key, "job_id": job_id}
+                       for row, (job_id, *_) in enumerate(jobs) for key in set(keys[row].tolist())]
+        for start in range(0, len(fingerprint_rows), INGEST_BATCH_SIZE):
+            insert_ignoring_conflicts(db, JobFingerprint, fingerprint_rows[start:start + INGEST_BATCH_SIZE],
+                                      ["job_id"])
+        for start in range(0, len(bucket_rows), INGEST_BATCH_SIZE):
+            insert_ignoring_conflicts(db, JobLshBucket, bucket_rows[start:start + INGEST_BATCH_SIZE],
+                                      ["bucket", "job_id"])
+
+    if clusters:
+        # ORM bulk UPDATE by primary key: one executemany
+        db.execute(update(Job), [{"id": job_id, "cluster_id": cluster_id} for job_id, cluster_id in clusters.items()])
+    return clusters
+
+
+def collapse_duplicates(db: Session, user_id: int, jobs: List[Job]) -> Tuple[List[Job], List[Tuple[Job, str]]]:
+    """
+    One job per cluster, in search order, leaving out clusters the user has
+    already applied to; the rest are returned with the reason they were
+    skipped. Jobs not yet fingerprinted are their own cluster.
+    """
+    clusters = {job.id: job.cluster_id or job.id for job in jobs}
+    applied = {}
+    if jobs:
+        rows = db.execute(
+            select(Job.cluster_id, Job.id)
+            .join(JobApplication, JobApplication.job_id == Job.id)
+            .where(JobApplication.user_id == user_id, Job.cluster_id.in_(set(clusters.values())))
+        )
+        applied = {cluster_id: job_id for cluster_id, job_id in rows}
+
+    kept, skipped, first = [], [], {}
+    for job in jobs:
+        cluster_id = clusters[job.id]
+        if cluster_id in applied:
+            skipped.append((job, f"Already applied to this role (job {applied[cluster_id]})"))
+        elif cluster_id in first:
+            skipped.append((job, f"Duplicate of job {first[cluster_id]}"))
+        else:
+            first[cluster_id] = job.id
+            kept.append(job)
+    return kept, skipped
+
+
+def backfill_clusters(db: Session, batch_size: int = INGEST_BATCH_SIZE) -> int:
+    """Fingerprint jobs stored before clustering, oldest first. Returns the number of jobs filled."""
+    filled = 0
+    while True:
+        batch = db.execute(
+            select(Job.id, Job.title, Job.company, Job.description)
+            .where(Job.cluster_id.is_(None))
+            .order_by(Job.id)
+            .limit(batch_size)
+        ).all()
+        if not batch:
+            return filled
+        assign_clusters(db, [tuple(row) for row in batch])
+        db.commit()
+        filled += len(batch)
+
+
+if __name__ == "__main__":
+    import sys
+    from ..db.database import SessionLocal
+
+    if sys.argv[1:] != ["backfill"]:
+        print("usage: python -m backend.app.services.job_dedup backfill")
+        sys.exit(2)
+    session = SessionLocal()
+    try:
+        print(f"✅ Fingerprinted {backfill_clusters(session)} jobs")
+    finally:
+        session.close()
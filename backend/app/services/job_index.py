@@ -0,0 +1,130 @@
+"""
+Full-text search over the stored jobs corpus, without going back out to
+the boards.
+
+The index is created by migration 0004: an FTS5 table kept in sync by
+triggers on SQLite, a generated tsvector column with a GIN index on
+Postgres. Every word of the query must match (stemmed); results are
+ranked with bm25() / ts_rank_cd(), title matches weighing most.
+
+    python -m backend.app.services.job_index "python engineer" --source remoteok
+    python -m backend.app.services.job_index --rebuild     # refill jobs_fts (SQLite)
+"""
+from typing import Dict, List, Optional
+from datetime import datetime
+from sqlalchemy import column, func, literal_column, select, table, text
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from ..users.models import Job
+from ..utils.text import word_tokens
+
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+# Ranked results are paged by offset; deep pages are not worth ranking for
+MAX_SEARCH_OFFSET = 1000
+
+# bm25() weights for the FTS5 columns: title, company, description, location
+FTS_WEIGHTS = (10.0, 5.0, 1.0, 2.0)
+# Words of description context around the matches returned with each hit
+SNIPPET_WORDS = 16
+
+RESULT_COLUMNS = [
+    Job.id, Job.title, Job.company, Job.location, Job.source, Job.url, Job.posted_date, Job.created_at,
+]
+
+jobs_fts = table("jobs_fts", column("rowid"))
+
+
+def fts_query(q: str) -> str:
+    """
+    ``q`` as an FTS5 query requiring every word. Each word is quoted, so
+    FTS5 operators and punctuation in user input are matched as text.
+    """
+    words = [word.rstrip(".") for word in word_tokens(q)]
+    return " ".join('"' + word.replace('"', '""') + '"' for word in words if word)
+
+
+def search_query(dialect: str, q: str, source: Optional[str] = None, company: Optional[str] = None,
+                 location: Optional[str] = None, posted_after: Optional[datetime] = None) -> Select:
+    """Ranked matches for ``q``, best first, with a ``score`` (higher is better) and a ``snippet``"""
+    if dialect == "sqlite":
+        match = fts_query(q)
+        if not match:
+            raise ValueError("Search query has no words")
+        fts = literal_column("jobs_fts")
+        rank = func.bm25(fts, *FTS_WEIGHTS)
+        query = (
+            select(*RESULT_COLUMNS, (-rank).label("score"),
+                   func.snippet(fts, 2, "[", "]", "…", SNIPPET_WORDS).label("snippet"))
+            .select_from(jobs_fts.join(Job, Job.id == jobs_fts.c.rowid))
+            .where(fts.op("MATCH")(match))
+            .order_by(rank)
+        )
+    else:
+        if not word_tokens(q):
+            raise ValueError("Search query has no words")
+        tsquery = func.plainto_tsquery(literal_column("'english'::regconfig"), q)
+        vector = literal_column("jobs.search_vector")
+        rank = func.ts_rank_cd(vector, tsquery)
+        options = f"StartSel=[, StopSel=], MaxWords={SNIPPET_WORDS}, MinWords={SNIPPET_WORDS // 2}"
+        query = (
+            select(*RESULT_COLUMNS, rank.label("score"),
+                   func.ts_headline(literal_column("'english'::regconfig"), Job.description, tsquery,
+                                    options).label("snippet"))
+            .where(vector.op("@@")(tsquery))
+            .order_by(rank.desc())
+        )
+
+    if source is not None:
+        query = query.where(Job.source == source)
+    if company is not None:
+        query = query.where(func.lower(Job.company) == company.lower())
+    if location is not None:
+        query = query.where(func.lower(Job.location).contains(location.lower(), autoescape=True))
+    if posted_after is not None:
+        query = query.where(Job.posted_date >= posted_after)
+    return query.order_by(Job.id.desc())
+
+
+def search_jobs(db: Session, q: str, limit: int = DEFAULT_SEARCH_LIMIT, offset: int = 0,
+                **filters) -> List[Dict]:
+    query = search_query(db.get_bind().dialect.name, q, **filters).limit(limit).offset(offset)
+    return [dict(row._mapping) for row in db.execute(query)]
+
+
+def rebuild_index(db: Session):
+    """Refill jobs_fts from jobs, e.g. after rows were written with the triggers missing"""
+    if db.get_bind().dialect.name == "sqlite":
+        db.execute(text("INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild')"))
+        db.commit()
+    # Postgres: search_vector is a generated column and cannot drift
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    from ..db.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Search the stored jobs")
+    parser.add_argument("q", nargs="?")
+    parser.add_argument("--source")
+    parser.add_argument("--location")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--rebuild", action="store_true", help="refill the SQLite FTS index first")
+    args = parser.parse_args()
+
+    session = SessionLocal()
+    try:
+        if args.rebuild:
+            rebuild_index(session)
+            print("✅ Job search index rebuilt")
+        if args.q:
+            start = time.perf_counter()
+            hits = search_jobs(session, args.q, args.limit, source=args.source, location=args.location)
+            elapsed = time.perf_counter() - start
+            for hit in hits:
+                print(f"{hit['score']:7.2f}  {hit['title']} at {hit['company']} ({hit['location']}, {hit['source']})")
+            print(f"🔎 {len(hits)} results in {elapsed * 1000:.1f} ms")
+    finally:
+        session.close()
@@ -0,0 +1,185 @@
+from typing import List, Dict, Iterable, Tuple
+from datetime import datetime
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from ..users.models import Job, JobTerm
+from ..utils.text import normalize_url, normalize_source, tokenize
+
+# Rows per INSERT statement; keeps SQLite under its bound-parameter limit
+INGEST_BATCH_SIZE = 1000
+# URLs bound per IN (...) lookup; SQLite before 3.32 allows at most 999 parameters
+LOOKUP_CHUNK_SIZE = 900
+
+JOB_COLUMNS = ("url", "salary_range", "industry")
+
+
+def _parse_posted_date(value):
+    if not value or isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def job_row(posting: Dict) -> Dict:
+    """Turn a scraped posting dict into a row for the jobs table"""
+    # Every row carries the same keys so a batch can run as one executemany
+    row = {key: posting.get(key) for key in JOB_COLUMNS}
+    row["title"] = posting.get("title") or ""
+    row["company"] = posting.get("company") or ""
+    row["description"] = posting.get("description") or ""
+    row["location"] = posting.get("location") or "Remote"
+    row["source"] = normalize_source(posting.get("source"))
+    row["normalized_url"] = normalize_url(posting.get("url"))
+    row["posted_date"] = _parse_posted_date(posting.get("posted_date"))
+    row["visa_sponsorship"] = bool(posting.get("visa_sponsorship", False))
+    row["relocation_assistance"] = bool(posting.get("relocation_assistance", False))
+    return row
+
+
+def _dialect_insert(db: Session):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        return dialect_insert
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        return dialect_insert
+    return None
+
+
+def insert_ignoring_conflicts(db: Session, model, rows: List[Dict], index_elements: List[str]):
+    dialect_insert = _dialect_insert(db)
+    if dialect_insert is not None:
+        stmt = dialect_insert(model).on_conflict_do_nothing(index_elements=index_elements)
+    else:
+        # Other dialects: callers only pass rows they just checked are missing
+        stmt = insert(model)
+    db.execute(stmt, rows)
+
+
+def _lookup_ids(db: Session, keys: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], int]:
+    keys = set(keys)
+    urls = list({url for _, url in keys})
+    found = {}
+    for start in range(0, len(urls), LOOKUP_CHUNK_SIZE):
+        chunk = urls[start:start + LOOKUP_CHUNK_SIZE]
+        rows = db.query(Job.id, Job.source, Job.normalized_url).filter(Job.normalized_url.in_(chunk))
+        for job_id, source, url in rows:
+            if (source, url) in keys:
+                found[(source, url)] = job_id
+    return found
+
+
+def upsert_jobs(db: Session, postings: Iterable[Dict], batch_size: int = INGEST_BATCH_SIZE) -> List[int]:
+    """
+    Bulk ingest scraped postings keyed on (source, normalized url).
+
+    Keys already stored are resolved with one SELECT per batch; only the new
+    postings are written, with a dialect-native INSERT ... ON CONFLICT DO
+    NOTHING so a concurrent ingest of the same posting is harmless. Their
+    description tokens go to ``job_terms`` and their near-duplicate
+    fingerprints to ``job_fingerprints`` (services/job_dedup.py) in the
+    same transaction.
+
+    Returns the ``Job`` id of every posting, in input order, whether it was
+    just inserted or seen before. The caller commits.
+    """
+    rows = [job_row(p) for p in postings]
+    rows = [r for r in rows if r["normalized_url"]]
+    keys = [(r["source"], r["normalized_url"]) for r in rows]
+
+    # Collapse repeats within the input so each key is written once
+    unique_rows = list({key: row for key, row in zip(keys, rows)}.values())
+
+    ids = {}
+    for start in range(0, len(unique_rows), batch_size):
+        batch = unique_rows[start:start + batch_size]
+        batch_ids = _lookup_ids(db, [(r["source"], r["normalized_url"]) for r in batch])
+        new_rows = [r for r in batch if (r["source"], r["normalized_url"]) not in batch_ids]
+        if new_rows:
+            insert_ignoring_conflicts(db, Job, new_rows, ["source", "normalized_url"])
+            new_ids = _lookup_ids(db, [(r["source"], r["normalized_url"]) for r in new_rows])
+            _insert_terms(db, new_rows, new_ids)
+            _assign_clusters(db, new_rows, new_ids)
+            batch_ids.update(new_ids)
+        ids.update(batch_ids)
+
+    return [ids[key] for key in keys if key in ids]
+
+
+def _insert_terms(db: Session, rows: List[Dict], ids: Dict[Tuple[str, str], int]):
+    """Store each new job's description tokens so stats never re-split descriptions"""
+    term_rows = []
+    for row in rows:
+        job_id = ids.get((row["source"], row["normalized_url"]))
+        if job_id is None:
+            continue
+        term_rows.extend({"job_id": job_id, "term": term} for term in tokenize(row["description"]))
+    for start in range(0, len(term_rows), INGEST_BATCH_SIZE):
+        insert_ignoring_conflicts(db, JobTerm, term_rows[start:start + INGEST_BATCH_SIZE], ["job_id", "term"])
+
+
+def _assign_clusters(db: Session, rows: List[Dict], ids: Dict[Tuple[str, str], int]):
+    # Imported here: job_dedup pulls in numpy, which startup does not need
+    from .job_dedup import assign_clusters
+
+    jobs = []
+    for row in rows:
+        job_id = ids.get((row["source"], row["normalized_url"]))
+        if job_id is not None:
+            jobs.append((job_id, row["title"], row["company"], row["description"]))
+    if jobs:
+        assign_clusters(db, jobs)
+
+
+def backfill_job_terms(db: Session, batch_size: int = INGEST_BATCH_SIZE) -> int:
+    """Tokenize jobs stored before job_terms existed. Returns the number of jobs filled."""
+    filled = 0
+    while True:
+        batch = (
+            db.query(Job.id, Job.description)
+            .filter(~Job.terms.any())
+            .order_by(Job.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            return filled
+        # An empty description still gets a "" term so the job is not picked again
+        term_rows = [
+            {"job_id": job_id, "term": term}
+            for job_id, description in batch
+            for term in tokenize(description) or {""}
+        ]
+        for start in range(0, len(term_rows), INGEST_BATCH_SIZE):
+            insert_ignoring_conflicts(db, JobTerm, term_rows[start:start + INGEST_BATCH_SIZE], ["job_id", "term"])
+        db.commit()
+        filled += len(batch)
+
+
+def ingest_jobs(db: Session, postings: Iterable[Dict]) -> List[Job]:
+    """Upsert postings and return their ``Job`` rows in input order"""
+    ids = upsert_jobs(db, postings)
+    db.commit()
+    if not ids:
+        return []
+    jobs = {job.id: job for job in db.query(Job).filter(Job.id.in_(set(ids)))}
+    seen = set()
+    ordered = []
+    for job_id in ids:
+        if job_id not in seen:
+            seen.add(job_id)
+            ordered.append(jobs[job_id])
+    return ordered
+
+
+if __name__ == "__main__":
+    from ..db.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        print(f"Tokenized {backfill_job_terms(session)} jobs")
+    finally:
+        session.close()
@@ -1,36 +1,78 @@
-from typing import List, Dict
+from typing import List, Dict, Callable, Optional
 from sqlalchemy.orm import Session
 from ..users.models import User, Job, ResumeVersion, JobApplication
 from ..resume_agent import ResumeAgent
+from .job_ingest import ingest_jobs
+from .job_boards import JobBoardService
+from .stats import record_application, record_applications, record_resume_version
+from .llm_executor import LLMExecutor, get_llm_executor
+from .job_triage import triage_jobs, TRIAGE_TOP_K, TRIAGE_MIN_SCORE
+from .job_dedup import collapse_duplicates
+from ..telemetry import counter, histogram, timed
 from datetime import datetime
+import hashlib
+import os
 import random
 
+# Rows persisted per transaction by the pipeline; 0 writes a whole run in one
+PERSIST_CHUNK_SIZE = int(os.getenv("PIPELINE_PERSIST_CHUNK_SIZE", "0"))
+
+# Where search_jobs_for_user gets postings: "dummy" generates them, "boards"
+# fans out to the job boards (pointed at local fakes by the load suite)
+JOB_SOURCE = os.getenv("JOB_SOURCE", "dummy")
+
+# stage is "search", "dedup", "triage", "tailor" or "persist"
+PIPELINE_STAGE_SECONDS = histogram("vrjob_pipeline_stage_duration_seconds", "Time spent in each pipeline stage",
+                                   ("stage",), stage="pipeline")
+TRIAGED_JOBS = counter("vrjob_pipeline_triaged_jobs_total",
+                       "Postings kept for tailoring, skipped by triage or collapsed as duplicates",
+                       ("outcome",))
+
 class JobSearchService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, executor: LLMExecutor = None,
+                 unit_of_work: bool = True, chunk_size: int = PERSIST_CHUNK_SIZE,
+                 top_k: int = TRIAGE_TOP_K, min_score: float = TRIAGE_MIN_SCORE):
         self.db = db
-        self.resume_agent = ResumeAgent()
+        self.executor = executor or get_llm_executor()
+        # The agent charges the shared rate limit per API request it makes
+        self.resume_agent = ResumeAgent(limiter=self.executor.limiter)
+        # When set, the pipeline writes versions and applications in bulk
+        # instead of committing each object through apply_to_job
+        self.unit_of_work = unit_of_work
+        self.chunk_size = chunk_size
+        # Only the best postings are worth an LLM call (see job_triage.py)
+        self.top_k = top_k
+        self.min_score = min_score
         
     def search_jobs_for_user(self, user: User) -> List[Job]:
         """
         Search for jobs matching user's preferences
         """
+        if JOB_SOURCE == "boards":
+            return JobBoardService(self.db).search_all_boards(
+                keywords=random.choice(user.desired_roles), location=user.location_preference
+            )
+
         # For now, return dummy jobs. In production, this would call actual job boards
-        jobs = []
+        postings = []
         for i in range(5):  # Generate 5 dummy jobs
-            job = Job(
-                title=random.choice(user.desired_roles),
-                company=f"Company {i+1}",
-                description=f"Looking for a {random.choice(user.desired_roles)} with experience in {', '.join(random.sample(user.skills, 3))}",
-                location=user.location_preference,
-                source="dummy",
-                url=f"https://example.com/job/{i+1}",
-                posted_date=datetime.utcnow()
-            )
-            self.db.add(job)
-            jobs.append(job)
-        
-        self.db.commit()
-        return jobs
+            title = random.choice(user.desired_roles)
+            company = f"Company {i+1}"
+            description = f"Looking for a {random.choice(user.desired_roles)} with experience in {', '.join(random.sample(user.skills, 3))}"
+            # Jobs upsert on (source, normalized url): a URL per user and posting
+            # keeps one user's dummy jobs from landing on another's rows
+            digest = hashlib.sha1(f"{company}\n{title}\n{description}".encode("utf-8")).hexdigest()[:12]
+            postings.append({
+                "title": title,
+                "company": company,
+                "description": description,
+                "location": user.location_preference,
+                "source": "dummy",
+                "url": f"https://example.com/job/{user.id}/{digest}",
+                "posted_date": datetime.utcnow()
+            })
+
+        return ingest_jobs(self.db, postings)
     
     def customize_resume_for_job(self, user: User, job: Job) -> ResumeVersion:
         """
@@ -46,15 +88,20 @@ class JobSearchService:
             job_description=job.description
         )
         
-        # Create a new resume version
+        return self.save_resume_version(user, job, customized_content)
+
+    def save_resume_version(self, user: User, job: Job, content: str) -> ResumeVersion:
+        """
+        Store a tailored resume for a job
+        """
         resume_version = ResumeVersion(
-            user_id=user.id,
-            base_resume_id=base_resume.id,
+            base_resume_id=user.base_resume.id,
             job_id=job.id,
-            content=customized_content
+            content=content
         )
         
         self.db.add(resume_version)
+        record_resume_version(self.db, user.id)
         self.db.commit()
         self.db.refresh(resume_version)
         
@@ -72,30 +119,143 @@ class JobSearchService:
         )
         
         self.db.add(application)
+        record_application(self.db, application)
         self.db.commit()
         self.db.refresh(application)
         
         return application
     
-    def process_jobs_for_user(self, user: User) -> List[JobApplication]:
+    def process_jobs_for_user(self, user: User,
+                              on_progress: Optional[Callable[[Job, str, Optional[str]], None]] = None,
+                              jobs: Optional[List[Job]] = None) -> List[JobApplication]:
         """
-        Full pipeline: search jobs, customize resumes, and apply
+        Full pipeline: search jobs, customize resumes, and apply. ``jobs``
+        skips the search with postings already found (services/scheduler.py).
+        ``on_progress(job, stage, detail)`` is called from this thread as each
+        job moves through 'found', then 'skipped' as a duplicate or by triage
+        (detail is the reason), 'applied' or 'failed' (detail is the error).
         """
+        report = on_progress or (lambda job, stage, error=None: None)
+
         # Search for matching jobs
-        jobs = self.search_jobs_for_user(user)
+        if jobs is None:
+            with timed(PIPELINE_STAGE_SECONDS, stage="search"):
+                jobs = self.search_jobs_for_user(user)
         applications = []
-        
         for job in jobs:
+            report(job, "found", None)
+
+        # One posting per role: the same job on several boards is tailored
+        # and applied to once (see job_dedup.py)
+        with timed(PIPELINE_STAGE_SECONDS, stage="dedup"):
+            jobs, duplicates = collapse_duplicates(self.db, user.id, jobs)
+        for job, reason in duplicates:
+            report(job, "skipped", reason)
+        TRIAGED_JOBS.inc(len(duplicates), outcome="duplicate")
+
+        # Rank before tailoring so irrelevant postings cost no LLM call
+        with timed(PIPELINE_STAGE_SECONDS, stage="triage"):
+            jobs, skipped = triage_jobs(user, jobs, self.top_k, self.min_score)
+        for job, reason in skipped:
+            report(job, "skipped", reason)
+        TRIAGED_JOBS.inc(len(jobs), outcome="kept")
+        TRIAGED_JOBS.inc(len(skipped), outcome="skipped")
+
+        base_resume = user.base_resume
+        if not base_resume:
+            print(f"User {user.id} has no base resume, skipping tailoring")
+            for job in jobs:
+                report(job, "failed", "User has no base resume")
+            return applications
+        resume_content = base_resume.content
+
+        # Tailor resumes concurrently; only the LLM calls leave this thread,
+        # the session is used from here alone
+        with timed(PIPELINE_STAGE_SECONDS, stage="tailor"):
+            results = self.executor.map(
+                lambda job_description: self.resume_agent.customize_resume(
+                    resume_content=resume_content,
+                    job_description=job_description
+                ),
+                [job.description for job in jobs],
+                estimate_tokens=None,
+            )
+        
+        tailored = []
+        for job, result in zip(jobs, results):
+            if not result.ok:
+                print(f"Error tailoring resume for job {job.id} after {result.attempts} attempts: {str(result.error)}")
+                report(job, "failed", str(result.error))
+                continue
+            tailored.append((job, result.value))
+
+        with timed(PIPELINE_STAGE_SECONDS, stage="persist"):
+            if self.unit_of_work:
+                return self.persist_applications(user, tailored, report)
+
+            for job, content in tailored:
+                try:
+                    resume_version = self.save_resume_version(user, job, content)
+
+                    # Apply to the job
+                    application = self.apply_to_job(user, job, resume_version)
+                    applications.append(application)
+                    report(job, "applied", None)
+
+                except Exception as e:
+                    self.db.rollback()
+                    print(f"Error processing job {job.id}: {str(e)}")
+                    report(job, "failed", str(e))
+                    continue
+
+        return applications
+
+    def _build_application(self, user: User, job: Job, content: str) -> JobApplication:
+        resume_version = ResumeVersion(base_resume_id=user.base_resume.id, job=job, content=content)
+        return JobApplication(user_id=user.id, job=job, resume_version=resume_version, status="applied")
+
+    def _flush_applications(self, user: User, applications: List[JobApplication]):
+        """Insert versions and applications as two batched INSERTs and bump the stats counters"""
+        self.db.add_all(applications)
+        self.db.flush()
+        record_applications(self.db, applications, with_resume_versions=True)
+        self.db.flush()
+
+    def persist_applications(self, user: User, tailored: List, report) -> List[JobApplication]:
+        """
+        Unit-of-work persistence for a run: every ResumeVersion and
+        JobApplication is written with bulk INSERTs and committed once, or
+        once per ``chunk_size`` jobs. Each chunk runs in a SAVEPOINT; if it
+        fails, its jobs are retried one at a time so a single bad row only
+        costs that job.
+        """
+        chunk_size = self.chunk_size or len(tailored) or 1
+        applications = []
+        for start in range(0, len(tailored), chunk_size):
+            chunk = tailored[start:start + chunk_size]
             try:
-                # Customize resume for the job
-                resume_version = self.customize_resume_for_job(user, job)
-                
-                # Apply to the job
-                application = self.apply_to_job(user, job, resume_version)
-                applications.append(application)
-                
+                with self.db.begin_nested():
+                    built = [self._build_application(user, job, content) for job, content in chunk]
+                    self._flush_applications(user, built)
+                saved = list(zip(chunk, built))
             except Exception as e:
-                print(f"Error processing job {job.id}: {str(e)}")
-                continue
-        
-        return applications 
\ No newline at end of file
+                print(f"Bulk insert of {len(chunk)} jobs failed, retrying one by one: {str(e)}")
+                saved = []
+                for job, content in chunk:
+                    try:
+                        with self.db.begin_nested():
+                            application = self._build_application(user, job, content)
+                            self._flush_applications(user, [application])
+                        saved.append(((job, content), application))
+                    except Exception as e:
+                        print(f"Error processing job {job.id}: {str(e)}")
+                        report(job, "failed", str(e))
+
+            for (job, _), application in saved:
+                applications.append(application)
+                report(job, "applied", None)
+            if self.chunk_size:
+                self.db.commit()
+
+        self.db.commit()
+        return applications
@@ -0,0 +1,201 @@
+"""
+Pre-LLM triage: decide which fetched postings are worth a tailored resume.
+
+Runs between search and tailoring in JobSearchService. Postings first go
+through hard filters on the User and Job columns (location, salary, work
+arrangement). The survivors are ranked with BM25 over a term-frequency
+matrix built for the whole batch at once: the user's skills and desired
+role words against the description, and the role words again against the
+title. Only the top ``TRIAGE_TOP_K`` postings scoring above
+``TRIAGE_MIN_SCORE`` go on to the LLM.
+
+    python -m backend.app.services.job_triage --jobs 5000   # time a synthetic batch
+"""
+from typing import List, Optional, Tuple
+from itertools import chain, repeat
+import numpy as np
+import os
+import re
+
+from ..users.models import User, Job
+from ..utils.text import word_tokens
+
+# Postings tailored per run; 0 keeps every posting above the threshold
+TRIAGE_TOP_K = int(os.getenv("TRIAGE_TOP_K", "10"))
+# Postings must score above this; the default drops ones sharing no term with the user
+TRIAGE_MIN_SCORE = float(os.getenv("TRIAGE_MIN_SCORE", "0"))
+
+# BM25 term saturation and length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+# A desired role in the title counts for more than the same words in the body
+TITLE_WEIGHT = 2.0
+# Job.visa_sponsorship is False for every posting the boards do not label,
+# so it cannot be a hard filter; sponsors rank higher for users who need it
+VISA_BONUS = 1.0
+
+REMOTE_WORDS = ("remote", "anywhere", "worldwide")
+SALARY_PATTERN = re.compile(r"(\d[\d,]*(?:\.\d+)?)\s*(k)?", re.IGNORECASE)
+
+
+def query_terms(phrases) -> List[str]:
+    """Distinct words of ``phrases`` in first-seen order"""
+    words = chain.from_iterable(word_tokens(phrase) for phrase in phrases or [])
+    return list(dict.fromkeys(word.rstrip(".") for word in words if word.rstrip(".")))
+
+
+def term_matrix(texts: List[str], terms: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (documents x terms) counts of ``terms`` in each text, and each text's
+    length in words. Tokens are mapped to term columns in one pass over
+    the batch and counted with a single bincount.
+    """
+    tokens = [word_tokens(text) for text in texts]
+    lengths = np.fromiter(map(len, tokens), dtype=np.int64, count=len(tokens))
+    columns = {term: i for i, term in enumerate(terms)}
+    columns.update({term + ".": i for i, term in enumerate(terms)})
+    ids = np.fromiter(map(columns.get, chain.from_iterable(tokens), repeat(-1)),
+                      dtype=np.int64, count=int(lengths.sum()))
+    rows = np.repeat(np.arange(len(texts)), lengths)
+    hits = ids >= 0
+    counts = np.bincount(rows[hits] * len(terms) + ids[hits], minlength=len(texts) * len(terms))
+    return counts.reshape(len(texts), len(terms)).astype(np.float64), lengths
+
+
+def bm25_scores(texts: List[str], terms: List[str]) -> np.ndarray:
+    """BM25 score of each text for the query ``terms``, with IDF taken over the batch"""
+    if not texts or not terms:
+        return np.zeros(len(texts))
+    tf, lengths = term_matrix(texts, terms)
+    n = len(texts)
+    df = (tf > 0).sum(axis=0)
+    idf = np.log1p((n - df + 0.5) / (df + 0.5))
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / max(lengths.mean(), 1.0))
+    return (tf * (BM25_K1 + 1) / (tf + norm[:, None])) @ idf
+
+
+def max_salary(salary_range: Optional[str]) -> Optional[float]:
+    """Top of a free-text yearly salary range ("$120k - $150k", "90,000-110,000"), or None"""
+    values = []
+    for number, thousands in SALARY_PATTERN.findall(salary_range or ""):
+        value = float(number.replace(",", "")) * (1000 if thousands else 1)
+        # Hourly rates and stray numbers are not comparable to a yearly figure
+        if value >= 1000:
+            values.append(value)
+    return max(values) if values else None
+
+
+def _is_remote(location: str) -> bool:
+    return any(word in location for word in REMOTE_WORDS)
+
+
+class HardFilters:
+    """
+    The user's hard requirements, resolved once per run. Calling it with a
+    job returns why the job can never suit the user, or None. Job fields
+    that are unknown never filter.
+    """
+
+    def __init__(self, user: User):
+        self.location = (user.location_preference or "").strip().lower()
+        self.remote_only = _is_remote(self.location)
+        # Anywhere is fine for users willing to relocate
+        self.check_location = bool(self.location) and not user.relocation_willingness
+        self.min_salary = user.salary_expectation
+        self.arrangements = set(user.work_arrangements or [])
+
+    def __call__(self, job: Job) -> Optional[str]:
+        if self.check_location and job.location:
+            location = job.location.strip().lower()
+            if not _is_remote(location) and (
+                    self.remote_only or (self.location not in location and location not in self.location)):
+                return f"Location {job.location} does not match the user's preference"
+
+        if self.min_salary and job.salary_range:
+            top = max_salary(job.salary_range)
+            if top is not None and top < self.min_salary:
+                return f"Salary {job.salary_range} below expectation"
+
+        if self.arrangements and job.work_arrangement is not None \
+                and job.work_arrangement.value not in self.arrangements:
+            return f"Work arrangement {job.work_arrangement.value} not wanted"
+        return None
+
+
+def score_jobs(user: User, jobs: List[Job]) -> np.ndarray:
+    """Relevance of each job to the user's skills and desired roles"""
+    role_terms = query_terms(user.desired_roles)
+    body_terms = list(dict.fromkeys(query_terms(user.skills) + role_terms))
+    scores = bm25_scores([f"{job.title or ''} {job.description or ''}" for job in jobs], body_terms)
+    scores += TITLE_WEIGHT * bm25_scores([job.title or "" for job in jobs], role_terms)
+    if user.visa_sponsorship:
+        scores += VISA_BONUS * np.fromiter((bool(job.visa_sponsorship) for job in jobs), dtype=np.float64,
+                                           count=len(jobs))
+    return scores
+
+
+def triage_jobs(user: User, jobs: List[Job], top_k: int = TRIAGE_TOP_K,
+                min_score: float = TRIAGE_MIN_SCORE) -> Tuple[List[Job], List[Tuple[Job, str]]]:
+    """
+    The jobs worth tailoring for, best first, and the rest with the reason
+    each was skipped.
+    """
+    hard_filters = HardFilters(user)
+    skipped = []
+    candidates = []
+    for job in jobs:
+        reason = hard_filters(job)
+        if reason:
+            skipped.append((job, reason))
+        else:
+            candidates.append(job)
+    if not candidates:
+        return [], skipped
+
+    scores = score_jobs(user, candidates)
+    # Stable, so equal scores keep the boards' order
+    order = np.argsort(-scores, kind="stable")
+    kept = []
+    for rank, index in enumerate(order):
+        job, score = candidates[index], float(scores[index])
+        if score <= min_score:
+            skipped.append((job, f"Relevance {score:.2f} not above {min_score:g}"))
+        elif top_k and rank >= top_k:
+            skipped.append((job, f"Ranked {rank + 1}, outside the top {top_k}"))
+        else:
+            kept.append(job)
+    return kept, skipped
+
+
+if __name__ == "__main__":
+    import argparse
+    import random
+    import time
+    from ..users.models import WorkArrangement
+
+    parser = argparse.ArgumentParser(description="Time triage of a synthetic batch of postings")
+    parser.add_argument("--jobs", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    words = ("python sql react aws docker kubernetes java go rust typescript data platform team build ship "
+             "customers product scale remote senior engineer backend frontend").split()
+    user = User(skills=["Python", "SQL", "AWS", "Docker", "machine learning"],
+                desired_roles=["Backend Engineer", "Data Engineer"], location_preference="Remote",
+                salary_expectation=120000, work_arrangements=["full_time"], relocation_willingness=False,
+                visa_sponsorship=True)
+    jobs = [Job(title=" ".join(random.sample(words, 3)), description=" ".join(random.choices(words, k=150)),
+                location=random.choice(["Remote", "New York", "Worldwide"]),
+                salary_range=random.choice([None, "$100k - $140k", "$80,000"]),
+                work_arrangement=random.choice([None, WorkArrangement.FULL_TIME, WorkArrangement.CONTRACT]),
+                visa_sponsorship=random.random() < 0.2)
+            for _ in range(args.jobs)]
+
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        kept, skipped = triage_jobs(user, jobs)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    print(f"✅ Triaged {len(jobs)} postings: kept {len(kept)}, skipped {len(skipped)}; "
+          f"median {timings[len(timings) // 2] * 1000:.1f} ms, best {timings[0] * 1000:.1f} ms")
@@ -0,0 +1,169 @@
+"""
+Keyset (cursor) pagination and streaming export for a user's applications,
+jobs and resume versions.
+
+Pages are ordered newest first on (created_at, id) and resume after the
+last row of the previous page, so every page is an index range read no
+matter how deep it is. The cursor is opaque to clients: base64 of the last
+row's [created_at, id].
+
+SQLite stores server-default timestamps without microseconds, while bound
+datetimes always carry them, so a cursor datetime would not compare equal
+to the row it came from. On SQLite the cursor therefore carries the stored
+text and is compared as text.
+"""
+from typing import Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import String, select, tuple_, type_coerce
+from sqlalchemy.sql import Select
+from datetime import datetime
+import base64
+import csv
+import io
+import json
+import os
+
+from ..users.models import BaseResume, Job, JobApplication, ResumeVersion, APPLICATION_STATUS_CODES
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+# Rows fetched per round trip while exporting; memory is bounded by one batch
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+APPLICATION_COLUMNS = [
+    JobApplication.id, JobApplication.job_id, JobApplication.resume_version_id, JobApplication.status,
+    JobApplication.rejection_reason, JobApplication.last_status_update, JobApplication.created_at,
+    Job.title, Job.company, Job.location, Job.source, Job.url,
+]
+JOB_COLUMNS = [
+    Job.id, Job.title, Job.company, Job.location, Job.source, Job.url, Job.posted_date, Job.created_at,
+]
+# The tailored content is fetched per version, not in listings
+RESUME_VERSION_COLUMNS = [ResumeVersion.id, ResumeVersion.base_resume_id, ResumeVersion.job_id,
+                          ResumeVersion.created_at]
+
+
+class InvalidCursor(ValueError):
+    """A cursor that was not issued by this API"""
+
+
+def _sort_key(created_at, dialect: str):
+    """created_at as the cursor compares it: stored text on SQLite, the timestamp elsewhere"""
+    return type_coerce(created_at, String) if dialect == "sqlite" else created_at
+
+
+def encode_cursor(created_at, row_id: int) -> str:
+    value = created_at.isoformat() if isinstance(created_at, datetime) else created_at
+    raw = json.dumps([value, row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, dialect: str) -> Tuple[object, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        if not isinstance(created_at, str) or not isinstance(row_id, int):
+            raise ValueError("malformed cursor")
+        return (created_at if dialect == "sqlite" else datetime.fromisoformat(created_at)), row_id
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {str(e)}")
+
+
+def _keyset(query: Select, created_at, row_id, cursor: Optional[str], dialect: str) -> Select:
+    key = _sort_key(created_at, dialect)
+    if cursor:
+        query = query.where(tuple_(key, row_id) < tuple_(*decode_cursor(cursor, dialect)))
+    # The raw sort key is selected last so the next cursor can be built from it
+    return query.add_columns(key.label("sort_key")).order_by(created_at.desc(), row_id.desc())
+
+
+def applications_query(user_id: int, dialect: str, status: Optional[str] = None, source: Optional[str] = None,
+                       cursor: Optional[str] = None) -> Select:
+    if status is not None and status not in APPLICATION_STATUS_CODES:
+        raise ValueError(f"Unknown application status {status!r}")
+    query = (
+        select(*APPLICATION_COLUMNS)
+        .join(Job, Job.id == JobApplication.job_id)
+        .where(JobApplication.user_id == user_id)
+    )
+    if status is not None:
+        query = query.where(JobApplication.status == status)
+    if source is not None:
+        query = query.where(Job.source == source)
+    return _keyset(query, JobApplication.created_at, JobApplication.id, cursor, dialect)
+
+
+def jobs_query(user_id: int, dialect: str, source: Optional[str] = None, cursor: Optional[str] = None) -> Select:
+    """Jobs the user has applied to, each once"""
+    applied = select(JobApplication.job_id).where(JobApplication.user_id == user_id)
+    query = select(*JOB_COLUMNS).where(Job.id.in_(applied))
+    if source is not None:
+        query = query.where(Job.source == source)
+    return _keyset(query, Job.created_at, Job.id, cursor, dialect)
+
+
+def resume_versions_query(user_id: int, dialect: str, cursor: Optional[str] = None) -> Select:
+    # A user has one base resume (User.base_resume); an equality rather than
+    # IN lets the index return versions already in cursor order
+    resume = select(BaseResume.id).where(BaseResume.user_id == user_id).order_by(BaseResume.id.desc()).limit(1)
+    query = select(*RESUME_VERSION_COLUMNS).where(ResumeVersion.base_resume_id == resume.scalar_subquery())
+    return _keyset(query, ResumeVersion.created_at, ResumeVersion.id, cursor, dialect)
+
+
+def page(rows: List, limit: int) -> Dict:
+    """
+    ``{"items": [...], "next_cursor": ...}`` from up to ``limit + 1`` rows
+    of a keyset query; a cursor is only returned when another page exists.
+    """
+    items = [dict(row._mapping) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(last["sort_key"], last["id"])
+    for item in items:
+        del item["sort_key"]
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def _export_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def export_fields(query: Select) -> List[str]:
+    return [column.key for column in query.selected_columns if column.key != "sort_key"]
+
+
+def export_chunk(rows: List, fields: List[str], fmt: str) -> str:
+    """One batch of export rows as NDJSON lines or CSV records"""
+    values = [[_export_value(row._mapping[field]) for field in fields] for row in rows]
+    if fmt == "ndjson":
+        return "".join(json.dumps(dict(zip(fields, row))) + "\n" for row in values)
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(values)
+    return buffer.getvalue()
+
+
+def stream_export(session_factory, user_id: int, fmt: str, status: Optional[str] = None,
+                  source: Optional[str] = None) -> Iterator[str]:
+    """
+    A user's applications as NDJSON or CSV, newest first. Rows come off a
+    server-side cursor ``EXPORT_BATCH_SIZE`` at a time as plain tuples (no
+    ORM identity map), so memory stays flat however many rows there are.
+
+    A sync generator on a sync session: StreamingResponse pulls each batch
+    in the threadpool, so fetching and encoding rows never holds up the
+    event loop. It opens its own session because the body is sent after
+    the request's dependencies have been closed.
+    """
+    db = session_factory()
+    try:
+        query = applications_query(user_id, db.get_bind().dialect.name, status, source)
+        fields = export_fields(query)
+        if fmt == "csv":
+            yield ",".join(fields) + "\r\n"
+        result = db.execute(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        for rows in result.partitions():
+            yield export_chunk(rows, fields, fmt)
+    finally:
+        db.close()
@@ -0,0 +1,178 @@
+from typing import Callable, List, Iterable, Optional, Any
+from concurrent.futures import ThreadPoolExecutor
+from ..telemetry import callback
+import contextvars
+import os
+import random
+import threading
+import time
+
+MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "60"))
+TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "40000"))
+MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1.0"))
+BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "30.0"))
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at ``per_minute`` units per minute"""
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, amount: float = 1.0):
+        """Block until ``amount`` units are available, then take them"""
+        # A request larger than the bucket would wait forever; let it drain the bucket instead
+        amount = min(amount, self.capacity)
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits applied together"""
+
+    def __init__(self, requests_per_minute: float = REQUESTS_PER_MINUTE,
+                 tokens_per_minute: float = TOKENS_PER_MINUTE):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+
+    def acquire(self, estimated_tokens: int):
+        self.requests.acquire(1)
+        self.tokens.acquire(estimated_tokens)
+
+
+def is_retryable(error: Exception) -> bool:
+    """429s, 5xx responses, timeouts and dropped connections are worth retrying"""
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    name = type(error).__name__
+    return name in ("APIConnectionError", "APITimeoutError", "RateLimitError", "InternalServerError")
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class LLMResult:
+    """Outcome of one item: either ``value`` or ``error`` is set"""
+
+    def __init__(self, item: Any, value: Any = None, error: Exception = None, attempts: int = 0):
+        self.item = item
+        self.value = value
+        self.error = error
+        self.attempts = attempts
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class LLMExecutor:
+    """
+    Runs LLM calls on a bounded thread pool behind a shared rate limiter.
+    Failed calls are retried with full-jitter exponential backoff when the
+    error is retryable; a call that still fails is reported in its
+    ``LLMResult`` instead of aborting the batch.
+
+    With an estimate, each attempt is charged to the limiter before ``fn``
+    runs. Without one (``None``), ``fn`` charges ``limiter`` itself right
+    before each API request it makes, so cache hits cost nothing and a
+    call that makes two requests pays for both.
+    """
+
+    def __init__(self, max_concurrency: int = MAX_CONCURRENCY,
+                 limiter: Optional[RateLimiter] = None,
+                 max_retries: int = MAX_RETRIES,
+                 backoff_base: float = BACKOFF_BASE,
+                 backoff_max: float = BACKOFF_MAX):
+        self.max_concurrency = max_concurrency
+        self.limiter = limiter or RateLimiter()
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="llm")
+        # Calls submitted and not yet finished, including those waiting on the limiter
+        self.pending = 0
+        self._pending_lock = threading.Lock()
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _tracked_call(self, fn: Callable[[Any], Any], item: Any, estimated_tokens: Optional[int]) -> LLMResult:
+        try:
+            return self.call(fn, item, estimated_tokens)
+        finally:
+            with self._pending_lock:
+                self.pending -= 1
+
+    def call(self, fn: Callable[[Any], Any], item: Any, estimated_tokens: Optional[int] = 1) -> LLMResult:
+        attempt = 0
+        while True:
+            if estimated_tokens is not None:
+                self.limiter.acquire(estimated_tokens)
+            try:
+                return LLMResult(item, value=fn(item), attempts=attempt + 1)
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    return LLMResult(item, error=e, attempts=attempt + 1)
+                time.sleep(self._backoff(attempt, e))
+                attempt += 1
+
+    def map(self, fn: Callable[[Any], Any], items: Iterable[Any],
+            estimate_tokens: Optional[Callable[[Any], int]] = lambda item: 1) -> List[LLMResult]:
+        """
+        Run ``fn`` over ``items`` concurrently; results keep input order.
+        ``estimate_tokens=None`` leaves charging the limiter to ``fn``.
+        """
+        items = list(items)
+        with self._pending_lock:
+            self.pending += len(items)
+        # Each call runs in a copy of the caller's context so request profiles see its stages
+        futures = [
+            self.pool.submit(contextvars.copy_context().run, self._tracked_call, fn, item,
+                             estimate_tokens(item) if estimate_tokens is not None else None)
+            for item in items
+        ]
+        return [future.result() for future in futures]
+
+
+_executor: Optional[LLMExecutor] = None
+_executor_lock = threading.Lock()
+
+callback("vrjob_llm_pending_calls", "LLM calls queued or running on the shared executor",
+         lambda: _executor.pending if _executor is not None else 0)
+
+
+def get_llm_executor() -> LLMExecutor:
+    """Process-wide executor so concurrent requests share one concurrency and rate budget"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = LLMExecutor()
+    return _executor
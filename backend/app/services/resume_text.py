@@ -0,0 +1,208 @@
+from typing import Dict, Optional, List, Tuple
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from ..users.models import BaseResume, ResumeText
+from .job_ingest import insert_ignoring_conflicts
+import asyncio
+import hashlib
+import os
+import re
+import threading
+import zipfile
+import xml.etree.ElementTree as ET
+
+EXTRACT_WORKERS = int(os.getenv("RESUME_EXTRACT_WORKERS", "2"))
+
+WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+class ResumeParseError(ValueError):
+    """An uploaded resume file could not be read as DOCX/PDF/text"""
+
+
+def _docx_text(path: str) -> str:
+    """Paragraph text of a .docx, read straight from word/document.xml"""
+    with zipfile.ZipFile(path) as archive:
+        root = ET.fromstring(archive.read("word/document.xml"))
+    paragraphs = []
+    for paragraph in root.iter(f"{WORD_NS}p"):
+        parts = []
+        for node in paragraph.iter():
+            if node.tag == f"{WORD_NS}t" and node.text:
+                parts.append(node.text)
+            elif node.tag == f"{WORD_NS}tab":
+                parts.append("\t")
+            elif node.tag in (f"{WORD_NS}br", f"{WORD_NS}cr"):
+                parts.append("\n")
+        paragraphs.append("".join(parts))
+    return "\n".join(paragraphs)
+
+
+def _pdf_text(path: str) -> str:
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def _plain_text(path: str) -> str:
+    with open(path, "rb") as f:
+        return f.read().decode("utf-8", errors="ignore")
+
+
+def _tidy(text: str) -> str:
+    # Collapse runs of blank lines and trailing spaces that only cost prompt tokens
+    text = re.sub(r"[ \t]+\n", "\n", text)
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+def extract_text(path: str, ext: Optional[str] = None) -> str:
+    """
+    Plain text of a resume file. ``ext`` overrides the file's own extension
+    (uploads are streamed to a temporary name). CPU-bound; run it in the
+    process pool rather than on the event loop.
+    """
+    ext = (ext or os.path.splitext(path)[1]).lower()
+    if ext == ".docx":
+        text = _docx_text(path)
+    elif ext == ".pdf":
+        text = _pdf_text(path)
+    else:
+        text = _plain_text(path)
+    return _tidy(text)
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(256 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_extract_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(max_workers=EXTRACT_WORKERS)
+    return _pool
+
+
+def shutdown_extract_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def cached_text(db: Session, content_hash: str) -> Optional[str]:
+    row = db.query(ResumeText.text).filter(ResumeText.content_hash == content_hash).first()
+    return row[0] if row else None
+
+
+def store_text(db: Session, content_hash: str, text: str):
+    """
+    Remember extracted text for a file hash. Concurrent uploads of the same
+    file may both get here; the second insert is a no-op. The caller commits.
+    """
+    insert_ignoring_conflicts(db, ResumeText, [
+        {"content_hash": content_hash, "text": text, "extracted_at": datetime.utcnow()}
+    ], ["content_hash"])
+
+
+async def extract_resume_text(db: AsyncSession, path: str, content_hash: str, ext: Optional[str] = None) -> str:
+    """
+    Text for an uploaded resume: served from resume_texts when the same file
+    was parsed before, otherwise parsed in the process pool and stored.
+    The caller commits.
+    """
+    text = await db.run_sync(cached_text, content_hash)
+    if text is not None:
+        return text
+    loop = asyncio.get_running_loop()
+    try:
+        text = await loop.run_in_executor(get_extract_pool(), extract_text, path, ext)
+    except Exception as e:
+        raise ResumeParseError(str(e) or type(e).__name__) from e
+    await db.run_sync(store_text, content_hash, text)
+    return text
+
+
+def _completed(futures: Dict[Future, BaseResume], action: str) -> List[Tuple[BaseResume, str]]:
+    """(resume, result) of each future that succeeded; failures are logged and left out"""
+    done = []
+    for future, resume in futures.items():
+        try:
+            done.append((resume, future.result()))
+        except Exception as e:
+            print(f"⚠️ Could not {action} resume {resume.id} ({resume.file_path}): {str(e) or type(e).__name__}")
+    return done
+
+
+def reextract_all(db: Session, batch_size: int = 100) -> Tuple[int, int]:
+    """
+    Re-extract text for every BaseResume from its stored file, in parallel
+    on the process pool, and cache it by content hash. A file that cannot
+    be read or parsed is logged and skipped, keeping its stored text.
+    Returns (rows updated, files that failed).
+    """
+    updated = failed = 0
+    last_id = 0
+    pool = get_extract_pool()
+    while True:
+        resumes: List[BaseResume] = (
+            db.query(BaseResume).filter(BaseResume.id > last_id).order_by(BaseResume.id).limit(batch_size).all()
+        )
+        if not resumes:
+            return updated, failed
+        last_id = resumes[-1].id
+
+        present = [r for r in resumes if os.path.exists(r.file_path)]
+        hashed = _completed({pool.submit(file_hash, r.file_path): r for r in present}, "hash")
+        failed += len(present) - len(hashed)
+
+        # Parse each distinct uncached file once
+        todo = {}
+        for resume, content_hash in hashed:
+            if content_hash not in todo and cached_text(db, content_hash) is None:
+                todo[content_hash] = resume
+        extracted = _completed({pool.submit(extract_text, r.file_path): r for r in todo.values()}, "extract")
+        hashes = {resume.id: content_hash for resume, content_hash in hashed}
+        for resume, text in extracted:
+            store_text(db, hashes[resume.id], text)
+        db.flush()
+
+        for resume, content_hash in hashed:
+            text = cached_text(db, content_hash)
+            if text is None:
+                # Its file failed to parse
+                failed += 1
+                continue
+            resume.content_hash = content_hash
+            resume.content = text
+            updated += 1
+        db.commit()
+
+
+if __name__ == "__main__":
+    import sys
+    from ..db.database import SessionLocal
+
+    if len(sys.argv) < 2 or sys.argv[1] != "reextract":
+        print("usage: python -m backend.app.services.resume_text reextract")
+        sys.exit(1)
+
+    session = SessionLocal()
+    try:
+        updated, failed = reextract_all(session)
+        print(f"Re-extracted {updated} resumes, {failed} failed")
+    finally:
+        session.close()
@@ -0,0 +1,325 @@
+from typing import Optional, List, Dict
+from datetime import timedelta
+from sqlalchemy import update, func
+from sqlalchemy.orm import Session, sessionmaker
+from ..users.models import User, Job, PipelineRun
+from ..telemetry import callback, histogram, timed
+from ..utils.dates import utcnow
+import os
+import socket
+import threading
+import time
+
+RUN_WORKERS = int(os.getenv("RUN_WORKERS", "2"))
+POLL_INTERVAL = float(os.getenv("RUN_POLL_INTERVAL", "1.0"))
+# A running run whose worker has not heartbeated for this long is requeued
+STALE_AFTER = float(os.getenv("RUN_STALE_AFTER", "600"))
+MAX_ATTEMPTS = int(os.getenv("RUN_MAX_ATTEMPTS", "3"))
+# Seconds between heartbeats of a running run, also while nothing advances (tailoring)
+HEARTBEAT_INTERVAL = float(os.getenv("RUN_HEARTBEAT_INTERVAL", "30"))
+
+RUN_SECONDS = histogram("vrjob_pipeline_run_duration_seconds", "Wall time of one pipeline run, by final status",
+                        ("status",), stage="run")
+
+_busy_workers = 0
+_busy_lock = threading.Lock()
+callback("vrjob_run_workers_busy", "Run workers in this process executing a run", lambda: _busy_workers)
+
+
+def enqueue_run(db: Session, user_id: int) -> PipelineRun:
+    run = PipelineRun(user_id=user_id, status="queued", attempts=0,
+                      progress={"total": 0, "jobs": {}})
+    db.add(run)
+    db.commit()
+    db.refresh(run)
+    return run
+
+
+def enqueue_runs(db: Session, job_ids_by_user: Dict[int, List[int]]) -> int:
+    """Queue one run per user over jobs already found for them, in one commit"""
+    db.add_all([
+        PipelineRun(user_id=user_id, status="queued", attempts=0, job_ids=job_ids,
+                    progress={"total": 0, "jobs": {}})
+        for user_id, job_ids in job_ids_by_user.items()
+    ])
+    db.commit()
+    return len(job_ids_by_user)
+
+
+def queue_depth(db: Session) -> Dict[str, int]:
+    """Queued and running runs; both statuses are served by the status index"""
+    depth = {"queued": 0, "running": 0}
+    rows = (
+        db.query(PipelineRun.status, func.count(PipelineRun.id))
+        .filter(PipelineRun.status.in_(list(depth)))
+        .group_by(PipelineRun.status)
+    )
+    depth.update(dict(rows))
+    return depth
+
+
+def register_queue_metrics(session_factory: sessionmaker):
+    """Expose queue_depth as a gauge, read with a fresh session on each scrape"""
+    def read():
+        db = session_factory()
+        try:
+            return queue_depth(db)
+        finally:
+            db.close()
+
+    callback("vrjob_pipeline_runs", "Pipeline runs waiting in or being worked off the queue", read, ("status",))
+
+
+def claim_next_run(db: Session, worker_id: str) -> Optional[PipelineRun]:
+    """
+    Atomically move the oldest queued run to 'running'. The claim is a
+    compare-and-set UPDATE on status, so two workers (or processes) racing
+    for the same row cannot both win, on SQLite and Postgres alike.
+    """
+    while True:
+        candidate = (
+            db.query(PipelineRun.id)
+            .filter(PipelineRun.status == "queued")
+            .order_by(PipelineRun.id)
+            .first()
+        )
+        if candidate is None:
+            return None
+        now = utcnow()
+        claimed = db.execute(
+            update(PipelineRun)
+            .where(PipelineRun.id == candidate.id, PipelineRun.status == "queued")
+            .values(status="running", worker_id=worker_id, started_at=now,
+                    heartbeat_at=now, attempts=PipelineRun.attempts + 1)
+        ).rowcount
+        db.commit()
+        if claimed:
+            return db.get(PipelineRun, candidate.id, populate_existing=True)
+
+
+def requeue_stale_runs(db: Session, stale_after: float = STALE_AFTER) -> int:
+    """Give runs abandoned by a dead worker back to the queue, or fail them after MAX_ATTEMPTS"""
+    cutoff = utcnow() - timedelta(seconds=stale_after)
+    stale = (PipelineRun.status == "running") & (PipelineRun.heartbeat_at < cutoff)
+    failed = db.execute(
+        update(PipelineRun)
+        .where(stale, PipelineRun.attempts >= MAX_ATTEMPTS)
+        .values(status="failed", error="Worker stopped responding", finished_at=utcnow())
+    ).rowcount
+    requeued = db.execute(
+        update(PipelineRun).where(stale).values(status="queued", worker_id=None)
+    ).rowcount
+    db.commit()
+    return failed + requeued
+
+
+class RunHeartbeat:
+    """
+    Writes a running run's progress and heartbeat_at from its own thread and
+    session, in one short transaction each time the run advances and every
+    ``interval`` seconds in between. The pipeline's session never carries
+    these writes, so they are visible while the run is still going, and a
+    pipeline write transaction holding SQLite's lock only delays a beat
+    instead of the pipeline.
+    """
+
+    def __init__(self, bind, run_id: int, worker_id: Optional[str], interval: float = HEARTBEAT_INTERVAL):
+        self.session_factory = sessionmaker(bind=bind, autoflush=False)
+        self.run_id = run_id
+        self.worker_id = worker_id
+        self.interval = interval
+        self.progress = {"total": 0, "jobs": {}}
+        self.lock = threading.Lock()
+        self.advanced = threading.Event()
+        self.stopping = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._loop, name=f"run-{self.run_id}-heartbeat", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Write the last progress and wait for the thread; call before the run's final commit"""
+        self.stopping.set()
+        self.advanced.set()
+        if self.thread is not None:
+            self.thread.join()
+
+    def on_progress(self, job: Job, stage: str, detail: Optional[str]):
+        with self.lock:
+            entry = self.progress["jobs"].setdefault(str(job.id), {"title": job.title, "company": job.company})
+            entry["status"] = stage
+            if detail:
+                entry["reason" if stage == "skipped" else "error"] = detail
+            self.progress["total"] = len(self.progress["jobs"])
+        self.advanced.set()
+
+    def snapshot(self) -> Dict:
+        with self.lock:
+            return {"total": self.progress["total"],
+                    "jobs": {job_id: dict(entry) for job_id, entry in self.progress["jobs"].items()}}
+
+    def beat(self):
+        db = self.session_factory()
+        try:
+            # Only while this worker still owns the run; a requeued run is someone else's
+            db.execute(
+                update(PipelineRun)
+                .where(PipelineRun.id == self.run_id, PipelineRun.status == "running",
+                       PipelineRun.worker_id == self.worker_id)
+                .values(progress=self.snapshot(), heartbeat_at=utcnow())
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"Run {self.run_id} heartbeat failed: {str(e)}")
+        finally:
+            db.close()
+
+    def _loop(self):
+        while not self.stopping.is_set():
+            self.advanced.wait(self.interval)
+            self.advanced.clear()
+            self.beat()
+
+
+def finish_run(db: Session, run_id: int, worker_id: Optional[str], **values) -> bool:
+    """
+    Write a run's final state and commit, only while ``worker_id`` still
+    owns it: a run requeued from under a slow worker and claimed by another
+    is left to that one. Returns whether the state was written.
+    """
+    finished = db.execute(
+        update(PipelineRun)
+        .where(PipelineRun.id == run_id, PipelineRun.status == "running", PipelineRun.worker_id == worker_id)
+        .values(finished_at=utcnow(), **values)
+    ).rowcount
+    db.commit()
+    if not finished:
+        print(f"Run {run_id} is no longer owned by {worker_id}, dropping its {values.get('status')} state")
+    return bool(finished)
+
+
+def execute_run(db: Session, run: PipelineRun):
+    """Run the pipeline for ``run`` and record per-job progress and the result"""
+    from .job_search import JobSearchService
+
+    # Plain values: the pipeline commits and rolls back ``run`` out from under us
+    run_id, worker_id = run.id, run.worker_id
+    user = db.query(User).filter(User.id == run.user_id).first()
+    if not user:
+        finish_run(db, run_id, worker_id, status="failed", error="User not found")
+        return
+
+    jobs = None
+    if run.job_ids is not None:
+        # Found by the scheduler; the run skips its own search
+        found = {job.id: job for job in db.query(Job).filter(Job.id.in_(run.job_ids))}
+        jobs = [found[job_id] for job_id in run.job_ids if job_id in found]
+
+    heartbeat = RunHeartbeat(db.get_bind(), run_id, worker_id)
+    heartbeat.start()
+    try:
+        applications = JobSearchService(db).process_jobs_for_user(user, on_progress=heartbeat.on_progress, jobs=jobs)
+        heartbeat.stop()
+        final = {
+            "status": "succeeded",
+            "result": {
+                "message": f"Processed {len(applications)} jobs for user {user.id}",
+                "applied_jobs": [a.job.title for a in applications],
+            },
+        }
+    except Exception as e:
+        db.rollback()
+        heartbeat.stop()
+        print(f"Run {run_id} failed: {str(e)}")
+        final = {"status": "failed", "error": str(e)}
+    finish_run(db, run_id, worker_id, progress=heartbeat.snapshot(), **final)
+
+
+class RunWorkerPool:
+    """
+    Threads that drain the pipeline_runs queue. Each worker has its own
+    session; several processes can run pools against the same database.
+    Every ``stale_after / 2`` seconds one of the workers hands runs of dead
+    workers (in any process) back to the queue.
+    """
+
+    def __init__(self, session_factory: sessionmaker, workers: int = RUN_WORKERS,
+                 poll_interval: float = POLL_INTERVAL, stale_after: float = STALE_AFTER):
+        self.session_factory = session_factory
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.stopping = threading.Event()
+        self.threads: List[threading.Thread] = []
+        self.prefix = f"{socket.gethostname()}:{os.getpid()}"
+        # Monotonic time of the next stale-run sweep; the first worker sweeps at once
+        self.next_sweep = 0.0
+        self.sweep_lock = threading.Lock()
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, args=(f"{self.prefix}:{i}",),
+                                      name=f"run-worker-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def stop(self, timeout: float = 5.0):
+        self.stopping.set()
+        for thread in self.threads:
+            thread.join(timeout)
+
+    def _execute(self, db: Session, run: PipelineRun):
+        global _busy_workers
+        with _busy_lock:
+            _busy_workers += 1
+        try:
+            with timed(RUN_SECONDS, status="failed") as labels:
+                execute_run(db, run)
+                labels["status"] = db.get(PipelineRun, run.id, populate_existing=True).status
+        finally:
+            with _busy_lock:
+                _busy_workers -= 1
+
+    def _sweep_due(self) -> bool:
+        with self.sweep_lock:
+            now = time.monotonic()
+            if now < self.next_sweep:
+                return False
+            self.next_sweep = now + self.stale_after / 2
+            return True
+
+    def _work(self, worker_id: str):
+        while not self.stopping.is_set():
+            db = self.session_factory()
+            try:
+                if self._sweep_due():
+                    requeue_stale_runs(db, self.stale_after)
+                run = claim_next_run(db, worker_id)
+                if run is not None:
+                    self._execute(db, run)
+                    continue
+            except Exception as e:
+                print(f"Worker {worker_id} error: {str(e)}")
+            finally:
+                db.close()
+            self.stopping.wait(self.poll_interval)
+
+
+def serve_runs(workers: int = RUN_WORKERS):
+    """Drain the queue with ``workers`` threads until interrupted; the body of a worker process"""
+    from ..db.database import SessionLocal
+
+    pool = RunWorkerPool(SessionLocal, workers=workers)
+    pool.start()
+    print(f"Draining pipeline_runs with {pool.workers} workers (pid {os.getpid()})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pool.stop()
+
+
+if __name__ == "__main__":
+    serve_runs()
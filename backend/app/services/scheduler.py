@@ -0,0 +1,208 @@
+"""
+Scheduled job search for every active user.
+
+Each cycle collects the board queries of all active users and merges the
+identical ones. A user asks for one query per desired role. Boards that
+only take keywords (remoteok, weworkremotely, ...) get one request per
+role; boards in LOCATION_BOARDS get one per role and location. A query
+shared by a thousand users still hits each board once per cycle, so board
+traffic grows with the number of distinct queries, not users.
+
+The fetched postings are ingested once and fanned out: every user gets a
+queued pipeline run (pipeline_runs.job_ids) over the postings of their own
+queries. Tailoring and applying then happen on RunWorkerPool threads, in
+this process or in any number of worker processes draining the same table.
+Per-user filters (location, salary, relevance) are left to the run's
+triage stage.
+
+Run one scheduler per database; users with a run still queued or running
+are skipped, so a slow cycle never piles runs up.
+
+    python -m backend.app.services.scheduler --once
+    python -m backend.app.services.scheduler --interval 3600 --processes 2 --workers 4
+"""
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import exists, select
+from sqlalchemy.orm import Session, sessionmaker
+import os
+import threading
+import time
+
+from ..users.models import User, BaseResume, PipelineRun
+from ..utils.text import word_tokens
+from ..telemetry import counter, histogram, timed
+from .job_boards import JobBoardService, LOCATION_BOARDS
+from .job_ingest import upsert_jobs
+from .run_queue import enqueue_runs
+
+# Seconds between cycles; 0 keeps the API process from scheduling (see main.py)
+SCHEDULE_INTERVAL = float(os.getenv("SEARCH_SCHEDULE_INTERVAL", "0"))
+# Distinct queries fetched at once; each fans out to its boards in parallel
+QUERY_WORKERS = int(os.getenv("SCHEDULE_QUERY_WORKERS", "4"))
+
+CYCLE_SECONDS = histogram("vrjob_schedule_cycle_duration_seconds", "Wall time of one scheduler cycle",
+                          stage="schedule")
+# kind is "requested" (one per user, role and board group) or "fetched" (after merging)
+BOARD_QUERIES = counter("vrjob_schedule_board_queries_total", "Board queries of scheduler cycles", ("kind",))
+
+
+class BoardQuery(NamedTuple):
+    """One search sent to a group of boards; location is None for boards that ignore it"""
+    keywords: str
+    location: Optional[str]
+    boards: Tuple[str, ...]
+
+
+def keyword_boards() -> Tuple[str, ...]:
+    names = JobBoardService(db=None)._board_adapters("", None)
+    return tuple(name for name in names if name not in LOCATION_BOARDS)
+
+
+def active_users(db: Session) -> List[Tuple[int, List[str], str]]:
+    """
+    (id, desired roles, location preference) of users the pipeline can run
+    for: with a base resume and no run already queued or running.
+    """
+    busy = exists().where(PipelineRun.user_id == User.id, PipelineRun.status.in_(["queued", "running"]))
+    rows = db.execute(
+        select(User.id, User.desired_roles, User.location_preference)
+        .where(exists().where(BaseResume.user_id == User.id), ~busy)
+        .order_by(User.id)
+    )
+    return [(user_id, roles or [], location) for user_id, roles, location in rows]
+
+
+def normalize(text: Optional[str]) -> str:
+    """Case and punctuation differences never make two queries distinct"""
+    return " ".join(word.rstrip(".") for word in word_tokens(text or "") if word.rstrip("."))
+
+
+def plan_queries(users: List[Tuple[int, List[str], str]]) -> Dict[BoardQuery, List[int]]:
+    """Distinct board queries of ``users``, each with the ids of the users asking for it"""
+    keyword_only = keyword_boards()
+    plan: Dict[BoardQuery, List[int]] = {}
+    for user_id, roles, location in users:
+        location = normalize(location) or None
+        for keywords in dict.fromkeys(filter(None, map(normalize, roles))):
+            for query in (BoardQuery(keywords, None, keyword_only), BoardQuery(keywords, location, LOCATION_BOARDS)):
+                plan.setdefault(query, []).append(user_id)
+    return plan
+
+
+def fetch_queries(queries: List[BoardQuery], workers: int = QUERY_WORKERS) -> Dict[BoardQuery, List[Dict]]:
+    """Postings of each query, its boards fetched concurrently with their deadlines"""
+    def fetch(query: BoardQuery) -> List[Dict]:
+        # A service per query: fetch_all_boards records timed-out boards on it
+        return JobBoardService(db=None).fetch_all_boards(query.keywords, query.location, query.boards)
+
+    if not queries:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(workers, len(queries)), thread_name_prefix="schedule") as executor:
+        return dict(zip(queries, executor.map(fetch, queries)))
+
+
+def run_cycle(db: Session, workers: int = QUERY_WORKERS) -> Dict[str, int]:
+    """One scheduler cycle: merge queries, fetch each once, ingest, queue a run per user"""
+    with timed(CYCLE_SECONDS):
+        users = active_users(db)
+        plan = plan_queries(users)
+        requested = sum(len(user_ids) for user_ids in plan.values())
+        BOARD_QUERIES.inc(requested, kind="requested")
+        BOARD_QUERIES.inc(len(plan), kind="fetched")
+
+        results = fetch_queries(list(plan), workers)
+        job_ids_by_user: Dict[int, Dict[int, None]] = {user_id: {} for user_id, _, _ in users}
+        for query, postings in results.items():
+            job_ids = upsert_jobs(db, postings)
+            for user_id in plan[query]:
+                # Ordered and without repeats: a posting can answer several queries
+                job_ids_by_user[user_id].update(dict.fromkeys(job_ids))
+        db.commit()
+
+        runs = enqueue_runs(db, {user_id: list(job_ids) for user_id, job_ids in job_ids_by_user.items() if job_ids})
+
+    summary = {
+        "users": len(users),
+        "queries_requested": requested,
+        "queries_fetched": len(plan),
+        "postings": sum(len(postings) for postings in results.values()),
+        "runs": runs,
+    }
+    print(f"🗓️ Scheduled {runs} runs for {len(users)} users: {len(plan)} board queries "
+          f"instead of {requested}, {summary['postings']} postings")
+    return summary
+
+
+class SearchScheduler:
+    """Runs run_cycle every ``interval`` seconds on a daemon thread, with its own session per cycle"""
+
+    def __init__(self, session_factory: sessionmaker, interval: float = SCHEDULE_INTERVAL,
+                 workers: int = QUERY_WORKERS):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.workers = workers
+        self.stopping = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._loop, name="search-scheduler", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self.stopping.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    def _loop(self):
+        while not self.stopping.is_set():
+            db = self.session_factory()
+            try:
+                run_cycle(db, self.workers)
+            except Exception as e:
+                print(f"Scheduler cycle failed: {str(e)}")
+            finally:
+                db.close()
+            self.stopping.wait(self.interval)
+
+
+if __name__ == "__main__":
+    import argparse
+    import multiprocessing
+    from ..db.database import SessionLocal
+    from .run_queue import serve_runs, RUN_WORKERS
+
+    parser = argparse.ArgumentParser(description="Search the job boards for every active user on an interval")
+    parser.add_argument("--interval", type=float, default=SCHEDULE_INTERVAL or 3600.0)
+    parser.add_argument("--once", action="store_true", help="run a single cycle, queue its runs and exit")
+    parser.add_argument("--processes", type=int, default=0,
+                        help="worker processes draining the queued runs; 0 leaves that to the API or run_queue")
+    parser.add_argument("--workers", type=int, default=RUN_WORKERS, help="run worker threads per process")
+    args = parser.parse_args()
+
+    if args.once:
+        session = SessionLocal()
+        try:
+            run_cycle(session)
+        finally:
+            session.close()
+        raise SystemExit(0)
+
+    # Spawned, not forked: each process opens its own engine and HTTP pools
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=serve_runs, args=(args.workers,), daemon=True)
+                 for _ in range(args.processes)]
+    for process in processes:
+        process.start()
+    scheduler = SearchScheduler(SessionLocal, args.interval)
+    scheduler.start()
+    print(f"Scheduling job searches every {args.interval:.0f}s, {args.processes} worker processes")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        scheduler.stop()
+        # A run cut short stays 'running' until requeue_stale_runs hands it back
+        for process in processes:
+            process.terminate()
+            process.join()
@@ -0,0 +1,410 @@
+from typing import Dict, List, Tuple
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from ..users.models import User, BaseResume, Job, JobTerm, ResumeVersion, JobApplication, UserStatistics
+from ..utils.dates import as_utc, utcnow
+from .job_ingest import insert_ignoring_conflicts
+
+TRACKED_STATUSES = ("seen", "rejected", "ghosted", "interview")
+# Statuses with their own counter column on user_stats
+COUNTED_STATUSES = ("applied",) + TRACKED_STATUSES
+
+
+def _hours_between(db: Session, start, end):
+    """Dialect-specific SQL expression for (end - start) in hours"""
+    if db.get_bind().dialect.name == "sqlite":
+        return (func.julianday(end) - func.julianday(start)) * 24.0
+    return func.extract("epoch", end - start) / 3600.0
+
+
+def status_counts(db: Session, user_id: int) -> Dict[str, int]:
+    rows = (
+        db.query(JobApplication.status, func.count(JobApplication.id))
+        .filter(JobApplication.user_id == user_id)
+        .group_by(JobApplication.status)
+    )
+    return {status: count for status, count in rows}
+
+
+def resume_version_count(db: Session, user_id: int) -> int:
+    return (
+        db.query(func.count(ResumeVersion.id))
+        .join(BaseResume, ResumeVersion.base_resume_id == BaseResume.id)
+        .filter(BaseResume.user_id == user_id)
+        .scalar()
+    )
+
+
+def average_response_time(db: Session, user_id: int):
+    """Mean hours between applying and the last status change, or None"""
+    hours = _hours_between(db, JobApplication.created_at, JobApplication.last_status_update)
+    return (
+        db.query(func.avg(hours))
+        .filter(
+            JobApplication.user_id == user_id,
+            JobApplication.last_status_update.isnot(None),
+            JobApplication.status != "applied",
+        )
+        .scalar()
+    )
+
+
+def most_common_rejection(db: Session, user_id: int):
+    row = (
+        db.query(JobApplication.rejection_reason, func.count(JobApplication.id).label("n"))
+        .filter(JobApplication.user_id == user_id, JobApplication.rejection_reason.isnot(None),
+                JobApplication.rejection_reason != "")
+        .group_by(JobApplication.rejection_reason)
+        .order_by(func.count(JobApplication.id).desc())
+        .first()
+    )
+    return row[0] if row else None
+
+
+def _profile(user: User) -> Tuple[List[str], List[str]]:
+    """The user's skills (lower-cased) and desired roles, as matched against applied jobs"""
+    return [skill.lower() for skill in user.skills or []], list(user.desired_roles or [])
+
+
+def skill_match_counts(db: Session, skills: List[str], job_ids) -> Dict[str, int]:
+    """skill -> how many of ``job_ids`` (ids or a subquery) have it among their stored terms"""
+    counts = dict.fromkeys(skills, 0)
+    if skills:
+        counts.update(
+            db.query(JobTerm.term, func.count(JobTerm.job_id))
+            .filter(JobTerm.term.in_(set(skills)), JobTerm.job_id.in_(job_ids))
+            .group_by(JobTerm.term)
+        )
+    return counts
+
+
+def role_match_counts(db: Session, roles: List[str], job_ids) -> Dict[str, int]:
+    """role -> how many of ``job_ids`` (ids or a subquery) have it in their title"""
+    return {
+        role: db.query(func.count(Job.id))
+        .filter(Job.id.in_(job_ids), func.lower(Job.title).contains(role.lower(), autoescape=True))
+        .scalar()
+        for role in dict.fromkeys(roles)
+    }
+
+
+def top_skills(skills: List[str], counts: Dict[str, int], limit: int = 5) -> List[str]:
+    found = Counter(skill for skill in skills if counts.get(skill))
+    return [skill for skill, _ in found.most_common(limit)]
+
+
+def matched_skills(db: Session, user: User, limit: int = 5) -> List[str]:
+    """User skills found among the stored terms of jobs the user applied to"""
+    skills, _ = _profile(user)
+    applied_jobs = db.query(JobApplication.job_id).filter(JobApplication.user_id == user.id)
+    return top_skills(skills, skill_match_counts(db, skills, applied_jobs), limit)
+
+
+def matched_roles(db: Session, user: User) -> List[str]:
+    """Desired roles that appear in the title of at least one applied job"""
+    _, roles = _profile(user)
+    applied_jobs = db.query(JobApplication.job_id).filter(JobApplication.user_id == user.id)
+    counts = role_match_counts(db, roles, applied_jobs)
+    return [role for role in roles if counts[role]]
+
+
+def compute_user_stats(db: Session, user: User) -> Dict:
+    """
+    Build the UserStats payload with aggregate queries instead of loading
+    every application and job into Python.
+    """
+    counts = status_counts(db, user.id)
+    total_applications = sum(counts.values())
+
+    resume_versions = resume_version_count(db, user.id)
+
+    stats = {
+        "total_applications": total_applications,
+        "resume_versions": resume_versions,
+    }
+    for status in TRACKED_STATUSES:
+        stats[status] = counts.get(status, 0)
+
+    response_time = average_response_time(db, user.id)
+    if response_time is not None:
+        stats["average_response_time"] = float(response_time)
+
+    if stats["interview"] and total_applications:
+        stats["success_rate"] = (stats["interview"] / total_applications) * 100
+
+    rejection = most_common_rejection(db, user.id)
+    if rejection:
+        stats["most_common_rejection"] = rejection
+
+    stats["top_skills_matched"] = matched_skills(db, user)
+    stats["preferred_roles_matched"] = matched_roles(db, user)
+    return stats
+
+
+# --- Materialized user_stats row -------------------------------------------
+
+def aggregate_user_stats(db: Session, user_id: int) -> Dict:
+    """
+    Every user_stats column for ``user_id``, computed from job_applications,
+    resume_versions and job terms as they stand (flushed) in this transaction
+    """
+    hours = _hours_between(db, JobApplication.created_at, JobApplication.last_status_update)
+    counts = status_counts(db, user_id)
+    response_total, response_count = (
+        db.query(func.coalesce(func.sum(hours), 0.0), func.count(JobApplication.id))
+        .filter(
+            JobApplication.user_id == user_id,
+            JobApplication.last_status_update.isnot(None),
+            JobApplication.status != "applied",
+        )
+        .one()
+    )
+    reasons = dict(
+        db.query(JobApplication.rejection_reason, func.count(JobApplication.id))
+        .filter(JobApplication.user_id == user_id, JobApplication.rejection_reason.isnot(None),
+                JobApplication.rejection_reason != "")
+        .group_by(JobApplication.rejection_reason)
+    )
+    skills, roles = _profile(db.get(User, user_id))
+    applied_jobs = db.query(JobApplication.job_id).filter(JobApplication.user_id == user_id).distinct()
+
+    values = {
+        "user_id": user_id,
+        "total_applications": sum(counts.values()),
+        "resume_versions": resume_version_count(db, user_id),
+        "response_hours_total": float(response_total or 0.0),
+        "response_count": response_count,
+        "rejection_reasons": reasons,
+        "skill_matches": skill_match_counts(db, skills, applied_jobs),
+        "role_matches": role_match_counts(db, roles, applied_jobs),
+    }
+    for status in COUNTED_STATUSES:
+        values[status] = counts.get(status, 0)
+    return values
+
+
+def _stats_row(db: Session, user_id: int) -> Tuple[UserStatistics, bool]:
+    """
+    Load the user's counter row for update. A missing row is created from
+    the user's existing applications (after flushing pending writes), and
+    ``fresh`` is True: it already counts everything this transaction wrote,
+    so callers must not add their own deltas on top.
+    """
+    row = (
+        db.query(UserStatistics)
+        .filter(UserStatistics.user_id == user_id)
+        .with_for_update()
+        .first()
+    )
+    if row is not None:
+        return row, False
+    db.flush()
+    # Two requests can both find the row missing (first stats read for a
+    # new user); the loser's insert is skipped and it locks the winner's row
+    insert_ignoring_conflicts(db, UserStatistics, [aggregate_user_stats(db, user_id)], ["user_id"])
+    row = (
+        db.query(UserStatistics)
+        .filter(UserStatistics.user_id == user_id)
+        .with_for_update()
+        .one()
+    )
+    return row, True
+
+
+def _response_hours(created_at, status: str, last_status_update):
+    if status == "applied" or not last_status_update or not created_at:
+        return None
+    return (as_utc(last_status_update) - as_utc(created_at)).total_seconds() / 3600
+
+
+def _add_matches(db: Session, row: UserStatistics, applications: List[JobApplication]):
+    """
+    Count the jobs of newly inserted ``applications`` into the stored skill
+    and role matches. Matches count distinct applied jobs, as in
+    aggregate_user_stats, so a job the user already applied to adds nothing.
+    """
+    if not (row.skill_matches or row.role_matches):
+        return
+    db.flush()
+    job_ids = {application.job_id for application in applications}
+    earlier = (
+        db.query(JobApplication.job_id)
+        .filter(JobApplication.user_id == row.user_id, JobApplication.job_id.in_(job_ids),
+                JobApplication.id.notin_([application.id for application in applications]))
+        .distinct()
+    )
+    job_ids -= {job_id for (job_id,) in earlier}
+    if not job_ids:
+        return
+    if row.skill_matches:
+        found = skill_match_counts(db, list(row.skill_matches), job_ids)
+        row.skill_matches = {skill: count + found[skill] for skill, count in row.skill_matches.items()}
+    if row.role_matches:
+        titles = [title for (title,) in db.query(func.lower(Job.title)).filter(Job.id.in_(job_ids))]
+        row.role_matches = {
+            role: count + sum(1 for title in titles if role.lower() in title)
+            for role, count in row.role_matches.items()
+        }
+
+
+def _apply_delta(row: UserStatistics, status: str, rejection_reason, hours, sign: int):
+    if status in COUNTED_STATUSES:
+        setattr(row, status, getattr(row, status) + sign)
+    if hours is not None:
+        row.response_hours_total += sign * hours
+        row.response_count += sign
+    if rejection_reason:
+        reasons = dict(row.rejection_reasons or {})
+        reasons[rejection_reason] = reasons.get(rejection_reason, 0) + sign
+        if reasons[rejection_reason] <= 0:
+            del reasons[rejection_reason]
+        # Reassign so the JSON column is flagged dirty
+        row.rejection_reasons = reasons
+
+
+def record_application(db: Session, application: JobApplication):
+    """Count a new application. Call in the transaction that inserts it."""
+    record_applications(db, [application])
+
+
+def record_applications(db: Session, applications: List[JobApplication], with_resume_versions: bool = False):
+    """
+    Count a batch of new applications with a single counter-row update per
+    user, and their resume versions too with ``with_resume_versions``. The
+    row must be touched once per transaction's new rows: a row created here
+    already counts everything flushed.
+    """
+    by_user = {}
+    for application in applications:
+        by_user.setdefault(application.user_id, []).append(application)
+    for user_id, user_applications in by_user.items():
+        row, fresh = _stats_row(db, user_id)
+        if fresh:
+            continue
+        row.total_applications += len(user_applications)
+        if with_resume_versions:
+            row.resume_versions += len(user_applications)
+        for application in user_applications:
+            _apply_delta(row, application.status, application.rejection_reason,
+                         _response_hours(application.created_at, application.status,
+                                         application.last_status_update), 1)
+        _add_matches(db, row, user_applications)
+
+
+def record_resume_version(db: Session, user_id: int, count: int = 1):
+    row, fresh = _stats_row(db, user_id)
+    if not fresh:
+        row.resume_versions += count
+
+
+def set_application_status(db: Session, application: JobApplication, status: str,
+                           rejection_reason: str = None, when: datetime = None):
+    """
+    Move an application to ``status`` and adjust the user's counters in the
+    same transaction. The caller commits.
+    """
+    # Loaded before the change, so a fresh row holds the old status to move away from
+    row, _ = _stats_row(db, application.user_id)
+    old_hours = _response_hours(application.created_at, application.status, application.last_status_update)
+    _apply_delta(row, application.status, application.rejection_reason, old_hours, -1)
+
+    application.status = status
+    if rejection_reason is not None:
+        application.rejection_reason = rejection_reason
+    application.last_status_update = when or utcnow()
+
+    new_hours = _response_hours(application.created_at, status, application.last_status_update)
+    _apply_delta(row, status, application.rejection_reason, new_hours, 1)
+
+
+def record_status_transitions(db: Session, user_id: int, transitions: List):
+    """
+    Adjust one user's counters for a batch of status changes applied in
+    bulk (without ORM objects). Each transition is an ``(old, new)`` pair of
+    dicts with status, rejection_reason, last_status_update and created_at.
+    """
+    row, fresh = _stats_row(db, user_id)
+    if fresh:
+        return
+    for old, new in transitions:
+        for values, sign in ((old, -1), (new, 1)):
+            hours = _response_hours(values["created_at"], values["status"], values["last_status_update"])
+            _apply_delta(row, values["status"], values["rejection_reason"], hours, sign)
+
+
+def rebuild_user_stats(db: Session, user_id: int = None) -> int:
+    """
+    Recompute user_stats from job_applications, resume_versions and job
+    terms, for one user or all of them. Returns the number of rows rebuilt.
+    The caller commits.
+    """
+    user_ids = [user_id] if user_id is not None else [uid for (uid,) in db.query(User.id)]
+    for uid in user_ids:
+        row, fresh = _stats_row(db, uid)
+        if not fresh:
+            for column, value in aggregate_user_stats(db, uid).items():
+                setattr(row, column, value)
+    return len(user_ids)
+
+
+def _matches_profile(row: UserStatistics, user: User) -> bool:
+    """Whether the stored matches were counted for the user's current skills and roles"""
+    skills, roles = _profile(user)
+    return (row.skill_matches is not None and set(row.skill_matches) == set(skills)
+            and row.role_matches is not None and set(row.role_matches) == set(roles))
+
+
+def read_user_stats(db: Session, user: User, materialize: bool = True) -> Dict:
+    """
+    Build the UserStats payload from the user's single user_stats row,
+    materializing it on first access and recounting the skill and role
+    matches when the profile changed. Read-only sessions (a replica) pass
+    ``materialize=False`` and get the aggregate query result instead.
+    """
+    row = db.query(UserStatistics).filter(UserStatistics.user_id == user.id).first()
+    if row is None or not _matches_profile(row, user):
+        if not materialize:
+            return compute_user_stats(db, user)
+        rebuild_user_stats(db, user.id)
+        db.commit()
+        row = db.query(UserStatistics).filter(UserStatistics.user_id == user.id).one()
+
+    stats = {
+        "total_applications": row.total_applications,
+        "resume_versions": row.resume_versions,
+    }
+    for status in TRACKED_STATUSES:
+        stats[status] = getattr(row, status)
+
+    if row.response_count:
+        stats["average_response_time"] = row.response_hours_total / row.response_count
+
+    if stats["interview"] and row.total_applications:
+        stats["success_rate"] = (stats["interview"] / row.total_applications) * 100
+
+    if row.rejection_reasons:
+        stats["most_common_rejection"] = max(row.rejection_reasons, key=row.rejection_reasons.get)
+
+    skills, roles = _profile(user)
+    stats["top_skills_matched"] = top_skills(skills, row.skill_matches)
+    stats["preferred_roles_matched"] = [role for role in roles if row.role_matches.get(role)]
+    return stats
+
+
+if __name__ == "__main__":
+    import sys
+    from ..db.database import SessionLocal
+
+    if len(sys.argv) < 2 or sys.argv[1] != "rebuild":
+        print("usage: python -m backend.app.services.stats rebuild [user_id]")
+        sys.exit(1)
+
+    session = SessionLocal()
+    try:
+        rebuilt = rebuild_user_stats(session, int(sys.argv[2]) if len(sys.argv) > 2 else None)
+        session.commit()
+        print(f"Rebuilt stats for {rebuilt} users")
+    finally:
+        session.close()
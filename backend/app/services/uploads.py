@@ -0,0 +1,44 @@
+from typing import Tuple
+from fastapi import HTTPException, UploadFile
+from starlette.concurrency import run_in_threadpool
+import hashlib
+import os
+import tempfile
+
+UPLOAD_CHUNK_SIZE = 256 * 1024
+MAX_RESUME_BYTES = int(os.getenv("MAX_RESUME_BYTES", str(10 * 1024 * 1024)))
+RESUME_ROOT = os.getenv(
+    "RESUME_ROOT",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "resumes"),
+)
+
+
+async def stream_upload_to_disk(upload: UploadFile, directory: str = RESUME_ROOT,
+                                max_bytes: int = MAX_RESUME_BYTES) -> Tuple[str, str, int]:
+    """
+    Copy an upload to a temporary file in ``directory`` chunk by chunk,
+    hashing as it goes, without blocking the event loop on file IO.
+    Returns (temp path, sha256 hex digest, size). Raises 413 past ``max_bytes``.
+    """
+    await run_in_threadpool(os.makedirs, directory, exist_ok=True)
+    fd, tmp_path = await run_in_threadpool(tempfile.mkstemp, dir=directory, suffix=".part")
+    out = os.fdopen(fd, "wb")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        while True:
+            chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise HTTPException(status_code=413,
+                                    detail=f"Resume exceeds the {max_bytes // (1024 * 1024)} MB limit")
+            digest.update(chunk)
+            await run_in_threadpool(out.write, chunk)
+    except BaseException:
+        await run_in_threadpool(out.close)
+        await run_in_threadpool(os.remove, tmp_path)
+        raise
+    await run_in_threadpool(out.close)
+    return tmp_path, digest.hexdigest(), size
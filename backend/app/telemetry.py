@@ -0,0 +1,302 @@
+"""
+In-process metrics exposed in the Prometheus text format at /metrics, and
+per-request profiles.
+
+Counters and histograms are updated inline under a per-metric lock.
+Callback metrics (cache, prompt and queue figures) are only read when
+/metrics is scraped. ``timed(histogram, ...)`` times a block into a
+histogram and, when the request being served asked for a profile with
+``X-Profile: 1``, into that request's breakdown, which is returned in a
+Server-Timing header along with the request's SQL query count and time.
+"""
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy import event
+import bisect
+import contextvars
+import os
+import threading
+import time
+
+# Honour the X-Profile request header; set to 0 to never return timings
+PROFILING_ENABLED = os.getenv("REQUEST_PROFILING", "1") == "1"
+PROFILE_HEADER = b"x-profile"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250, 1000)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple, object] = {}
+
+    def _key(self, labels: Dict) -> Tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def collect(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"] + self.collect()
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in values]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS, stage: Optional[str] = None):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Name of the stage in request profiles; label values are appended
+        self.stage = stage
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            values = [(key, (list(counts), total)) for key, (counts, total) in self._values.items()]
+        lines = []
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class CallbackMetric(Metric):
+    """
+    A gauge (or counter kept elsewhere) read at scrape time. ``fn`` returns
+    a number, or a dict of label value (a tuple with several labels) to number.
+    """
+
+    def __init__(self, name: str, help: str, fn: Callable, labelnames: Tuple[str, ...] = (),
+                 kind: str = "gauge"):
+        super().__init__(name, help, labelnames)
+        self.fn = fn
+        self.kind = kind
+
+    def collect(self) -> List[str]:
+        try:
+            values = self.fn()
+        except Exception as e:
+            print(f"⚠️ Metric {self.name} failed: {str(e)}")
+            return []
+        if not isinstance(values, dict):
+            values = {(): values}
+        lines = []
+        for key, value in values.items():
+            key = key if isinstance(key, tuple) else (key,)
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+REGISTRY: List[Metric] = []
+_registry_lock = threading.Lock()
+
+
+def _register(metric: Metric) -> Metric:
+    with _registry_lock:
+        REGISTRY.append(metric)
+    return metric
+
+
+def counter(name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+    return _register(Counter(name, help, labelnames))
+
+
+def histogram(name: str, help: str, labelnames: Tuple[str, ...] = (),
+              buckets: Tuple[float, ...] = DEFAULT_BUCKETS, stage: str = None) -> Histogram:
+    return _register(Histogram(name, help, labelnames, buckets, stage))
+
+
+def callback(name: str, help: str, fn: Callable, labelnames: Tuple[str, ...] = (),
+             kind: str = "gauge") -> CallbackMetric:
+    return _register(CallbackMetric(name, help, fn, labelnames, kind))
+
+
+def render() -> str:
+    """Every registered metric in the Prometheus text exposition format"""
+    with _registry_lock:
+        metrics = list(REGISTRY)
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# --- Request profiles --------------------------------------------------------
+
+class RequestProfile:
+    """SQL counts for one request, plus its stage timings when ``detailed``"""
+
+    __slots__ = ("started", "queries", "query_seconds", "stages")
+
+    def __init__(self, detailed: bool = False):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.stages: Optional[List[Tuple[str, float]]] = [] if detailed else None
+
+    def server_timing(self) -> str:
+        """Stages summed by name, as a Server-Timing header value (milliseconds)"""
+        totals: Dict[str, List[float]] = {}
+        for name, seconds in self.stages or []:
+            entry = totals.setdefault(name, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += 1
+        parts = [f'sql;dur={self.query_seconds * 1000:.2f};desc="{self.queries} queries"']
+        parts += [f'{name};dur={seconds * 1000:.2f};desc="x{count}"' for name, (seconds, count) in totals.items()]
+        parts.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.2f}")
+        return ", ".join(parts)
+
+
+_profile: contextvars.ContextVar[Optional[RequestProfile]] = contextvars.ContextVar("request_profile", default=None)
+
+
+def current_profile() -> Optional[RequestProfile]:
+    return _profile.get()
+
+
+@contextmanager
+def timed(metric: Histogram, **labels):
+    """
+    Observe the block's duration in ``metric``. Yields the labels dict so
+    the block can fill in labels it only knows at the end (an outcome).
+    """
+    start = time.perf_counter()
+    try:
+        yield labels
+    finally:
+        elapsed = time.perf_counter() - start
+        metric.observe(elapsed, **labels)
+        profile = _profile.get()
+        if profile is not None and profile.stages is not None and metric.stage:
+            name = ".".join([metric.stage] + [str(labels.get(n, "")) for n in metric.labelnames])
+            profile.stages.append((name, elapsed))
+
+
+# --- HTTP and SQL instrumentation --------------------------------------------
+
+REQUESTS = counter("vrjob_http_requests_total", "HTTP requests served", ("method", "route", "status"))
+REQUEST_SECONDS = histogram("vrjob_http_request_duration_seconds", "HTTP request latency", ("method", "route"))
+REQUEST_QUERIES = histogram("vrjob_http_request_queries", "SQL queries issued per HTTP request",
+                            ("route",), buckets=COUNT_BUCKETS)
+QUERY_SECONDS = histogram("vrjob_db_query_duration_seconds", "SQL statement latency, from every thread",
+                          buckets=QUERY_BUCKETS)
+
+
+class RequestMetricsMiddleware:
+    """
+    ASGI middleware recording latency, status and SQL query count per
+    route template. Requests sent with ``X-Profile: 1`` get a Server-Timing
+    header with their SQL time and the stages they ran.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._routes: Optional[Dict] = None
+
+    def _route(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if self._routes is None:
+            self._routes = {getattr(r, "endpoint", None): getattr(r, "path", "") for r in scope["app"].routes}
+        return self._routes.get(endpoint, "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        detailed = PROFILING_ENABLED and (PROFILE_HEADER, b"1") in scope.get("headers", [])
+        profile = RequestProfile(detailed)
+        token = _profile.set(profile)
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if detailed:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", profile.server_timing().encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _profile.reset(token)
+            route = self._route(scope)
+            REQUESTS.inc(method=scope["method"], route=route, status=status)
+            REQUEST_SECONDS.observe(time.perf_counter() - profile.started, method=scope["method"], route=route)
+            REQUEST_QUERIES.observe(profile.queries, route=route)
+
+
+def instrument_engine(engine):
+    """Time every statement on ``engine`` (a sync Engine, or an AsyncEngine's sync_engine)"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._query_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._query_started
+        QUERY_SECONDS.observe(elapsed)
+        profile = _profile.get()
+        if profile is not None:
+            profile.queries += 1
+            profile.query_seconds += elapsed
@@ -1,8 +1,35 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Enum, Text, JSON
+from sqlalchemy import Column, Integer, BigInteger, SmallInteger, String, Float, Boolean, DateTime, ForeignKey, Enum, Text, JSON, LargeBinary, UniqueConstraint, Index
+from sqlalchemy.types import TypeDecorator
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
 from ..db.database import Base
+from ..utils.text import normalize_url
+
+
+def _default_normalized_url(context):
+    return normalize_url(context.get_current_parameters()["url"])
+
+# SMALLINT code of each JobApplication status. Append new statuses; never
+# renumber, the codes are stored (see migrations/versions/0002_*).
+APPLICATION_STATUS_CODES = {"applied": 1, "seen": 2, "rejected": 3, "interview": 4, "ghosted": 5}
+_STATUS_NAMES = {code: name for name, code in APPLICATION_STATUS_CODES.items()}
+
+class StatusCode(TypeDecorator):
+    """Application status stored as a SMALLINT code, read and written as its name"""
+    impl = SmallInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        try:
+            return APPLICATION_STATUS_CODES[value]
+        except KeyError:
+            raise ValueError(f"Unknown application status {value!r}")
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else _STATUS_NAMES[value]
 
 class WorkArrangement(enum.Enum):
     FULL_TIME = "full_time"
@@ -38,8 +65,9 @@ class BaseResume(Base):
     __tablename__ = "base_resumes"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     file_path = Column(String, nullable=False)
+    content_hash = Column(String(64), nullable=True, index=True)  # sha256 of the uploaded file
     content = Column(Text, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -48,8 +76,20 @@ class BaseResume(Base):
     user = relationship("User", back_populates="base_resume")
     resume_versions = relationship("ResumeVersion", back_populates="base_resume")
 
+class ResumeText(Base):
+    """Extracted plain text of an uploaded resume file, keyed by the file's sha256"""
+    __tablename__ = "resume_texts"
+
+    content_hash = Column(String(64), primary_key=True)
+    text = Column(Text, nullable=False)
+    extracted_at = Column(DateTime(timezone=True), server_default=func.now())
+
 class Job(Base):
     __tablename__ = "jobs"
+    __table_args__ = (
+        # Natural key used by the bulk ingest path to deduplicate postings
+        UniqueConstraint("source", "normalized_url", name="uq_jobs_source_normalized_url"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
@@ -58,18 +98,49 @@ class Job(Base):
     location = Column(String, nullable=False)
     source = Column(String, nullable=False)
     url = Column(String, nullable=False)
+    normalized_url = Column(String, nullable=False, index=True, default=_default_normalized_url)
+    posted_date = Column(DateTime(timezone=True), nullable=True)
     salary_range = Column(String, nullable=True)
     work_arrangement = Column(Enum(WorkArrangement), nullable=True)
     industry = Column(String, nullable=True)
     visa_sponsorship = Column(Boolean, default=False)
     relocation_assistance = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Id of the canonical job among near-duplicate postings of the same role
+    # (services/job_dedup.py); NULL until fingerprinted
+    cluster_id = Column(Integer, nullable=True, index=True)
 
     # Relationships
     applications = relationship("JobApplication", back_populates="job")
+    terms = relationship("JobTerm", cascade="all, delete-orphan")
+
+class JobTerm(Base):
+    """Distinct lower-cased description tokens of a job, written once at ingest"""
+    __tablename__ = "job_terms"
+
+    job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"), primary_key=True)
+    term = Column(String, primary_key=True, index=True)
+
+class JobFingerprint(Base):
+    """MinHash signature of a job's title, company and description"""
+    __tablename__ = "job_fingerprints"
+
+    job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"), primary_key=True)
+    signature = Column(LargeBinary, nullable=False)
+
+class JobLshBucket(Base):
+    """One LSH band of a job's signature; jobs sharing a bucket are duplicate candidates"""
+    __tablename__ = "job_lsh_buckets"
+
+    bucket = Column(BigInteger, primary_key=True)
+    job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"), primary_key=True)
 
 class ResumeVersion(Base):
     __tablename__ = "resume_versions"
+    __table_args__ = (
+        # Versions of a base resume, newest first (counts, keyset listing)
+        Index("ix_resume_versions_base_resume_created", "base_resume_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     base_resume_id = Column(Integer, ForeignKey("base_resumes.id"), nullable=False)
@@ -84,13 +155,20 @@ class ResumeVersion(Base):
 
 class JobApplication(Base):
     __tablename__ = "job_applications"
+    __table_args__ = (
+        # Per-user status counts and filters (stats, email reconciliation)
+        Index("ix_job_applications_user_status", "user_id", "status"),
+        # A user's applications newest first (keyset listing and export)
+        Index("ix_job_applications_user_created", "user_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    job_id = Column(Integer, ForeignKey("jobs.id"), nullable=False)
+    job_id = Column(Integer, ForeignKey("jobs.id"), nullable=False, index=True)
     resume_version_id = Column(Integer, ForeignKey("resume_versions.id"), nullable=False)
-    status = Column(String, nullable=False)  # 'applied', 'seen', 'rejected', 'interview', 'ghosted'
+    status = Column(StatusCode, nullable=False)  # 'applied', 'seen', 'rejected', 'interview', 'ghosted'
     rejection_reason = Column(String)
+    last_status_update = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -99,4 +177,51 @@ class JobApplication(Base):
     job = relationship("Job", back_populates="applications")
     resume_version = relationship("ResumeVersion", back_populates="applications") 
 
-    print("✅ models.py loaded")
\ No newline at end of file
+class UserStatistics(Base):
+    """
+    Per-user counters behind GET /users/{user_id}/stats, kept up to date in the
+    same transaction as application inserts and status changes
+    (see services/stats.py). Rebuild from job_applications with
+    ``python -m backend.app.services.stats rebuild``.
+    """
+    __tablename__ = "user_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    total_applications = Column(Integer, nullable=False, default=0)
+    applied = Column(Integer, nullable=False, default=0)
+    seen = Column(Integer, nullable=False, default=0)
+    rejected = Column(Integer, nullable=False, default=0)
+    ghosted = Column(Integer, nullable=False, default=0)
+    interview = Column(Integer, nullable=False, default=0)
+    resume_versions = Column(Integer, nullable=False, default=0)
+    response_hours_total = Column(Float, nullable=False, default=0.0)
+    response_count = Column(Integer, nullable=False, default=0)
+    rejection_reasons = Column(JSON, nullable=False, default=dict)  # reason -> count
+    # Applied jobs mentioning each of the user's skills (lower-cased) and roles;
+    # recounted when the profile no longer has the same keys
+    skill_matches = Column(JSON, nullable=True)  # skill -> count
+    role_matches = Column(JSON, nullable=True)  # role -> count
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class PipelineRun(Base):
+    """
+    One queued search -> tailor -> apply run. The table doubles as the work
+    queue drained by services/run_queue.py, so no external broker is needed.
+    """
+    __tablename__ = "pipeline_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    status = Column(String, nullable=False, default="queued", index=True)  # 'queued', 'running', 'succeeded', 'failed'
+    progress = Column(JSON, nullable=True)  # {"total": n, "jobs": {job_id: {...}}}
+    result = Column(JSON, nullable=True)
+    # Jobs found by the scheduler's shared search (services/scheduler.py);
+    # NULL when the run searches the boards itself
+    job_ids = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    worker_id = Column(String, nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
@@ -1,147 +1,245 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
+from typing import Optional
 import json
 import os
-from ..db.database import get_db  # Fix the import path
-from .models import User, BaseResume, Job, JobApplication
+from ..db.database import get_async_db, get_async_read_db, ReadSessionLocal, REPLICA_URL
+from .models import User, BaseResume, PipelineRun
 from ..schemas.user import UserCreate, UserResponse, UserStats
-from fastapi.responses import JSONResponse
-from collections import Counter
+from ..schemas.listing import ApplicationPage, JobPage, ResumeVersionPage
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from ..services.stats import read_user_stats
+from ..services.run_queue import enqueue_run
+from ..services.uploads import stream_upload_to_disk, RESUME_ROOT
+from ..services.resume_text import extract_resume_text, ResumeParseError
+from ..services import listing
 
 router = APIRouter()
 
+def _move_upload(upload_path: str, user_id: int, ext: str) -> str:
+    """Move the streamed upload into the user's resume directory"""
+    resume_dir = os.path.join(RESUME_ROOT, str(user_id))
+    os.makedirs(resume_dir, exist_ok=True)
+    resume_path = os.path.join(resume_dir, f"base_resume{ext}")
+    os.replace(upload_path, resume_path)
+    return resume_path
+
+
+async def _create_user_with_resume(db: AsyncSession, user_data_model: UserCreate, upload_path: str,
+                                   content_hash: str, ext: str, text: str) -> User:
+    # Create user
+    user = User(
+        full_name=user_data_model.full_name,
+        email=user_data_model.email,
+        phone=user_data_model.phone,
+        location_preference=user_data_model.location_preference,  # Now accepts any string
+        years_experience=user_data_model.years_experience,
+        skills=user_data_model.skills,
+        desired_roles=user_data_model.desired_roles,
+        linkedin_url=user_data_model.linkedin_url
+    )
+    db.add(user)
+    resume_path = None
+    try:
+        await db.flush()  # Generate user.id
+
+        # Now move the resume into a directory named after user.id
+        resume_path = await run_in_threadpool(_move_upload, upload_path, user.id, ext)
+
+        base_resume = BaseResume(
+            user_id=user.id,
+            file_path=resume_path,
+            content_hash=content_hash,
+            content=text
+        )
+        db.add(base_resume)
+        await db.commit()
+    except IntegrityError:
+        # The email was registered by a concurrent intake after our check
+        await db.rollback()
+        if resume_path:
+            await run_in_threadpool(os.remove, resume_path)
+        raise HTTPException(status_code=400, detail="Email already registered")
+    await db.refresh(user)
+    return user
+
+
 @router.post("/intake", response_model=UserResponse)
 async def create_user(
     user_data: str = Form(...),
     resume_file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
+    upload_path = None
     try:
         parsed_data = json.loads(user_data)
         print(f"Received data: {parsed_data}")
         
         # Remove location_preference case conversion since we're not using enum anymore
         user_data_model = UserCreate(**parsed_data)
-        
-        # Check for existing user first
-        existing_user = db.query(User).filter(User.email == user_data_model.email).first()
-        if existing_user:
+
+        # Check for existing user first, before reading and parsing the upload
+        if await db.scalar(select(User.id).where(User.email == user_data_model.email)):
             raise HTTPException(status_code=400, detail="Email already registered")
 
-        # Create user
-        user = User(
-            full_name=user_data_model.full_name,
-            email=user_data_model.email,
-            phone=user_data_model.phone,
-            location_preference=user_data_model.location_preference,  # Now accepts any string
-            years_experience=user_data_model.years_experience,
-            skills=user_data_model.skills,
-            desired_roles=user_data_model.desired_roles,
-            linkedin_url=user_data_model.linkedin_url
-        )
-        db.add(user)
-        db.flush()  # Generate user.id
+        # Stream the upload to disk in chunks, hashing and size-checking as it goes
+        upload_path, content_hash, _ = await stream_upload_to_disk(resume_file)
+        ext = os.path.splitext(resume_file.filename or "")[1]
 
-        # Now create resume directory with user.id
-        resume_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "resumes", str(user.id))
-        os.makedirs(resume_dir, exist_ok=True)
-        
-        # Save resume file
-        ext = os.path.splitext(resume_file.filename)[1]
-        resume_path = os.path.join(resume_dir, f"base_resume{ext}")
-        
-        content = await resume_file.read()
-        with open(resume_path, "wb") as f:
-            f.write(content)
-
-        base_resume = BaseResume(
-            user_id=user.id,
-            file_path=resume_path,
-            content=content.decode(errors="ignore")
-        )
-        db.add(base_resume)
-        db.commit()
-        db.refresh(user)
+        # DOCX/PDF parsing runs in the process pool, or is skipped for a known hash
+        try:
+            text = await extract_resume_text(db, upload_path, content_hash, ext)
+        except ResumeParseError as e:
+            raise HTTPException(status_code=400, detail=f"Could not read resume: {str(e)}")
 
+        user = await _create_user_with_resume(db, user_data_model, upload_path, content_hash, ext, text)
+        upload_path = None
         return user
         
     except json.JSONDecodeError as e:
         raise HTTPException(status_code=400, detail=f"Invalid JSON format: {str(e)}")
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error: {str(e)}")  # Debug print
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+    finally:
+        if upload_path and os.path.exists(upload_path):
+            await run_in_threadpool(os.remove, upload_path)
 
 
-@router.get("/{user_id}", response_model=UserResponse)
-def get_user(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == user_id).first()
+async def _get_user(db: AsyncSession, user_id: int) -> User:
+    # None of the callers need relationships; make any access to them an
+    # error rather than an implicit query
+    user = await db.scalar(select(User).options(raiseload("*")).where(User.id == user_id))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
 
+@router.get("/{user_id}", response_model=UserResponse)
+async def get_user(user_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    return await _get_user(db, user_id)
+
+
 @router.get("/{user_id}/stats", response_model=UserStats)
-def get_user_stats(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+async def get_user_stats(user_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    user = await _get_user(db, user_id)
+
+    # The stats service is shared with sync scripts; run it on the session's
+    # sync facade. A replica is read-only, so nothing is materialized there.
+    stats = await db.run_sync(read_user_stats, user, not REPLICA_URL)
+    return UserStats(**stats)
 
-    applications = user.job_applications
-    total_applications = len(applications)
+@router.post("/{user_id}/search-jobs", status_code=202)
+async def search_and_apply_jobs(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    if not await db.scalar(select(User.id).where(User.id == user_id)):
+        raise HTTPException(status_code=404, detail="User not found")
 
-    stats = {
-        "total_applications": total_applications,
-        "seen": len([a for a in applications if a.status == "seen"]),
-        "rejected": len([a for a in applications if a.status == "rejected"]),
-        "ghosted": len([a for a in applications if a.status == "ghosted"]),  # Added ghosted count
-        "interview": len([a for a in applications if a.status == "interview"]),
-        "resume_versions": len(user.base_resume.resume_versions) if user.base_resume else 0  # Modified this line
+    # The pipeline runs on the worker pool; poll the run for progress
+    run = await db.run_sync(enqueue_run, user_id)
+    return {
+        "message": f"Queued job search for user {user_id}",
+        "run_id": run.id,
+        "status": run.status,
     }
 
-    response_times = [
-        (a.last_status_update - a.applied_at).total_seconds() / 3600
-        for a in applications if a.last_status_update and a.status != "applied"
-    ]
-    if response_times:
-        stats["average_response_time"] = sum(response_times) / len(response_times)
 
-    if stats["interview"] and total_applications:
-        stats["success_rate"] = (stats["interview"] / total_applications) * 100
+@router.get("/{user_id}/search-jobs/{run_id}")
+async def get_search_run(user_id: int, run_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    run = await db.scalar(
+        select(PipelineRun)
+        .options(raiseload("*"))
+        .where(PipelineRun.id == run_id, PipelineRun.user_id == user_id)
+    )
+    if not run:
+        raise HTTPException(status_code=404, detail="Run not found")
 
-    rejection_reasons = [a.rejection_reason for a in applications if a.rejection_reason]
-    if rejection_reasons:
-        stats["most_common_rejection"] = max(set(rejection_reasons), key=rejection_reasons.count)
+    return {
+        "run_id": run.id,
+        "status": run.status,
+        "progress": run.progress,
+        "result": run.result,
+        "error": run.error,
+        "created_at": run.created_at,
+        "started_at": run.started_at,
+        "finished_at": run.finished_at,
+    }
 
-    all_jobs = db.query(Job).join(JobApplication).filter(JobApplication.user_id == user_id).all()
-    job_skills = []
-    for job in all_jobs:
-        job_skills.extend(job.description.lower().split())
 
-    user_skills = [skill.lower() for skill in user.skills]
-    matched_skills = [skill for skill in user_skills if skill in job_skills]
-    stats["top_skills_matched"] = list(dict(Counter(matched_skills).most_common(5)).keys())
+async def _require_user(db: AsyncSession, user_id: int):
+    if not await db.scalar(select(User.id).where(User.id == user_id)):
+        raise HTTPException(status_code=404, detail="User not found")
 
-    matched_roles = [
-        role for role in user.desired_roles
-        if any(role.lower() in job.title.lower() for job in all_jobs)
-    ]
-    stats["preferred_roles_matched"] = matched_roles
 
-    return UserStats(**stats)
+async def _keyset_page(db: AsyncSession, user_id: int, build, limit: int, **filters):
+    """Run a listing query from services/listing.py for one page"""
+    await _require_user(db, user_id)
+    try:
+        query = build(user_id, db.bind.dialect.name, **filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    rows = (await db.execute(query.limit(limit + 1))).all()
+    return listing.page(rows, limit)
+
+
+@router.get("/{user_id}/applications", response_model=ApplicationPage)
+async def list_applications(
+    user_id: int,
+    status: Optional[str] = None,
+    source: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(listing.DEFAULT_PAGE_SIZE, ge=1, le=listing.MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    return await _keyset_page(db, user_id, listing.applications_query, limit,
+                              status=status, source=source, cursor=cursor)
 
-@router.post("/{user_id}/search-jobs")
-async def search_and_apply_jobs(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
 
-    from ..services.job_search import JobSearchService
+@router.get("/{user_id}/applications/export")
+async def export_applications(
+    user_id: int,
+    format: str = "ndjson",
+    status: Optional[str] = None,
+    source: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    if format not in listing.EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(listing.EXPORT_FORMATS)}")
+    await _require_user(db, user_id)
+    # Validate filters before the 200 goes out; errors mid-stream cannot change it
+    try:
+        listing.applications_query(user_id, db.bind.dialect.name, status, source)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return StreamingResponse(
+        listing.stream_export(ReadSessionLocal, user_id, format, status, source),
+        media_type=listing.EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="applications-{user_id}.{format}"'},
+    )
+
+
+@router.get("/{user_id}/jobs", response_model=JobPage)
+async def list_jobs(
+    user_id: int,
+    source: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(listing.DEFAULT_PAGE_SIZE, ge=1, le=listing.MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    return await _keyset_page(db, user_id, listing.jobs_query, limit, source=source, cursor=cursor)
 
-    job_search_service = JobSearchService(db)
-    applications = job_search_service.process_jobs_for_user(user)
 
-    return {
-        "message": f"Processed {len(applications)} jobs for user {user_id}",
-        "applied_jobs": [a.job.title for a in applications]
-    }
+@router.get("/{user_id}/resume-versions", response_model=ResumeVersionPage)
+async def list_resume_versions(
+    user_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(listing.DEFAULT_PAGE_SIZE, ge=1, le=listing.MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    return await _keyset_page(db, user_id, listing.resume_versions_query, limit, cursor=cursor)
@@ -0,0 +1,20 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+
+def utcnow() -> datetime:
+    """The current time as a timezone-aware UTC datetime"""
+    return datetime.now(timezone.utc)
+
+
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """
+    ``value`` as an aware UTC datetime. SQLite hands DateTime(timezone=True)
+    columns back naive (stored as UTC) while Postgres returns them aware;
+    comparing or subtracting the two raises TypeError, so normalize first.
+    """
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
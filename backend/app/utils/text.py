@@ -0,0 +1,48 @@
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import string
+
+# Query parameters that only carry tracking info and never identify a posting
+TRACKING_PARAMS = {"ref", "refid", "trk", "trackingid", "src", "source", "gclid", "fbclid"}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form of a posting URL used as the dedup key: lower-cased
+    scheme and host, no "www.", no fragment, no trailing slash, tracking
+    parameters dropped and the remaining query sorted.
+    """
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = parts.path.rstrip("/") or "/"
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith("utm_")
+    )
+    return urlunsplit(((parts.scheme or "https").lower(), host, path, urlencode(query), ""))
+
+
+def normalize_source(source: str) -> str:
+    return (source or "unknown").strip().lower()
+
+
+def tokenize(text: str) -> set:
+    """Distinct lower-cased whitespace tokens, the unit skill matching works on"""
+    return set((text or "").lower().split())
+
+
+# Punctuation that separates words; + # . stay, they are part of skill
+# names like c++, c# and node.js
+WORD_SEPARATORS = str.maketrans({c: " " for c in string.punctuation if c not in "+#."})
+
+
+def word_tokens(text: str) -> list:
+    """
+    Lower-cased words in order, the unit ranking works on. A word ending a
+    sentence keeps its period ("python."); callers matching terms account
+    for that rather than paying to strip every token.
+    """
+    return (text or "").lower().translate(WORD_SEPARATORS).split()
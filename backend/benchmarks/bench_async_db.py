@@ -0,0 +1,114 @@
+"""
+Requests per second of one uvicorn worker under a mixed read/write load on
+the user routes: mostly GET /users/{id}, /stats and run polling, with a
+share of POST /search-jobs writes. Run it on this tree and on a checkout
+of the sync routes to compare.
+
+    python -m backend.benchmarks.bench_async_db --clients 64 --seconds 10 --write-ratio 0.2
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+
+DATA_DIR = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(DATA_DIR, 'bench_async.db')}")
+os.environ.setdefault("RUN_WORKERS", "0")
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+
+
+def start_server(port: int) -> uvicorn.Server:
+    from backend.app.main import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def seed_users(count: int):
+    from backend.app.db.database import SessionLocal
+    from backend.app.users.models import User
+
+    db = SessionLocal()
+    try:
+        users = [
+            User(full_name=f"Bench {i}", email=f"bench{i}-{time.time_ns()}@example.com",
+                 location_preference="Remote", years_experience=3,
+                 skills=["python", "sql"], desired_roles=["Engineer"])
+            for i in range(count)
+        ]
+        db.add_all(users)
+        db.commit()
+        return [u.id for u in users]
+    finally:
+        db.close()
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def client_loop(client: httpx.AsyncClient, user_ids, write_ratio: float, deadline: float, latencies, runs):
+    while time.perf_counter() < deadline:
+        user_id = random.choice(user_ids)
+        roll = random.random()
+        start = time.perf_counter()
+        if roll < write_ratio:
+            kind = "write"
+            response = await client.post(f"/users/{user_id}/search-jobs")
+            if response.status_code == 202:
+                runs.append((user_id, response.json()["run_id"]))
+        elif roll < write_ratio + 0.2 and runs:
+            kind = "poll"
+            run_user, run_id = random.choice(runs)
+            response = await client.get(f"/users/{run_user}/search-jobs/{run_id}")
+        elif roll < write_ratio + 0.4:
+            kind = "stats"
+            response = await client.get(f"/users/{user_id}/stats")
+        else:
+            kind = "read"
+            response = await client.get(f"/users/{user_id}")
+        response.raise_for_status()
+        latencies.setdefault(kind, []).append((time.perf_counter() - start) * 1000)
+
+
+async def measure(base_url: str, user_ids, clients: int, seconds: float, write_ratio: float):
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        latencies, runs = {}, []
+        deadline = time.perf_counter() + seconds
+        await asyncio.gather(*(
+            client_loop(client, user_ids, write_ratio, deadline, latencies, runs) for _ in range(clients)
+        ))
+
+    total = sum(len(v) for v in latencies.values())
+    print(f"{clients} clients, {seconds:.0f}s, write ratio {write_ratio}: {total / seconds:8.1f} req/s")
+    for kind, values in sorted(latencies.items()):
+        print(f"  {kind:<6} n={len(values):>6}  p50 {statistics.median(values):7.2f} ms  "
+              f"p99 {percentile(values, 0.99):7.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    server = start_server(args.port)
+    try:
+        ids = seed_users(args.users)
+        asyncio.run(measure(f"http://127.0.0.1:{args.port}", ids, args.clients, args.seconds, args.write_ratio))
+    finally:
+        server.should_exit = True
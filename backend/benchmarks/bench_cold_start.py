@@ -0,0 +1,123 @@
+"""
+Cold-start check: time to import backend.app.main in a fresh interpreter,
+and time from spawning uvicorn to the first healthy /health response, with
+and without the startup schema check. Also fails if importing the app
+pulls in a dependency that should only load on first use.
+
+    python -m backend.benchmarks.bench_cold_start --runs 5
+    python -m backend.benchmarks.bench_cold_start --max-import-ms 1500 --max-ready-ms 3000
+
+Exits 1 when a lazily-loaded module is imported at startup or a median
+exceeds its --max-* budget, so it can gate a release.
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Only needed by the pipeline (LLM calls, triage), the WeWorkRemotely adapter, the
+# email scanner and migrations
+LAZY_MODULES = ["openai", "bs4", "googleapiclient", "alembic", "numpy"]
+
+IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import backend.app.main
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "modules": [m for m in %r if m in sys.modules]}))
+""" % (LAZY_MODULES,)
+
+
+def scratch_env(**overrides) -> dict:
+    data_dir = tempfile.mkdtemp()
+    env = dict(os.environ)
+    env.update({
+        "PYTHONPATH": ROOT,
+        "DATABASE_URL": f"sqlite:///{os.path.join(data_dir, 'cold_start.db')}",
+        "RESUME_CACHE_PATH": os.path.join(data_dir, "resume_cache.db"),
+        "RUN_WORKERS": "2",
+    })
+    env.update(overrides)
+    return env
+
+
+def time_import(env: dict) -> dict:
+    output = subprocess.check_output([sys.executable, "-c", IMPORT_PROBE], env=env, cwd=ROOT, text=True)
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_ready(env: dict, timeout: float = 30.0) -> float:
+    """Seconds from spawning uvicorn until /health answers 200"""
+    port = free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                    return time.perf_counter() - start
+            except httpx.TransportError:
+                pass
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with {server.returncode}")
+            time.sleep(0.01)
+        raise TimeoutError(f"/health not ready after {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-import-ms", type=float, help="fail if the median import time is higher")
+    parser.add_argument("--max-ready-ms", type=float, help="fail if the median time to /health is higher")
+    args = parser.parse_args()
+
+    failures = []
+    imports = [time_import(scratch_env()) for _ in range(args.runs)]
+    import_ms = statistics.median(run["seconds"] for run in imports) * 1000
+    print(f"import backend.app.main        median {import_ms:8.1f} ms")
+    eager = sorted({module for run in imports for module in run["modules"]})
+    if eager:
+        failures.append(f"imported at startup: {', '.join(eager)}")
+    if args.max_import_ms and import_ms > args.max_import_ms:
+        failures.append(f"import took {import_ms:.0f} ms, budget {args.max_import_ms:.0f} ms")
+
+    for schema_check in ("1", "0"):
+        # A fresh database each run. With the check off, migrate it first the
+        # way a deploy would, so startup only opens the existing schema.
+        samples = []
+        for _ in range(args.runs):
+            env = scratch_env(DB_SCHEMA_CHECK=schema_check)
+            if schema_check == "0":
+                subprocess.check_call([sys.executable, "-m", "backend.app.db.migrate"], env=env, cwd=ROOT,
+                                      stdout=subprocess.DEVNULL)
+            samples.append(time_ready(env))
+        ready_ms = statistics.median(samples) * 1000
+        print(f"first healthy /health (DB_SCHEMA_CHECK={schema_check}) median {ready_ms:8.1f} ms")
+        if args.max_ready_ms and schema_check == "0" and ready_ms > args.max_ready_ms:
+            failures.append(f"/health took {ready_ms:.0f} ms to come up, budget {args.max_ready_ms:.0f} ms")
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✅ Cold start within budget")
@@ -0,0 +1,153 @@
+"""
+Email status reconciliation throughput on one core: classifying subjects,
+matching emails to applications, and reconcile_statuses end to end
+(classify, match, date parsing and the bulk UPDATE), over a synthetic batch
+of status mails for a user with many open applications.
+
+    python -m backend.benchmarks.bench_email_status --emails 100000 --applications 2000
+
+Subjects mix the phrases recruiters use with newsletters and receipts;
+the employer shows up in the sender domain, in the subject, or nowhere.
+Exits 1 when any stage handles fewer than --min-rate emails per second.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+STATUS_SUBJECTS = [
+    "Thank you for applying to {company}",
+    "Thanks for applying: {role}",
+    "Application received - {role} at {company}",
+    "Your application to {company}: next steps",
+    "Interview invitation from {company}",
+    "Unfortunately, we are not moving forward",
+    "Update on your {role} application",
+    "{company}: the position has been filled",
+    "We decided not to proceed with other candidates",
+]
+OTHER_SUBJECTS = ["Weekly newsletter", "Your order has shipped", "Security alert for your account",
+                  "{company} is hiring {role}s near you", "Invitation: team lunch", "Re: quick question"]
+ROLES = ["Software Engineer", "Backend Engineer", "Data Scientist", "Product Manager", "DevOps Engineer"]
+GENERIC_SENDERS = ["no-reply@greenhouse.io", "notifications@lever.co", "jobs@myworkday.com",
+                   "talent@smartrecruiters.com", "friend@gmail.com"]
+ZONES = ["+0000", "-0000", "-0700", "+0530", "+0100"]
+# Made-up words for company names
+VOCABULARY = [f"{a}{b}{c}" for a in "bdfgklmnprstvz" for b in "aeiou" for c in "bdklmnrstx"]
+
+
+def companies(count: int):
+    names = set()
+    while len(names) < count:
+        names.add(f"{random.choice(VOCABULARY).title()}{random.choice(VOCABULARY)} {random.choice(['Inc.', 'Labs', 'LLC', ''])}".strip())
+    return sorted(names)
+
+
+def email_batch(count: int, names):
+    """Email logs in the shape EmailScanner.scan_emails returns"""
+    now = datetime.now(timezone.utc)
+    logs = []
+    for i in range(count):
+        company = random.choice(names)
+        key = company.split()[0].lower()
+        template = random.choice(STATUS_SUBJECTS if random.random() < 0.7 else OTHER_SUBJECTS)
+        sender = random.random()
+        if sender < 0.5:
+            sender = f"Recruiting <jobs@{random.choice(['', 'mail.', 'careers.'])}{key}.com>"
+        else:
+            sender = random.choice(GENERIC_SENDERS)
+        when = now - timedelta(minutes=count - i)
+        logs.append({
+            "id": f"m{i:08d}",
+            "subject": template.format(company=company, role=random.choice(ROLES)),
+            "from": sender,
+            "date": when.strftime("%a, %d %b %Y %H:%M:%S ") + random.choice(ZONES),
+        })
+    return logs
+
+
+def scratch_user(applications: int, names):
+    """A user with one open application per company; returns (session, user id)"""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+    from backend.app.db.database import Base
+    from backend.app.services.job_ingest import upsert_jobs
+    from backend.app.users.models import User, BaseResume, ResumeVersion, JobApplication
+
+    engine = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_email_status.db')}")
+    Base.metadata.create_all(engine)
+    db = Session(bind=engine)
+    user = User(full_name="Bench User", email="bench@example.com", location_preference="Remote",
+                years_experience=5, skills=["python"], desired_roles=ROLES[:2])
+    db.add(user)
+    db.flush()
+    resume = BaseResume(user_id=user.id, file_path="/dev/null", content="resume")
+    db.add(resume)
+    job_ids = upsert_jobs(db, [
+        {"title": random.choice(ROLES), "company": name, "description": "python", "location": "Remote",
+         "source": "bench", "url": f"https://jobs.example.com/{i}"}
+        for i, name in enumerate(names[:applications])
+    ])
+    db.flush()
+    versions = [ResumeVersion(base_resume_id=resume.id, job_id=job_id, content="resume") for job_id in job_ids]
+    db.add_all(versions)
+    db.flush()
+    created = datetime.now(timezone.utc) - timedelta(days=90)
+    db.add_all([JobApplication(user_id=user.id, job_id=v.job_id, resume_version_id=v.id, status="applied",
+                               created_at=created) for v in versions])
+    db.commit()
+    return db, user.id
+
+
+def rate(count: int, seconds: float) -> float:
+    return count / seconds if seconds else float("inf")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--emails", type=int, default=100000)
+    parser.add_argument("--applications", type=int, default=2000, help="open applications, one company each")
+    parser.add_argument("--min-rate", type=float, default=20000, help="emails per second every stage must reach")
+    args = parser.parse_args()
+
+    from backend.app.services.email_status import ApplicationIndex, StatusClassifier, reconcile_statuses
+
+    random.seed(7)
+    names = companies(args.applications * 2)
+    logs = email_batch(args.emails, names)
+    db, user_id = scratch_user(args.applications, names)
+
+    classifier = StatusClassifier()
+    start = time.perf_counter()
+    statuses = [classifier.classify(log["subject"])[0] for log in logs]
+    classify_seconds = time.perf_counter() - start
+
+    index = ApplicationIndex.for_user(db, user_id)
+    status_logs = [log for log, status in zip(logs, statuses) if status]
+    start = time.perf_counter()
+    matched = sum(index.match(log["from"], log["subject"]) is not None for log in status_logs)
+    match_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    updated = reconcile_statuses(db, user_id, logs)
+    db.commit()
+    reconcile_seconds = time.perf_counter() - start
+    db.close()
+
+    stages = [
+        ("classify", len(logs), classify_seconds),
+        ("match", len(status_logs), match_seconds),
+        ("reconcile", len(logs), reconcile_seconds),
+    ]
+    print(f"{'stage':<10} {'emails':>8} {'seconds':>8} {'emails/s':>10}")
+    for name, count, seconds in stages:
+        print(f"{name:<10} {count:>8} {seconds:>8.3f} {rate(count, seconds):>10.0f}")
+    print(f"{len(status_logs)} status mails, {matched} matched to an application, {updated} applications updated")
+
+    slow = [name for name, count, seconds in stages if rate(count, seconds) < args.min_rate]
+    if slow:
+        print(f"❌ below {args.min_rate:.0f} emails/s: {', '.join(slow)}")
+        raise SystemExit(1)
+    print(f"✅ Every stage above {args.min_rate:.0f} emails/s")
@@ -0,0 +1,92 @@
+"""
+Full versus incremental EmailScanner sync against the fake Gmail server.
+
+    python -m backend.benchmarks.bench_email_sync --mailbox 5000 --new 50
+
+The incremental scan should cost a handful of requests regardless of
+mailbox size. Two scans then fail --failing of the new messages with
+500s, then let them through; exits 1 unless the next scan recovers them.
+A last scan is not checkpointed, as when storing its emails fails; exits 1
+unless the scan after it finds the same messages again.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import httplib2
+
+from backend.benchmarks.fake_gmail import start_fake_gmail
+from backend.email_scanner import EmailScanner
+
+
+ACCOUNT = "bench"
+
+
+def scan(fake, scanner: EmailScanner, incremental: bool, save: bool = True):
+    fake.stats.clear()
+    start = time.perf_counter()
+    logs, state = scanner.scan_emails(incremental=incremental, account=ACCOUNT)
+    if save:
+        scanner.save_state(ACCOUNT, state)
+    return time.perf_counter() - start, len(logs), dict(fake.stats)
+
+
+def pending_ids(state_path: str):
+    with open(state_path) as f:
+        return json.load(f)[ACCOUNT]["pending_ids"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mailbox", type=int, default=5000)
+    parser.add_argument("--new", type=int, default=50)
+    parser.add_argument("--failing", type=int, default=5)
+    args = parser.parse_args()
+
+    fake = start_fake_gmail(messages=args.mailbox)
+    state_path = os.path.join(tempfile.mkdtemp(), "gmail_sync_state.json")
+    scanner = EmailScanner(state_path=state_path, discovery_url=fake.discovery_url, http=httplib2.Http())
+
+    elapsed, found, requests = scan(fake, scanner, incremental=False)
+    print(f"full sync        {args.mailbox:>7} messages  {elapsed:7.2f}s  {found:>6} status mails  {requests}")
+
+    fake.mailbox.add(args.new)
+    elapsed, found, requests = scan(fake, scanner, incremental=True)
+    print(f"incremental sync {args.new:>7} messages  {elapsed:7.2f}s  {found:>6} status mails  {requests}")
+
+    fake.mailbox.add(args.new)
+    failing = [m["id"] for m in fake.mailbox.messages[-args.failing:]] if args.failing else []
+    fake.failing.update(failing)
+    elapsed, found, requests = scan(fake, scanner, incremental=True)
+    print(f"with failures    {args.new:>7} messages  {elapsed:7.2f}s  {found:>6} status mails  {requests}")
+    pending = pending_ids(state_path)
+
+    fake.failing.clear()
+    elapsed, found, requests = scan(fake, scanner, incremental=True)
+    print(f"retry            {len(pending):>7} messages  {elapsed:7.2f}s  {found:>6} status mails  {requests}")
+    left = pending_ids(state_path)
+    refetched = requests.get("messages.get", 0)
+
+    fake.mailbox.add(args.new)
+    elapsed, unsaved, requests = scan(fake, scanner, incremental=True, save=False)
+    print(f"not checkpointed {args.new:>7} messages  {elapsed:7.2f}s  {unsaved:>6} status mails  {requests}")
+    elapsed, rescanned, requests = scan(fake, scanner, incremental=True)
+    print(f"rescan           {args.new:>7} messages  {elapsed:7.2f}s  {rescanned:>6} status mails  {requests}")
+    fake.shutdown()
+
+    ok = True
+    if sorted(pending) != sorted(failing) or left or refetched != len(failing):
+        print(f"❌ failed messages not carried over: {len(failing)} failed, {len(pending)} saved, "
+              f"{refetched} refetched, {len(left)} still pending")
+        ok = False
+    else:
+        print(f"✅ {len(failing)} failed messages fetched by the next scan")
+    if rescanned != unsaved or requests.get("messages.get", 0) != args.new:
+        print(f"❌ scan after an unsaved one found {rescanned} status mails, expected {unsaved}")
+        ok = False
+    else:
+        print(f"✅ {unsaved} status mails of an unsaved scan found again by the next one")
+    if not ok:
+        raise SystemExit(1)
@@ -0,0 +1,211 @@
+"""
+Applications export and keyset listing on a user with many applications.
+
+Seeds one user with --applications rows, then:
+- walks GET /users/{id}/applications page by page and checks every row
+  comes back exactly once, in (created_at, id) order
+- streams GET /users/{id}/applications/export while other clients hit
+  GET /users/{id}, and compares their latency with an idle server
+- exports again under tracemalloc to record the export's peak memory
+
+    python -m backend.benchmarks.bench_export --applications 100000
+    python -m backend.benchmarks.bench_export --format csv --max-peak-mb 64
+
+Exits 1 when the listing skips or repeats a row, the export row count is
+wrong, or the export's peak memory exceeds --max-peak-mb.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+DATA_DIR = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(DATA_DIR, 'bench_export.db')}")
+os.environ.setdefault("RUN_WORKERS", "0")
+
+import httpx  # noqa: E402
+
+from backend.benchmarks.bench_async_db import start_server, percentile  # noqa: E402
+
+CHUNK = 10000
+
+
+def seed_applications(count: int) -> int:
+    """
+    One user with ``count`` applications, each to its own job. Most rows
+    carry explicit timestamps with many exact ties; the last 1% take the
+    server default, which SQLite stores without microseconds.
+    """
+    from datetime import timedelta
+    from sqlalchemy import insert
+    from backend.app.db.database import SessionLocal
+    from backend.app.users.models import User, BaseResume, Job, ResumeVersion, JobApplication
+
+    db = SessionLocal()
+    try:
+        user = User(full_name="Export Bench", email=f"export-{time.time_ns()}@example.com",
+                    location_preference="Remote", years_experience=3, skills=["python"], desired_roles=["Engineer"])
+        db.add(user)
+        db.flush()
+        resume = BaseResume(user_id=user.id, file_path="/dev/null", content="Python engineer")
+        db.add(resume)
+        db.flush()
+
+        now = datetime.utcnow()
+        defaulted = count // 100
+        for start in range(0, count, CHUNK):
+            indexes = range(start, min(start + CHUNK, count))
+            job_ids = db.scalars(insert(Job).returning(Job.id), [
+                {"title": "Engineer", "company": f"Company {i % 500}", "description": "Build things",
+                 "location": "Remote", "source": ("remoteok", "weworkremotely")[i % 2],
+                 "url": f"https://jobs.example.com/export/{i}"}
+                for i in indexes
+            ]).all()
+            version_ids = db.scalars(insert(ResumeVersion).returning(ResumeVersion.id), [
+                {"base_resume_id": resume.id, "job_id": job_id, "content": "Tailored"} for job_id in job_ids
+            ]).all()
+            rows = []
+            for i, job_id, version_id in zip(indexes, job_ids, version_ids):
+                row = {"user_id": user.id, "job_id": job_id, "resume_version_id": version_id,
+                       "status": ("applied", "seen", "rejected")[i % 3]}
+                if i < count - defaulted:
+                    # Ten rows per timestamp, so pages often split a tie
+                    row["created_at"] = now - timedelta(minutes=i // 10)
+                rows.append(row)
+            db.execute(insert(JobApplication), rows)
+        db.commit()
+        return user.id
+    finally:
+        db.close()
+
+
+async def walk_pages(client: httpx.AsyncClient, user_id: int, limit: int) -> list:
+    """(created_at, id) of every row, following next_cursor to the end"""
+    seen, cursor = [], None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = await client.get(f"/users/{user_id}/applications", params=params)
+        response.raise_for_status()
+        body = response.json()
+        seen.extend((item["created_at"], item["id"]) for item in body["items"])
+        cursor = body["next_cursor"]
+        if not cursor:
+            return seen
+
+
+async def export(client: httpx.AsyncClient, user_id: int, fmt: str) -> int:
+    lines = 0
+    async with client.stream("GET", f"/users/{user_id}/applications/export", params={"format": fmt}) as response:
+        response.raise_for_status()
+        async for chunk in response.aiter_bytes():
+            lines += chunk.count(b"\n")
+    return lines - (1 if fmt == "csv" else 0)
+
+
+async def probe(client: httpx.AsyncClient, user_id: int, done: asyncio.Event, latencies: list):
+    while not done.is_set():
+        start = time.perf_counter()
+        (await client.get(f"/users/{user_id}")).raise_for_status()
+        latencies.append(time.perf_counter() - start)
+
+
+async def probed(client: httpx.AsyncClient, user_id: int, clients: int, work) -> list:
+    """Latencies of GET /users/{id} from ``clients`` loops while ``work`` runs"""
+    latencies = []
+    done = asyncio.Event()
+    probes = [asyncio.create_task(probe(client, user_id, done, latencies)) for _ in range(clients)]
+    try:
+        await work
+    finally:
+        done.set()
+        await asyncio.gather(*probes)
+    return latencies
+
+
+def describe(latencies: list) -> str:
+    if not latencies:
+        return "no requests"
+    return (f"{len(latencies)} GET /users/{{id}}, p50 {percentile(latencies, 0.5) * 1000:.1f} ms, "
+            f"p99 {percentile(latencies, 0.99) * 1000:.1f} ms")
+
+
+def in_order(seen: list) -> bool:
+    keys = [(datetime.fromisoformat(created_at), row_id) for created_at, row_id in seen]
+    return all(a > b for a, b in zip(keys, keys[1:]))
+
+
+async def run(base_url: str, user_id: int, args) -> list:
+    failures = []
+    async with httpx.AsyncClient(base_url=base_url, timeout=300) as client:
+        start = time.perf_counter()
+        seen = await walk_pages(client, user_id, args.page_size)
+        elapsed = time.perf_counter() - start
+        ids = [row_id for _, row_id in seen]
+        pages = -(-len(seen) // args.page_size)
+        print(f"listing   {len(seen)} rows in {pages} pages, {elapsed:.1f}s ({pages / elapsed:.0f} pages/s)")
+        if len(ids) != args.applications or len(set(ids)) != len(ids):
+            failures.append(f"listing returned {len(ids)} rows, {len(set(ids))} distinct, "
+                            f"expected {args.applications}")
+        if not in_order(seen):
+            failures.append("listing is not in (created_at, id) descending order")
+
+        print(f"idle      {describe(await probed(client, user_id, args.clients, asyncio.sleep(1)))}")
+
+        result = {}
+
+        async def timed_export():
+            start = time.perf_counter()
+            result["rows"] = await export(client, user_id, args.format)
+            result["seconds"] = time.perf_counter() - start
+
+        latencies = await probed(client, user_id, args.clients, timed_export())
+        rows = result["rows"]
+        print(f"export    {rows} rows as {args.format} in {result['seconds']:.1f}s "
+              f"({rows / result['seconds']:.0f} rows/s)")
+        print(f"during    {describe(latencies)}")
+        if rows != args.applications:
+            failures.append(f"export returned {rows} rows, expected {args.applications}")
+
+        # Memory on its own pass: tracing slows everything down
+        tracemalloc.start()
+        await export(client, user_id, args.format)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peak_mb = peak / 1024 / 1024
+        print(f"memory    export peak traced allocations {peak_mb:.1f} MB")
+        if args.max_peak_mb and peak_mb > args.max_peak_mb:
+            failures.append(f"export peaked at {peak_mb:.1f} MB, budget {args.max_peak_mb:.0f} MB")
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--applications", type=int, default=100000)
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--clients", type=int, default=4, help="concurrent GET /users/{id} loops during the export")
+    parser.add_argument("--max-peak-mb", type=float, default=64.0)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    from backend.app.db.migrate import upgrade_database
+    upgrade_database()
+
+    start = time.perf_counter()
+    user_id = seed_applications(args.applications)
+    print(f"seeded    {args.applications} applications in {time.perf_counter() - start:.1f}s")
+
+    server = start_server(args.port)
+    try:
+        failures = asyncio.run(run(f"http://127.0.0.1:{args.port}", user_id, args))
+    finally:
+        server.should_exit = True
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        raise SystemExit(1)
+    print("✅ Listing and export correct and within budget")
@@ -0,0 +1,103 @@
+"""
+Load test: p50/p99 latency of GET /health while large resumes are uploaded
+to POST /users/intake concurrently. With streaming intake the /health
+percentiles should stay flat whether or not uploads are running.
+
+    python -m backend.benchmarks.bench_intake_load --uploads 16 --size-mb 8
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+DATA_DIR = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(DATA_DIR, 'bench_intake.db')}")
+# Uploads land here, never in the tracked backend/data/resumes
+os.environ.setdefault("RESUME_ROOT", os.path.join(DATA_DIR, "resumes"))
+os.environ.setdefault("RUN_WORKERS", "0")
+os.environ.setdefault("MAX_RESUME_BYTES", str(64 * 1024 * 1024))
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+
+
+def start_server(port: int) -> uvicorn.Server:
+    from backend.app.main import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def probe_health(client: httpx.AsyncClient, stop: asyncio.Event, interval: float = 0.01):
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/health")
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def upload(client: httpx.AsyncClient, index: int, payload: bytes):
+    user = {
+        "full_name": f"Load {index}", "email": f"load{index}-{time.time_ns()}@example.com",
+        "location_preference": "Remote", "years_experience": 3,
+        "skills": ["python"], "desired_roles": ["Engineer"],
+    }
+    response = await client.post(
+        "/users/intake",
+        data={"user_data": json.dumps(user)},
+        files={"resume_file": (f"resume{index}.txt", payload, "text/plain")},
+    )
+    response.raise_for_status()
+
+
+async def measure(base_url: str, uploads: int, size_mb: int, seconds: float):
+    line = b"- Built data pipelines in Python and SQL on AWS, cutting costs by 30%\n"
+    payload = line * (size_mb * 1024 * 1024 // len(line))
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        stop = asyncio.Event()
+        probe = asyncio.create_task(probe_health(client, stop))
+        await asyncio.sleep(seconds)
+        stop.set()
+        idle = await probe
+
+        stop = asyncio.Event()
+        probe = asyncio.create_task(probe_health(client, stop))
+        start = time.perf_counter()
+        await asyncio.gather(*(upload(client, i, payload) for i in range(uploads)))
+        upload_time = time.perf_counter() - start
+        stop.set()
+        busy = await probe
+
+    for label, latencies in (("idle", idle), (f"{uploads} uploads", busy)):
+        print(f"/health {label:<12} n={len(latencies):>5}  p50 {statistics.median(latencies):6.2f} ms  "
+              f"p99 {percentile(latencies, 0.99):6.2f} ms")
+    print(f"uploaded {uploads} x {size_mb} MB in {upload_time:.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--uploads", type=int, default=16)
+    parser.add_argument("--size-mb", type=int, default=8)
+    parser.add_argument("--idle-seconds", type=float, default=2.0)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    server = start_server(args.port)
+    try:
+        asyncio.run(measure(f"http://127.0.0.1:{args.port}", args.uploads, args.size_mb, args.idle_seconds))
+    finally:
+        server.should_exit = True
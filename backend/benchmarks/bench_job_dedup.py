@@ -0,0 +1,205 @@
+"""
+Near-duplicate clustering on a growing jobs table: how well it finds the
+same role reposted on other boards, what fingerprinting adds to ingest, and
+how the duplicate lookup for a new batch grows with the table, next to
+comparing the batch against every stored signature.
+
+    python -m backend.benchmarks.bench_job_dedup --sizes 10000 40000 160000
+
+Reposts copy a posting with the edits boards make: abbreviated titles,
+company suffixes, a few words changed and board boilerplate added. Hard
+negatives reuse a company's description for another role, or a role and
+description at another company. Exits 1 when precision or recall falls
+below --min-precision / --min-recall, or the lookup grows with the table
+faster than --max-growth allows.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from backend.benchmarks.bench_async_db import percentile
+from backend.benchmarks.bench_prompt_builder import SKILLS
+
+TITLES = ["Software Engineer", "Backend Engineer", "Frontend Developer", "Data Scientist", "Data Engineer",
+          "Machine Learning Engineer", "DevOps Engineer", "Product Manager", "Site Reliability Engineer",
+          "Mobile Developer", "Security Engineer", "QA Engineer", "Solutions Architect", "Engineering Manager"]
+LEVELS = ["", "Senior ", "Junior ", "Staff ", "Lead "]
+ABBREVIATIONS = {"Senior": "Sr.", "Junior": "Jr.", "Engineer": "Eng", "Developer": "Dev"}
+BOILERPLATE = ["Apply now!", "Posted via our careers partner.", "Equal opportunity employer.",
+               "Click apply to learn more about this role."]
+# Pseudo-words, so descriptions differ the way real ones do
+VOCABULARY = [f"{a}{b}{c}" for a in "bdfgklmnprstvz" for b in "aeiou" for c in "bdklmnrstx"] + SKILLS
+
+
+def company_name(i: int) -> str:
+    return f"{random.choice(VOCABULARY).title()} {random.choice(VOCABULARY).title()} {i}"
+
+
+def description() -> str:
+    return " ".join(random.choices(VOCABULARY, k=random.randint(60, 160)))
+
+
+def repost(posting: dict, board: str, index: int) -> dict:
+    """``posting`` as another board would show it"""
+    title = " ".join(ABBREVIATIONS.get(word, word) if random.random() < 0.5 else word
+                     for word in posting["title"].split())
+    company = posting["company"] + random.choice(["", " Inc.", ", LLC", " Inc"])
+    words = posting["description"].split()
+    for _ in range(max(len(words) // 40, 1)):
+        words[random.randrange(len(words))] = random.choice(VOCABULARY)
+    text = " ".join(words) + " " + random.choice(BOILERPLATE)
+    return dict(posting, title=title, company=company, description=text, source=board,
+                url=f"https://{board}.example.com/jobs/{index}")
+
+
+def corpus(count: int, repost_rate: float, tag: str):
+    """Postings with reposts mixed in, and the group (role) of each"""
+    postings, groups = [], []
+    while len(postings) < count:
+        index = len(postings)
+        base = {"title": random.choice(LEVELS) + random.choice(TITLES), "company": company_name(index),
+                "description": description(), "location": "Remote", "source": "board0",
+                "url": f"https://board0.example.com/{tag}/{index}"}
+        if postings and random.random() < 0.05:
+            # Hard negatives: another role with the same description, or the
+            # same role and description at another company
+            other = postings[random.randrange(len(postings))]
+            if random.random() < 0.5:
+                base["company"], base["description"] = other["company"], other["description"]
+                base["title"] = random.choice([level + title for level in LEVELS for title in TITLES
+                                               if level + title != other["title"]])
+            else:
+                base["title"], base["description"] = other["title"], other["description"]
+        postings.append(base)
+        groups.append(index)
+        if random.random() < repost_rate:
+            for board in random.sample(["board1", "board2", "board3"], random.randint(1, 2)):
+                postings.append(repost(base, board, f"{tag}/{len(postings)}"))
+                groups.append(index)
+    return postings[:count], groups[:count]
+
+
+def pairs(labels) -> set:
+    members = {}
+    for position, label in enumerate(labels):
+        members.setdefault(label, []).append(position)
+    return {(a, b) for group in members.values() for i, a in enumerate(group) for b in group[i + 1:]}
+
+
+def scratch_session():
+    from sqlalchemy.orm import Session
+    from backend.app.db.engine import make_engine
+    from backend.app.db.migrate import upgrade_database
+
+    engine = make_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_job_dedup.db')}")
+    upgrade_database(engine)
+    return Session(bind=engine)
+
+
+def brute_force(db, batch_signatures):
+    """The lookup without LSH: every stored signature against the batch"""
+    import numpy as np
+    from backend.app.users.models import JobFingerprint
+
+    stored = np.frombuffer(b"".join(signature for (signature,) in db.query(JobFingerprint.signature)),
+                           dtype=np.uint32).reshape(-1, batch_signatures.shape[1])
+    return [(stored == signature).mean(axis=1).argmax() for signature in batch_signatures]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 40000, 160000])
+    parser.add_argument("--batch", type=int, default=200, help="postings per timed lookup, like one board fetch")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--repost-rate", type=float, default=0.2)
+    parser.add_argument("--min-precision", type=float, default=0.98)
+    parser.add_argument("--min-recall", type=float, default=0.95)
+    parser.add_argument("--max-growth", type=float, default=0.5,
+                        help="allowed lookup time growth relative to table growth (1 is linear)")
+    args = parser.parse_args()
+
+    from sqlalchemy import func
+    from backend.app.services import job_dedup
+    from backend.app.services.job_ingest import upsert_jobs
+    from backend.app.users.models import Job
+
+    random.seed(7)
+    failures = []
+    db = scratch_session()
+
+    # Fingerprinting is timed inside ingest through the module job_ingest calls
+    assign_clusters = job_dedup.assign_clusters
+    spent = {"dedup": 0.0}
+
+    def timed_assign(session, jobs):
+        start = time.perf_counter()
+        try:
+            return assign_clusters(session, jobs)
+        finally:
+            spent["dedup"] += time.perf_counter() - start
+
+    job_dedup.assign_clusters = timed_assign
+
+    postings, groups = corpus(max(args.sizes), args.repost_rate, "stored")
+    print(f"{'jobs':>8} {'ingest s':>9} {'dedup %':>8} {'LSH p50 ms':>11} {'p95 ms':>8} {'full scan p50 ms':>17}")
+    lookups = []
+    stored = 0
+    try:
+        for size in sorted(args.sizes):
+            spent["dedup"] = 0.0
+            start = time.perf_counter()
+            upsert_jobs(db, postings[stored:size])
+            db.commit()
+            ingest_seconds = time.perf_counter() - start
+            ingest_dedup = spent["dedup"]
+            stored = size
+
+            lsh, scan = [], []
+            for attempt in range(args.repeat):
+                # Half reposts of stored roles, half new roles
+                batch = [repost(random.choice(postings[:size]), "board9", f"probe/{size}/{attempt}/{i}")
+                         for i in range(args.batch // 2)]
+                batch += corpus(args.batch - len(batch), 0, f"probe/{size}/{attempt}")[0]
+                spent["dedup"] = 0.0
+                upsert_jobs(db, batch)
+                lsh.append(spent["dedup"])
+                db.rollback()
+
+                signatures = job_dedup.signatures([job_dedup.features(p["title"], p["company"], p["description"])
+                                                   for p in batch])
+                start = time.perf_counter()
+                brute_force(db, signatures)
+                scan.append(time.perf_counter() - start)
+            lookups.append((size, percentile(lsh, 0.5)))
+            print(f"{size:>8} {ingest_seconds:>9.1f} {ingest_dedup / ingest_seconds * 100:>7.0f}% "
+                  f"{percentile(lsh, 0.5) * 1000:>11.1f} {percentile(lsh, 0.95) * 1000:>8.1f} "
+                  f"{percentile(scan, 0.5) * 1000:>17.1f}")
+
+        clusters = [cluster_id for (cluster_id,) in db.query(Job.cluster_id).order_by(Job.id)]
+        found, expected = pairs(clusters), pairs(groups[:stored])
+        precision = len(found & expected) / max(len(found), 1)
+        recall = len(found & expected) / max(len(expected), 1)
+        roles = db.query(func.count(func.distinct(Job.cluster_id))).scalar()
+    finally:
+        db.close()
+        job_dedup.assign_clusters = assign_clusters
+
+    print(f"clusters  {stored} postings -> {roles} roles ({len(set(groups[:stored]))} expected); "
+          f"duplicate pairs: precision {precision:.3f}, recall {recall:.3f}")
+    if precision < args.min_precision:
+        failures.append(f"precision {precision:.3f} below {args.min_precision}")
+    if recall < args.min_recall:
+        failures.append(f"recall {recall:.3f} below {args.min_recall}")
+    (small, small_time), (large, large_time) = lookups[0], lookups[-1]
+    growth = (large_time / small_time) / (large / small)
+    print(f"growth    lookup x{large_time / small_time:.2f} for a x{large / small:.0f} larger table")
+    if len(lookups) > 1 and growth > args.max_growth:
+        failures.append(f"lookup grew x{large_time / small_time:.2f} for a x{large / small:.0f} table")
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        raise SystemExit(1)
+    print("✅ Near-duplicate clustering within budget")
@@ -0,0 +1,132 @@
+"""
+Full-text job search on a stored corpus: query latency of the index
+against a LIKE scan of the same columns, and what keeping the index in
+sync adds to ingest.
+
+    python -m backend.benchmarks.bench_job_search --jobs 50000
+
+Exits 1 when the indexed search p95 exceeds --max-p95-ms or misses a job
+the LIKE scan finds.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from backend.benchmarks.bench_async_db import percentile
+from backend.benchmarks.synthetic_data import synthetic_postings
+
+QUERIES = ["python", "senior engineer", "machine learning", "data scientist remote", "react developer",
+           "devops kubernetes", "product manager", "backend python sql", "frontend engineer", "cloud architect"]
+
+
+def scratch_engine(revision: str):
+    from backend.app.db.engine import make_engine
+    from backend.app.db.migrate import upgrade_database
+
+    engine = make_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_job_search.db')}")
+    upgrade_database(engine, revision)
+    return engine
+
+
+def ingest(engine, postings) -> float:
+    from sqlalchemy.orm import Session
+    from backend.app.services.job_ingest import upsert_jobs
+
+    db = Session(bind=engine)
+    try:
+        start = time.perf_counter()
+        upsert_jobs(db, postings)
+        db.commit()
+        return time.perf_counter() - start
+    finally:
+        db.close()
+
+
+def like_scan(db, q: str, limit: int):
+    """
+    The search without an index: every word in one of the searchable
+    columns, newest first. The ordering keeps the scan from stopping at the
+    first ``limit`` matches, as ranking does for the index.
+    """
+    from sqlalchemy import or_
+    from backend.app.users.models import Job
+
+    query = db.query(Job.id)
+    for word in q.split():
+        query = query.filter(or_(*[column.icontains(word) for column in
+                                   (Job.title, Job.company, Job.description, Job.location)]))
+    return [job_id for (job_id,) in query.order_by(Job.posted_date.desc(), Job.id.desc()).limit(limit)]
+
+
+def whole_words(db, job_id: int) -> set:
+    from backend.app.users.models import Job
+    from backend.app.utils.text import word_tokens
+
+    job = db.get(Job, job_id)
+    text = " ".join([job.title, job.company, job.description, job.location])
+    return {word.rstrip(".") for word in word_tokens(text)}
+
+
+def timed_queries(run, repeat: int) -> list:
+    timings = []
+    for _ in range(repeat):
+        for q in QUERIES:
+            start = time.perf_counter()
+            run(q)
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=50000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-p95-ms", type=float, default=100.0)
+    args = parser.parse_args()
+
+    from sqlalchemy.orm import Session
+    from backend.app.services.job_index import search_jobs
+
+    postings = synthetic_postings(args.jobs, "search")
+    random.shuffle(postings)
+    without_index = ingest(scratch_engine("0003"), postings)
+    engine = scratch_engine("head")
+    with_index = ingest(engine, postings)
+    print(f"ingest    {args.jobs} postings: {without_index:.1f}s without the index, {with_index:.1f}s with it "
+          f"({(with_index / without_index - 1) * 100:+.0f}%)")
+
+    failures = []
+    db = Session(bind=engine)
+    try:
+        matches = []
+        for q in QUERIES:
+            found = {hit["id"] for hit in search_jobs(db, q, limit=args.jobs)}
+            matches.append(len(found))
+            # LIKE also matches inside words ("java" in "javascript"); only
+            # jobs containing every query word as a whole word must be found
+            missed = [job_id for job_id in set(like_scan(db, q, args.jobs)) - found
+                      if set(q.split()) <= whole_words(db, job_id)]
+            if missed:
+                failures.append(f"{q!r}: index missed {len(missed)} jobs, e.g. {missed[0]}")
+
+        indexed = timed_queries(lambda q: search_jobs(db, q, limit=args.limit), args.repeat)
+        scanned = timed_queries(lambda q: like_scan(db, q, args.limit), args.repeat)
+    finally:
+        db.close()
+
+    print(f"matches   {min(matches)} to {max(matches)} jobs per query, ranked for the top {args.limit}")
+    for label, timings in (("index", indexed), ("LIKE scan", scanned)):
+        print(f"{label:<9} {len(timings)} queries: p50 {percentile(timings, 0.5) * 1000:7.2f} ms, "
+              f"p95 {percentile(timings, 0.95) * 1000:7.2f} ms")
+    p95 = percentile(indexed, 0.95) * 1000
+    if p95 > args.max_p95_ms:
+        failures.append(f"indexed search p95 {p95:.1f} ms, budget {args.max_p95_ms:.0f} ms")
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        raise SystemExit(1)
+    print("✅ Job search within budget")
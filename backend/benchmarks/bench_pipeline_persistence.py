@@ -0,0 +1,80 @@
+"""
+Commits per run and wall time of the pipeline's persistence stage, per-object
+commits (apply_to_job) versus the unit-of-work bulk path.
+
+    python -m backend.benchmarks.bench_pipeline_persistence --jobs 200
+
+The LLM is replaced by an instant stub so only database work is measured.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+DB_FILE = os.path.join(tempfile.mkdtemp(), "bench_pipeline.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{DB_FILE}")
+os.environ.setdefault("OPENAI_API_KEY", "fake")
+
+from sqlalchemy import event  # noqa: E402
+from backend.app.db.database import Base, SessionLocal, engine  # noqa: E402
+from backend.app.users.models import User, BaseResume  # noqa: E402
+from backend.app.services.job_ingest import ingest_jobs  # noqa: E402
+from backend.app.services.job_search import JobSearchService  # noqa: E402
+from backend.app.services.llm_executor import LLMExecutor, RateLimiter  # noqa: E402
+
+
+class StubAgent:
+    def customize_resume(self, resume_content, job_description):
+        return f"Tailored for: {job_description[:80]}"
+
+
+def seed_user(db, label: str) -> User:
+    user = User(full_name=label, email=f"{label}@example.com", location_preference="Remote",
+                years_experience=3, skills=["python", "sql", "aws"], desired_roles=["Engineer"])
+    db.add(user)
+    db.flush()
+    db.add(BaseResume(user_id=user.id, file_path="/dev/null", content="Python engineer"))
+    db.commit()
+    return user
+
+
+def run(label: str, jobs: int, **service_options) -> None:
+    db = SessionLocal()
+    commits = {"n": 0}
+    event.listen(db, "after_commit", lambda session: commits.__setitem__("n", commits["n"] + 1))
+    try:
+        user = seed_user(db, label)
+        postings = [
+            {"title": "Engineer", "company": f"Co {i}", "description": f"Python SQL role {i}",
+             "location": "Remote", "source": label, "url": f"https://example.com/{label}/{i}"}
+            for i in range(jobs)
+        ]
+        found = ingest_jobs(db, postings)
+
+        executor = LLMExecutor(max_concurrency=8, limiter=RateLimiter(1e9, 1e12))
+        # top_k=0: every posting reaches persistence, which is what is measured
+        service = JobSearchService(db, executor=executor, top_k=0, **service_options)
+        service.resume_agent = StubAgent()
+        service.search_jobs_for_user = lambda user: found
+
+        commits["n"] = 0
+        start = time.perf_counter()
+        applications = service.process_jobs_for_user(user)
+        elapsed = time.perf_counter() - start
+        executor.pool.shutdown()
+        print(f"{label:<14} {len(applications):>5} applications  {commits['n']:>5} commits  "
+              f"{elapsed * 1000:8.1f} ms")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--chunk-size", type=int, default=50)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    run("per-object", args.jobs, unit_of_work=False)
+    run("bulk", args.jobs, unit_of_work=True, chunk_size=0)
+    run("bulk-chunked", args.jobs, unit_of_work=True, chunk_size=args.chunk_size)
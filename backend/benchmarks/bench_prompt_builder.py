@@ -0,0 +1,93 @@
+"""
+Offline benchmark of the prompt builder on a synthetic corpus: prompt
+tokens before and after trimming, build time, and how many of the bullets
+that mention the posting's skills survive the cut. Every resume line must
+come back when an unchanged excerpt is passed through restore_omitted.
+
+    python -m backend.benchmarks.bench_prompt_builder --resumes 200 --budget 1200
+"""
+import argparse
+import random
+import statistics
+import time
+
+from backend.app import prompt_builder
+from backend.app.prompt_builder import build_prompt_inputs, restore_omitted
+
+SKILLS = ["python", "java", "kubernetes", "terraform", "react", "typescript", "postgresql", "spark",
+          "airflow", "pytorch", "tensorflow", "aws", "gcp", "docker", "kafka", "graphql", "rust", "go"]
+VERBS = ["Built", "Led", "Designed", "Migrated", "Optimized", "Shipped", "Automated", "Scaled"]
+FILLER = ["cross-functional stakeholders", "quarterly roadmap", "customer-facing dashboards",
+          "internal tooling", "on-call rotation", "code reviews", "hiring loops", "documentation"]
+BOILERPLATE = [
+    "About us\nWe are a fast-growing company on a mission to change how the world works. "
+    "Our values guide everything we do.",
+    "Benefits\n- Competitive salary\n- 401(k) matching\n- Health, dental and vision\n- Unlimited PTO",
+    "We are an equal opportunity employer and value diversity. All qualified applicants will receive "
+    "consideration regardless of race, gender, age or disability. Reasonable accommodation is available.",
+    "To apply, click apply now and submit your resume.",
+]
+
+
+def bullet(skills):
+    return (f"- {random.choice(VERBS)} {random.choice(FILLER)} using {' and '.join(skills)}, "
+            f"improving throughput by {random.randint(10, 90)}% across {random.randint(2, 40)} teams")
+
+
+def synthetic_resume(bullets_per_role: int = 8, roles: int = 6) -> str:
+    lines = ["Jane Doe", "Senior Engineer | jane@example.com | (555) 010-0000", "",
+             "Professional Summary",
+             "Engineer with a decade of experience building data and platform systems.", "",
+             "Skills", ", ".join(random.sample(SKILLS, 10)), "", "Experience"]
+    for r in range(roles):
+        lines.append(f"Company {r} — Engineer ({2014 + r}-{2015 + r})")
+        lines.extend(bullet(random.sample(SKILLS, 2)) for _ in range(bullets_per_role))
+        lines.append("")
+    lines += ["Projects"] + [bullet(random.sample(SKILLS, 2)) for _ in range(6)]
+    lines += ["", "Education", "B.S. Computer Science, State University"]
+    return "\n".join(lines)
+
+
+def synthetic_posting(required):
+    body = (f"Senior Platform Engineer\n\nWe need someone strong in {', '.join(required)}. "
+            f"You will own services written in {required[0]} and infrastructure on {required[1]}.\n\n"
+            "Responsibilities\n" + "\n".join(f"- Work with {s} daily" for s in required))
+    return "\n\n".join([random.choice(BOILERPLATE[:1]), body] + BOILERPLATE[1:])
+
+
+def main(resumes: int, budget: int, job_budget: int):
+    before, after, times, recall, lost = [], [], [], [], 0
+    for _ in range(resumes):
+        required = random.sample(SKILLS, 3)
+        resume, posting = synthetic_resume(), synthetic_posting(required)
+        relevant = [l for l in resume.splitlines() if l.startswith("-") and any(s in l for s in required)]
+
+        start = time.perf_counter()
+        resume_text, job_text, stats, omitted = build_prompt_inputs(resume, posting, budget, job_budget)
+        times.append((time.perf_counter() - start) * 1000)
+
+        before.append(stats["tokens_before"])
+        after.append(stats["tokens_after"])
+        kept = [l for l in relevant if l in resume_text]
+        recall.append(len(kept) / len(relevant) if relevant else 1.0)
+        restored = set(restore_omitted(resume_text, omitted).splitlines())
+        lost += sum(1 for line in resume.splitlines() if line.strip() and line.rstrip() not in restored)
+
+    print(f"corpus: {resumes} resume/posting pairs, resume budget {budget}, job budget {job_budget} tokens")
+    print(f"prompt tokens   before {statistics.mean(before):8.0f}   after {statistics.mean(after):8.0f}   "
+          f"reduction {100 * (1 - sum(after) / sum(before)):5.1f}%")
+    print(f"build time      mean {statistics.mean(times):6.2f} ms   max {max(times):6.2f} ms")
+    print(f"relevant bullets kept: {100 * statistics.mean(recall):5.1f}%")
+    print(f"resume lines lost after restore: {lost}")
+    print(f"token counter: {'tiktoken' if prompt_builder.tiktoken else 'estimate (~4 chars/token)'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resumes", type=int, default=200)
+    parser.add_argument("--budget", type=int, default=600)
+    parser.add_argument("--job-budget", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    random.seed(args.seed)
+    main(args.resumes, args.budget, args.job_budget)
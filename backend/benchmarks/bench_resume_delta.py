@@ -0,0 +1,63 @@
+"""
+Per-job tailoring time with delta generation vs full regeneration, against
+the fake OpenAI server with per-token generation latency. Full rewrites echo
+the whole resume back; delta replies carry a handful of edits.
+
+    python -m backend.benchmarks.bench_resume_delta --jobs 10 --roles 12 --token-latency 0.02
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+
+from backend.benchmarks.fake_openai import start_fake_openai
+from backend.benchmarks.bench_prompt_builder import synthetic_resume, synthetic_posting, SKILLS
+
+
+class NoCache:
+    def get(self, key):
+        return None
+
+    def set(self, key, value):
+        pass
+
+
+def main(jobs: int, roles: int, token_latency: float):
+    fake = start_fake_openai(latency=0.05, token_latency=token_latency, echo_chars=1_000_000)
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{fake.server_address[1]}/v1"
+    os.environ.setdefault("OPENAI_API_KEY", "fake")
+
+    from backend.app.resume_agent import ResumeAgent
+    from backend.app.resume_delta import metrics
+
+    agent = ResumeAgent(cache=NoCache())
+    resume = synthetic_resume(roles=roles)
+    postings = [synthetic_posting(random.sample(SKILLS, 3)) for _ in range(jobs)]
+
+    results = {}
+    for label, run in (("full", agent._regenerate), ("delta", agent._customize_by_delta)):
+        times, sizes = [], []
+        for posting in postings:
+            start = time.perf_counter()
+            content = run(resume, posting)
+            times.append(time.perf_counter() - start)
+            sizes.append(len(content or ""))
+        results[label] = statistics.mean(times)
+        print(f"{label:<6} mean {statistics.mean(times):6.2f}s  p95 {sorted(times)[int(len(times) * 0.95) - 1]:6.2f}s  "
+              f"output resume {statistics.mean(sizes):7.0f} chars")
+
+    print(f"resume: {len(resume)} chars, {roles} roles; speedup {results['full'] / results['delta']:.1f}x")
+    print(f"delta outcomes: {metrics}")
+    fake.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=10)
+    parser.add_argument("--roles", type=int, default=12)
+    parser.add_argument("--token-latency", type=float, default=0.02, help="seconds per completion token")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    random.seed(args.seed)
+    main(args.jobs, args.roles, args.token_latency)
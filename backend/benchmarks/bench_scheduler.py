@@ -0,0 +1,120 @@
+"""
+Board traffic of one scheduler cycle against the per-user search that
+/search-jobs runs, as the number of users grows over a fixed set of roles
+and locations.
+
+    python -m backend.benchmarks.bench_scheduler --users 50 200 800
+
+Both run against local fake boards (fake_job_boards.py), which count the
+HTTP requests they receive. Exits 1 when a cycle sends more requests than
+it has distinct keyword queries for the HTTP boards, or when a user with
+matching postings gets no queued run.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.benchmarks.fake_job_boards import start_fake_job_boards
+from backend.benchmarks.synthetic_data import LOCATIONS
+from backend.job_scraper import JobScraper
+
+# The boards JobBoardService reaches over HTTP; the others answer in-process
+HTTP_BOARDS = ("remoteok", "weworkremotely")
+
+
+def scratch_session():
+    from sqlalchemy.orm import Session
+    from backend.app.db.engine import make_engine
+    from backend.app.db.migrate import upgrade_database
+
+    engine = make_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_scheduler.db')}")
+    upgrade_database(engine)
+    return Session(bind=engine)
+
+
+def seed_users(db, count: int, roles: list, roles_per_user: int):
+    from backend.app.users.models import User, BaseResume
+
+    users = [User(full_name=f"Scheduled {i}", email=f"scheduled-{i}@example.com",
+                  location_preference=random.choice(LOCATIONS), years_experience=3, skills=["python", "sql"],
+                  desired_roles=random.sample(roles, roles_per_user))
+             for i in range(count)]
+    db.add_all(users)
+    db.flush()
+    db.add_all([BaseResume(user_id=user.id, file_path="/dev/null", content="Engineer") for user in users])
+    db.commit()
+    return users
+
+
+def per_user_search(users, workers: int):
+    """What /search-jobs does for each user: one random desired role across every board"""
+    from backend.app.services.job_boards import JobBoardService
+
+    def search(user):
+        return JobBoardService(db=None).fetch_all_boards(random.choice(user.desired_roles),
+                                                          user.location_preference)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(search, users))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, nargs="+", default=[50, 200, 800])
+    parser.add_argument("--roles-per-user", type=int, default=2)
+    parser.add_argument("--board-latency", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, default=4, help="concurrent searches, both ways")
+    args = parser.parse_args()
+
+    boards = start_fake_job_boards(latency=args.board_latency)
+    base_url = f"http://127.0.0.1:{boards.server_address[1]}"
+    os.environ["REMOTEOK_URL"] = base_url
+    os.environ["WEWORKREMOTELY_URL"] = base_url
+
+    # Imported after the board URLs are set; job_boards reads them at import
+    from backend.app.services.scheduler import run_cycle
+    from backend.app.users.models import PipelineRun
+
+    random.seed(11)
+    roles = JobScraper().job_titles
+    failures = []
+    print(f"{'users':>6} {'per-user reqs':>14} {'per-user s':>11} {'cycle reqs':>11} {'cycle s':>8} "
+          f"{'queries':>8} {'runs':>5}")
+    for count in args.users:
+        db = scratch_session()
+        try:
+            users = seed_users(db, count, roles, args.roles_per_user)
+
+            before = boards.stats["requests"]
+            start = time.perf_counter()
+            per_user_search(users, args.workers)
+            per_user_seconds = time.perf_counter() - start
+            per_user_requests = boards.stats["requests"] - before
+
+            before = boards.stats["requests"]
+            start = time.perf_counter()
+            summary = run_cycle(db, args.workers)
+            cycle_seconds = time.perf_counter() - start
+            cycle_requests = boards.stats["requests"] - before
+
+            keywords = {role.lower() for user in users for role in user.desired_roles}
+            if cycle_requests > len(keywords) * len(HTTP_BOARDS):
+                failures.append(f"{count} users: {cycle_requests} board requests for {len(keywords)} distinct roles")
+            queued = {user_id for (user_id,) in db.query(PipelineRun.user_id).filter(PipelineRun.job_ids.isnot(None))}
+            if queued != {user.id for user in users}:
+                failures.append(f"{count} users: {len(queued)} runs queued")
+        finally:
+            db.close()
+
+        print(f"{count:>6} {per_user_requests:>14} {per_user_seconds:>11.2f} {cycle_requests:>11} "
+              f"{cycle_seconds:>8.2f} {summary['queries_fetched']:>8} {summary['runs']:>5}")
+
+    boards.shutdown()
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        raise SystemExit(1)
+    print("✅ Board traffic follows distinct queries, not users")
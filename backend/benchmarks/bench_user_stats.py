@@ -0,0 +1,135 @@
+"""
+Benchmark GET /users/{user_id}/stats at 10k and 100k applications.
+
+Compares reading the materialized user_stats row (read_user_stats) and the
+SQL aggregate path (compute_user_stats) with the previous approach of
+loading every application and job into Python.
+
+    python -m backend.benchmarks.bench_user_stats [10000 100000 ...]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+DB_FILE = os.path.join(tempfile.mkdtemp(), "bench_stats.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{DB_FILE}")
+
+from backend.app.db.database import Base, SessionLocal, engine  # noqa: E402
+from backend.app.users.models import User, BaseResume, Job, ResumeVersion, JobApplication  # noqa: E402
+from backend.app.services.job_ingest import upsert_jobs  # noqa: E402
+from backend.app.services.stats import compute_user_stats, read_user_stats, rebuild_user_stats  # noqa: E402
+
+SKILLS = ["python", "sql", "aws", "docker", "react", "kubernetes", "go", "java"]
+ROLES = ["Software Engineer", "Data Scientist", "Backend Developer"]
+STATUSES = ["applied", "seen", "rejected", "ghosted", "interview"]
+REASONS = ["experience", "location", "salary", "visa"]
+
+
+def seed(db, n_applications: int) -> User:
+    user = User(
+        full_name="Bench User", email=f"bench{n_applications}@example.com",
+        location_preference="Remote", years_experience=5,
+        skills=SKILLS[:5], desired_roles=ROLES,
+    )
+    db.add(user)
+    db.flush()
+    resume = BaseResume(user_id=user.id, file_path="/dev/null", content="resume")
+    db.add(resume)
+    db.flush()
+
+    postings = [
+        {
+            "title": random.choice(ROLES),
+            "company": f"Company {i}",
+            "description": " ".join(random.sample(SKILLS, 4)) + " lorem ipsum dolor sit amet " * 20,
+            "location": "Remote",
+            "source": "bench",
+            "url": f"https://example.com/{n_applications}/{i}",
+        }
+        for i in range(n_applications)
+    ]
+    job_ids = upsert_jobs(db, postings)
+
+    versions = [{"base_resume_id": resume.id, "job_id": job_id, "content": "v"} for job_id in job_ids]
+    db.bulk_insert_mappings(ResumeVersion, versions)
+    version_ids = [
+        v for (v,) in
+        db.query(ResumeVersion.id).filter(ResumeVersion.base_resume_id == resume.id).order_by(ResumeVersion.id)
+    ]
+
+    now = datetime.utcnow()
+    applications = []
+    for job_id, version_id in zip(job_ids, version_ids):
+        status = random.choice(STATUSES)
+        applied = now - timedelta(days=random.randint(1, 60))
+        applications.append({
+            "user_id": user.id,
+            "job_id": job_id,
+            "resume_version_id": version_id,
+            "status": status,
+            "rejection_reason": random.choice(REASONS) if status == "rejected" else None,
+            "created_at": applied,
+            "last_status_update": applied + timedelta(hours=random.randint(1, 200)) if status != "applied" else None,
+        })
+    db.bulk_insert_mappings(JobApplication, applications)
+    db.commit()
+    return user
+
+
+def legacy_stats(db, user: User) -> dict:
+    """The per-row Python implementation the route used before"""
+    applications = user.job_applications
+    counts = {s: len([a for a in applications if a.status == s]) for s in STATUSES}
+    response_times = [
+        (a.last_status_update - a.created_at).total_seconds() / 3600
+        for a in applications if a.last_status_update and a.status != "applied"
+    ]
+    all_jobs = db.query(Job).join(JobApplication).filter(JobApplication.user_id == user.id).all()
+    job_skills = []
+    for job in all_jobs:
+        job_skills.extend(job.description.lower().split())
+    matched = [skill for skill in user.skills if skill in job_skills]
+    return {
+        "counts": counts,
+        "average_response_time": sum(response_times) / len(response_times) if response_times else None,
+        "top_skills_matched": list(dict(Counter(matched).most_common(5)).keys()),
+    }
+
+
+def timed(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(sizes):
+    Base.metadata.create_all(bind=engine)
+    for n in sizes:
+        db = SessionLocal()
+        try:
+            user = seed(db, n)
+            sql = timed(lambda: compute_user_stats(db, user))
+            rebuild_user_stats(db, user.id)
+            db.commit()
+            materialized = timed(lambda: read_user_stats(db, user))
+
+            def run_legacy():
+                db.expire_all()
+                legacy_stats(db, user)
+
+            legacy = timed(run_legacy, repeat=1)
+            print(f"{n:>7} applications  materialized: {materialized * 1000:8.1f} ms  "
+                  f"sql: {sql * 1000:8.1f} ms  legacy: {legacy * 1000:8.1f} ms")
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 100_000])
@@ -0,0 +1,282 @@
+"""
+Local Gmail API stand-in for EmailScanner: a discovery document plus the
+users.getProfile, users.messages.list/get, users.history.list and batch
+endpoints, backed by an in-memory mailbox.
+
+    python -m backend.benchmarks.fake_gmail --port 8200 --messages 5000
+
+    scanner = EmailScanner(discovery_url="http://127.0.0.1:8200/discovery/{api}/{apiVersion}",
+                           http=httplib2.Http())
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+from typing import Tuple
+
+SUBJECTS = [
+    "Thank you for applying to {company}",
+    "Your application to {company}: next steps",
+    "Unfortunately, we are not moving forward",
+    "Interview invitation from {company}",
+    "Weekly newsletter",
+    "Your order has shipped",
+]
+COMPANIES = ["Google", "Microsoft", "Apple", "Amazon", "Meta", "Netflix", "Stripe"]
+
+
+def _param(location, type_="string", repeated=False, required=False):
+    param = {"type": type_, "location": location}
+    if repeated:
+        param["repeated"] = True
+    if required:
+        param["required"] = True
+    return param
+
+
+def discovery_document(root_url: str) -> dict:
+    user_id = _param("path", required=True)
+    return {
+        "kind": "discovery#restDescription",
+        "discoveryVersion": "v1",
+        "id": "gmail:v1",
+        "name": "gmail",
+        "version": "v1",
+        "rootUrl": root_url,
+        "servicePath": "gmail/v1/users/",
+        "baseUrl": f"{root_url}gmail/v1/users/",
+        "batchPath": "batch/gmail/v1",
+        "protocol": "rest",
+        "parameters": {"alt": _param("query")},
+        # Without response schemas the client hands back raw bytes instead of JSON
+        "schemas": {name: {"id": name, "type": "object"}
+                    for name in ("Profile", "ListMessagesResponse", "Message", "ListHistoryResponse")},
+        "resources": {
+            "users": {
+                "methods": {
+                    "getProfile": {
+                        "id": "gmail.users.getProfile", "path": "{userId}/profile", "httpMethod": "GET",
+                        "response": {"$ref": "Profile"},
+                        "parameters": {"userId": user_id}, "parameterOrder": ["userId"],
+                    },
+                },
+                "resources": {
+                    "messages": {
+                        "methods": {
+                            "list": {
+                                "id": "gmail.users.messages.list", "path": "{userId}/messages", "httpMethod": "GET",
+                                "response": {"$ref": "ListMessagesResponse"},
+                                "parameters": {
+                                    "userId": user_id, "q": _param("query"), "pageToken": _param("query"),
+                                    "maxResults": _param("query", "integer"),
+                                },
+                                "parameterOrder": ["userId"],
+                            },
+                            "get": {
+                                "id": "gmail.users.messages.get", "path": "{userId}/messages/{id}", "httpMethod": "GET",
+                                "response": {"$ref": "Message"},
+                                "parameters": {
+                                    "userId": user_id, "id": _param("path", required=True),
+                                    "format": _param("query"), "metadataHeaders": _param("query", repeated=True),
+                                },
+                                "parameterOrder": ["userId", "id"],
+                            },
+                        },
+                    },
+                    "history": {
+                        "methods": {
+                            "list": {
+                                "id": "gmail.users.history.list", "path": "{userId}/history", "httpMethod": "GET",
+                                "response": {"$ref": "ListHistoryResponse"},
+                                "parameters": {
+                                    "userId": user_id, "startHistoryId": _param("query"),
+                                    "historyTypes": _param("query", repeated=True), "pageToken": _param("query"),
+                                    "maxResults": _param("query", "integer"),
+                                },
+                                "parameterOrder": ["userId"],
+                            },
+                        },
+                    },
+                },
+            },
+        },
+    }
+
+
+class Mailbox:
+    """Messages in arrival order; message i was added at historyId i + 1"""
+
+    def __init__(self):
+        self.messages = []
+        self.lock = threading.Lock()
+
+    def add(self, count: int):
+        with self.lock:
+            for _ in range(count):
+                company = random.choice(COMPANIES)
+                index = len(self.messages)
+                self.messages.append({
+                    "id": f"m{index:08d}",
+                    "historyId": str(index + 1),
+                    "headers": {
+                        "Subject": random.choice(SUBJECTS).format(company=company),
+                        "From": f"Recruiting <jobs@{company.lower()}.com>",
+                        "Date": time.strftime("%a, %d %b %Y %H:%M:%S +0000", time.gmtime()),
+                        "To": "me@example.com",
+                    },
+                })
+
+    @property
+    def history_id(self) -> str:
+        return str(len(self.messages))
+
+
+class FakeGmailHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _count(self, name: str):
+        with self.server.stats_lock:
+            self.server.stats[name] = self.server.stats.get(name, 0) + 1
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _route(self, path: str) -> Tuple[int, dict]:
+        """Serve one API GET; shared by plain requests and batch parts"""
+        parts = urlsplit(path)
+        query = parse_qs(parts.query)
+        mailbox = self.server.mailbox
+        segments = [s for s in parts.path.split("/") if s]
+
+        if segments[:2] == ["discovery", "gmail"]:
+            return 200, discovery_document(self.server.root_url)
+        if segments[:3] != ["gmail", "v1", "users"] or len(segments) < 5:
+            return 404, {"error": {"code": 404, "message": "not found"}}
+
+        resource = segments[4]
+        page_size = int(query.get("maxResults", ["100"])[0])
+        offset = int(query.get("pageToken", ["0"])[0])
+
+        if resource == "profile":
+            self._count("profile")
+            return 200, {"emailAddress": "me@example.com", "historyId": mailbox.history_id}
+
+        if resource == "messages" and len(segments) == 5:
+            self._count("messages.list")
+            newest_first = mailbox.messages[::-1]
+            page = newest_first[offset:offset + page_size]
+            body = {"messages": [{"id": m["id"], "threadId": m["id"]} for m in page],
+                    "resultSizeEstimate": len(newest_first)}
+            if offset + page_size < len(newest_first):
+                body["nextPageToken"] = str(offset + page_size)
+            return 200, body
+
+        if resource == "messages":
+            self._count("messages.get")
+            if segments[5] in self.server.failing:
+                return 500, {"error": {"code": 500, "message": "backend error"}}
+            index = int(segments[5][1:])
+            if index >= len(mailbox.messages):
+                return 404, {"error": {"code": 404, "message": "message not found"}}
+            message = mailbox.messages[index]
+            wanted = query.get("metadataHeaders") or list(message["headers"])
+            headers = [{"name": k, "value": v} for k, v in message["headers"].items() if k in wanted]
+            return 200, {"id": message["id"], "threadId": message["id"], "historyId": message["historyId"],
+                         "payload": {"headers": headers}}
+
+        if resource == "history":
+            self._count("history.list")
+            start = int(query.get("startHistoryId", ["0"])[0])
+            if start < self.server.oldest_history_id:
+                return 404, {"error": {"code": 404, "message": "Requested entity was not found."}}
+            added = mailbox.messages[start:]
+            page = added[offset:offset + page_size]
+            body = {
+                "history": [{"id": m["historyId"], "messagesAdded": [{"message": {"id": m["id"]}}]}
+                            for m in page],
+                "historyId": mailbox.history_id,
+            }
+            if offset + page_size < len(added):
+                body["nextPageToken"] = str(offset + page_size)
+            return 200, body
+
+        return 404, {"error": {"code": 404, "message": "not found"}}
+
+    def do_GET(self):
+        status, body = self._route(self.path)
+        self._send(status, json.dumps(body).encode("utf-8"))
+
+    def do_POST(self):
+        if not self.path.startswith("/batch/"):
+            self._send(404, b"{}")
+            return
+        self._count("batch")
+        length = int(self.headers.get("Content-Length", 0))
+        raw = self.rfile.read(length)
+        envelope = BytesParser(policy=HTTP).parsebytes(
+            f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode("utf-8") + raw
+        )
+
+        boundary = "batch_fake_gmail"
+        out = []
+        for part in envelope.iter_parts():
+            content_id = part["Content-ID"].strip("<>")
+            request_line = part.get_payload(decode=True).decode("utf-8").splitlines()[0]
+            _, path, _ = request_line.split(" ", 2)
+            status, body = self._route(path)
+            payload = json.dumps(body)
+            out.append(
+                f"--{boundary}\r\n"
+                "Content-Type: application/http\r\n"
+                f"Content-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(payload)}\r\n\r\n"
+                f"{payload}\r\n"
+            )
+        out.append(f"--{boundary}--\r\n")
+        self._send(200, "".join(out).encode("utf-8"), f"multipart/mixed; boundary={boundary}")
+
+
+def start_fake_gmail(host: str = "127.0.0.1", port: int = 0, messages: int = 0) -> ThreadingHTTPServer:
+    """Start the server on a daemon thread with ``messages`` seeded mails"""
+    server = ThreadingHTTPServer((host, port), FakeGmailHandler)
+    server.daemon_threads = True
+    server.root_url = f"http://{host}:{server.server_address[1]}/"
+    server.discovery_url = f"{server.root_url}discovery/{{api}}/{{apiVersion}}"
+    server.mailbox = Mailbox()
+    server.mailbox.add(messages)
+    # history.list answers 404 for checkpoints older than this, like Gmail's retention window
+    server.oldest_history_id = 0
+    # messages.get answers 500 for these ids, like a transient backend error
+    server.failing = set()
+    server.stats = {}
+    server.stats_lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8200)
+    parser.add_argument("--messages", type=int, default=1000)
+    args = parser.parse_args()
+
+    fake = start_fake_gmail(args.host, args.port, args.messages)
+    print(f"Fake Gmail discovery at {fake.discovery_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        fake.shutdown()
@@ -0,0 +1,111 @@
+"""
+Local stand-in for the RemoteOK and WeWorkRemotely endpoints that
+JobBoardService scrapes, serving JobScraper-generated postings.
+
+    python -m backend.benchmarks.fake_job_boards --port 8200 --latency 0.3
+    REMOTEOK_URL=http://127.0.0.1:8200 WEWORKREMOTELY_URL=http://127.0.0.1:8200 ...
+
+GET /api?tags=... answers in RemoteOK's JSON format and
+GET /remote-jobs/search?term=... with WeWorkRemotely's li.feature HTML.
+Each search returns a random page from a fixed catalog, so repeated
+searches hit the same (source, url) rows the way real boards do.
+"""
+import argparse
+import html
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from backend.job_scraper import JobScraper
+
+
+def build_catalog(size: int):
+    """``size`` postings from JobScraper, each with a stable id"""
+    scraper = JobScraper()
+    catalog = []
+    while len(catalog) < size:
+        for posting in scraper.search_jobs():
+            posting["id"] = len(catalog) + 1
+            catalog.append(posting)
+    return catalog[:size]
+
+
+class FakeJobBoardHandler(BaseHTTPRequestHandler):
+    server_version = "FakeJobBoards/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, payload: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        server = self.server
+        path = urlparse(self.path).path
+        with server.stats_lock:
+            server.stats["requests"] += 1
+
+        time.sleep(max(0.0, random.gauss(server.latency, server.latency * server.jitter)))
+        page = random.sample(server.catalog, min(server.page_size, len(server.catalog)))
+
+        if path == "/api":
+            body = [{
+                "id": str(job["id"]),
+                "position": job["title"],
+                "company": job["company"],
+                "description": job["description"],
+                "url": f"https://remoteok.com/remote-jobs/{job['id']}",
+                "date": job["posted_date"],
+            } for job in page]
+            self._send(200, json.dumps(body).encode("utf-8"), "application/json")
+        elif path == "/remote-jobs/search":
+            items = "".join(
+                f'<li class="feature"><a href="/remote-jobs/{job["id"]}">'
+                f'<span class="company">{html.escape(job["company"])}</span>'
+                f'<span class="title">{html.escape(job["title"])}</span>'
+                f'<span class="description">{html.escape(job["description"])}</span></a></li>'
+                for job in page
+            )
+            self._send(200, f"<html><body><ul>{items}</ul></body></html>".encode("utf-8"), "text/html")
+        else:
+            self._send(404, b"not found", "text/plain")
+
+
+def start_fake_job_boards(host: str = "127.0.0.1", port: int = 0, latency: float = 0.1,
+                          jitter: float = 0.1, catalog_size: int = 500,
+                          page_size: int = 10) -> ThreadingHTTPServer:
+    """Start the server on a daemon thread; ``server.server_address`` has the bound port"""
+    server = ThreadingHTTPServer((host, port), FakeJobBoardHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.jitter = jitter
+    server.page_size = page_size
+    server.catalog = build_catalog(catalog_size)
+    server.stats = {"requests": 0}
+    server.stats_lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8200)
+    parser.add_argument("--latency", type=float, default=0.3, help="mean seconds per search")
+    parser.add_argument("--catalog", type=int, default=500, help="distinct postings served")
+    args = parser.parse_args()
+
+    fake = start_fake_job_boards(args.host, args.port, args.latency, catalog_size=args.catalog)
+    print(f"Fake job boards listening on http://{args.host}:{fake.server_address[1]}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        fake.shutdown()
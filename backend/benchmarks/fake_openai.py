@@ -0,0 +1,128 @@
+"""
+Local OpenAI-compatible chat completions server with injected latency and errors.
+
+    python -m backend.benchmarks.fake_openai --port 8100 --latency 0.5 --error-rate 0.1
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1 OPENAI_API_KEY=fake ...
+
+Only POST /v1/chat/completions is implemented. The reply echoes a short
+tailored resume so callers can tell responses apart; prompts asking for
+"edits" JSON get a few replace edits on the tagged blocks instead.
+``token_latency`` adds generation time per completion token, which is what
+makes long outputs slow on the real API.
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    server_version = "FakeOpenAI/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: dict, headers: dict = None):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        server = self.server
+        with server.stats_lock:
+            server.stats["requests"] += 1
+
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send(404, {"error": {"message": "not found"}})
+            return
+
+        time.sleep(max(0.0, random.gauss(server.latency, server.latency * server.jitter)))
+
+        roll = random.random()
+        if roll < server.error_rate / 2:
+            with server.stats_lock:
+                server.stats["429"] += 1
+            self._send(429, {"error": {"message": "rate limited", "type": "rate_limit_error"}},
+                       {"retry-after": str(server.retry_after)})
+            return
+        if roll < server.error_rate:
+            with server.stats_lock:
+                server.stats["500"] += 1
+            self._send(500, {"error": {"message": "injected failure", "type": "server_error"}})
+            return
+
+        messages = request.get("messages", [])
+        prompt = messages[-1]["content"] if messages else ""
+        if '"edits"' in prompt:
+            blocks = re.findall(r"^\[(\d+\.\d+)\] (.*)$", prompt, re.MULTILINE)[:server.delta_edits]
+            content = json.dumps({"edits": [
+                {"op": "replace", "id": block_id, "text": f"{text} (tailored)"} for block_id, text in blocks
+            ]})
+        else:
+            content = f"TAILORED RESUME\n{prompt[:server.echo_chars]}"
+        prompt_tokens = len(prompt) // 4
+        completion_tokens = len(content) // 4
+        time.sleep(completion_tokens * server.token_latency)
+        self._send(200, {
+            "id": f"chatcmpl-fake-{server.stats['requests']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "gpt-4"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        })
+
+
+def start_fake_openai(host: str = "127.0.0.1", port: int = 0, latency: float = 0.2,
+                      error_rate: float = 0.0, jitter: float = 0.1, retry_after: float = 0.1,
+                      echo_chars: int = 200, token_latency: float = 0.0,
+                      delta_edits: int = 4) -> ThreadingHTTPServer:
+    """Start the server on a daemon thread; ``server.server_address`` has the bound port"""
+    server = ThreadingHTTPServer((host, port), FakeOpenAIHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.error_rate = error_rate
+    server.jitter = jitter
+    server.retry_after = retry_after
+    server.echo_chars = echo_chars
+    server.token_latency = token_latency
+    server.delta_edits = delta_edits
+    server.stats = {"requests": 0, "429": 0, "500": 0}
+    server.stats_lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", type=float, default=0.5, help="mean seconds per completion")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 429/500 replies")
+    args = parser.parse_args()
+
+    fake = start_fake_openai(args.host, args.port, args.latency, args.error_rate)
+    print(f"Fake OpenAI listening on http://{args.host}:{fake.server_address[1]}/v1")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        fake.shutdown()
@@ -0,0 +1,272 @@
+"""
+End-to-end load suite: one uvicorn worker backed by a scratch database
+seeded with synthetic users, jobs and applications, talking to local fake
+OpenAI and job-board servers. Clients hit /users/intake, /users/{id},
+/users/{id}/stats and /users/{id}/search-jobs concurrently; the queued
+pipeline runs are then drained and timed.
+
+    python -m backend.benchmarks.load_suite --users 500 --clients 32 --seconds 30
+    python -m backend.benchmarks.load_suite --baseline results/v1.2.json --tolerance 0.2
+
+Throughput and p50/p95/p99 per endpoint are printed and written as JSON
+(--out, by default backend/benchmarks/results/). With --baseline the run
+is compared against an earlier result file and exits 1 if any endpoint's
+p95 or throughput regressed by more than --tolerance.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+DATA_DIR = tempfile.mkdtemp()
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(BACKEND_DIR, "benchmarks", "results")
+ENDPOINTS = ["intake", "get_user", "stats", "search_jobs"]
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(DATA_DIR, 'load_suite.db')}")
+os.environ.setdefault("RESUME_CACHE_PATH", os.path.join(DATA_DIR, "resume_cache.db"))
+os.environ.setdefault("RESUME_ROOT", os.path.join(DATA_DIR, "resumes"))
+os.environ.setdefault("OPENAI_API_KEY", "fake")
+os.environ.setdefault("JOB_SOURCE", "boards")
+os.environ.setdefault("RUN_WORKERS", "2")
+# Measure the app, not the OpenAI quota guard
+os.environ.setdefault("LLM_REQUESTS_PER_MINUTE", "100000")
+os.environ.setdefault("LLM_TOKENS_PER_MINUTE", "1000000000")
+
+import httpx  # noqa: E402
+
+from backend.benchmarks.bench_async_db import start_server, percentile  # noqa: E402
+from backend.benchmarks.bench_prompt_builder import synthetic_resume  # noqa: E402
+from backend.benchmarks.fake_openai import start_fake_openai  # noqa: E402
+from backend.benchmarks.fake_job_boards import start_fake_job_boards  # noqa: E402
+from backend.benchmarks.synthetic_data import seed, synthetic_user  # noqa: E402
+
+
+def summarize(latencies, errors: int, seconds: float) -> dict:
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": len(latencies) / seconds,
+        "mean_ms": statistics.fmean(latencies) if latencies else None,
+        "p50_ms": percentile(latencies, 0.50) if latencies else None,
+        "p95_ms": percentile(latencies, 0.95) if latencies else None,
+        "p99_ms": percentile(latencies, 0.99) if latencies else None,
+    }
+
+
+async def request(client: httpx.AsyncClient, endpoint: str, user_ids, runs):
+    user_id = random.choice(user_ids)
+    if endpoint == "intake":
+        user = synthetic_user(f"{time.time_ns()}-{random.getrandbits(32)}")
+        resume = synthetic_resume(bullets_per_role=4, roles=4).replace("Jane Doe", user["full_name"])
+        response = await client.post(
+            "/users/intake",
+            data={"user_data": json.dumps(user)},
+            files={"resume_file": ("resume.txt", resume.encode("utf-8"), "text/plain")},
+        )
+        if response.status_code == 200:
+            user_ids.append(response.json()["id"])
+    elif endpoint == "get_user":
+        response = await client.get(f"/users/{user_id}")
+    elif endpoint == "stats":
+        response = await client.get(f"/users/{user_id}/stats")
+    else:
+        response = await client.post(f"/users/{user_id}/search-jobs")
+        if response.status_code == 202:
+            runs.append(response.json()["run_id"])
+    return response.status_code < 400
+
+
+async def client_loop(client, mix, user_ids, deadline: float, latencies, errors, runs):
+    endpoints, weights = zip(*mix.items())
+    while time.perf_counter() < deadline:
+        endpoint = random.choices(endpoints, weights)[0]
+        start = time.perf_counter()
+        try:
+            ok = await request(client, endpoint, user_ids, runs)
+        except httpx.HTTPError:
+            ok = False
+        if ok:
+            latencies[endpoint].append((time.perf_counter() - start) * 1000)
+        else:
+            errors[endpoint] += 1
+
+
+async def drive(base_url: str, user_ids, clients: int, seconds: float, mix):
+    latencies = {name: [] for name in mix}
+    errors = {name: 0 for name in mix}
+    runs = []
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        deadline = time.perf_counter() + seconds
+        await asyncio.gather(*(
+            client_loop(client, mix, user_ids, deadline, latencies, errors, runs) for _ in range(clients)
+        ))
+    return {name: summarize(latencies[name], errors[name], seconds) for name in mix}, runs
+
+
+def drain_runs(run_ids, load_seconds: float, timeout: float) -> dict:
+    """Wait for the queued pipeline runs and time them from the database"""
+    from backend.app.db.database import SessionLocal
+    from backend.app.users.models import PipelineRun
+
+    start = time.perf_counter()
+    db = SessionLocal()
+    try:
+        while True:
+            runs = db.query(PipelineRun).filter(PipelineRun.id.in_(run_ids)).all() if run_ids else []
+            pending = [run for run in runs if run.status in ("queued", "running")]
+            if not pending or time.perf_counter() - start > timeout:
+                break
+            db.expire_all()
+            time.sleep(0.5)
+        elapsed = time.perf_counter() - start
+        finished = [run for run in runs if run.finished_at and run.started_at]
+        return {
+            "runs": len(runs),
+            "succeeded": sum(run.status == "succeeded" for run in runs),
+            "failed": sum(run.status == "failed" for run in runs),
+            "unfinished": len(pending),
+            "drain_seconds": elapsed,
+            "runs_per_second": len(finished) / (load_seconds + elapsed),
+            "applications": sum(len((run.result or {}).get("applied_jobs", [])) for run in finished),
+            "queue_wait": summarize([(r.started_at - r.created_at).total_seconds() * 1000 for r in finished], 0, 1),
+            "run_time": summarize([(r.finished_at - r.started_at).total_seconds() * 1000 for r in finished], 0, 1),
+        }
+    finally:
+        db.close()
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Endpoints (and the pipeline) whose p95 grew or throughput fell by more than ``tolerance``"""
+    regressions = []
+    for name, current in results["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(name)
+        if not before or not before.get("p95_ms") or not current.get("p95_ms"):
+            continue
+        if current["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {before['p95_ms']:.1f} -> {current['p95_ms']:.1f} ms")
+        if current["throughput"] < before["throughput"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {before['throughput']:.1f} -> {current['throughput']:.1f} req/s")
+    before = baseline.get("pipeline", {}).get("runs_per_second")
+    current = results["pipeline"]["runs_per_second"]
+    if before and current < before * (1 - tolerance):
+        regressions.append(f"pipeline: {before:.2f} -> {current:.2f} runs/s")
+    return regressions
+
+
+def report(results: dict):
+    print(f"{'endpoint':<12} {'n':>7} {'err':>5} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, row in results["endpoints"].items():
+        if not row["requests"]:
+            print(f"{name:<12} {0:>7} {row['errors']:>5}")
+            continue
+        print(f"{name:<12} {row['requests']:>7} {row['errors']:>5} {row['throughput']:>8.1f} "
+              f"{row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f} {row['p99_ms']:>8.2f}")
+    pipeline = results["pipeline"]
+    run_time = pipeline["run_time"]
+    print(f"pipeline: {pipeline['succeeded']}/{pipeline['runs']} runs succeeded, "
+          f"{pipeline['failed']} failed, {pipeline['unfinished']} unfinished; "
+          f"{pipeline['runs_per_second']:.2f} runs/s, drained in {pipeline['drain_seconds']:.1f}s")
+    if run_time["requests"]:
+        print(f"  run time p50 {run_time['p50_ms']:.0f} ms  p95 {run_time['p95_ms']:.0f} ms  "
+              f"queue wait p95 {pipeline['queue_wait']['p95_ms']:.0f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200, help="users seeded before the load")
+    parser.add_argument("--jobs", type=int, default=1000, help="postings seeded before the load")
+    parser.add_argument("--applications", type=int, default=20, help="seeded applications per user")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--mix", default="intake=5,get_user=50,stats=40,search_jobs=5",
+                        help="relative weight of each endpoint")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="mean seconds per fake completion")
+    parser.add_argument("--board-latency", type=float, default=0.1, help="mean seconds per fake board search")
+    parser.add_argument("--drain-timeout", type=float, default=120.0)
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--out", help="result file (default: results/<revision>-<time>.json)")
+    parser.add_argument("--baseline", help="earlier result file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    mix = {}
+    for part in args.mix.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ENDPOINTS:
+            parser.error(f"unknown endpoint {name!r} in --mix; expected {', '.join(ENDPOINTS)}")
+        mix[name] = float(weight or 1)
+
+    openai_server = start_fake_openai(latency=args.llm_latency)
+    boards = start_fake_job_boards(latency=args.board_latency)
+    os.environ.setdefault("OPENAI_BASE_URL", f"http://127.0.0.1:{openai_server.server_address[1]}/v1")
+    os.environ.setdefault("REMOTEOK_URL", f"http://127.0.0.1:{boards.server_address[1]}")
+    os.environ.setdefault("WEWORKREMOTELY_URL", f"http://127.0.0.1:{boards.server_address[1]}")
+
+    server = start_server(args.port)
+    try:
+        from backend.app.db.database import SessionLocal
+
+        session = SessionLocal()
+        try:
+            started = time.perf_counter()
+            user_ids = seed(session, args.users, args.jobs, args.applications)
+            print(f"✅ Seeded {len(user_ids)} users, {args.jobs} jobs in {time.perf_counter() - started:.1f}s")
+        finally:
+            session.close()
+
+        endpoints, run_ids = asyncio.run(
+            drive(f"http://127.0.0.1:{args.port}", user_ids, args.clients, args.seconds, mix)
+        )
+        pipeline = drain_runs(run_ids, args.seconds, args.drain_timeout)
+    finally:
+        server.should_exit = True
+
+    results = {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": os.environ["DATABASE_URL"].split(":", 1)[0],
+        },
+        "config": vars(args),
+        "endpoints": endpoints,
+        "pipeline": pipeline,
+        "fakes": {"openai_requests": openai_server.stats["requests"], "board_requests": boards.stats["requests"]},
+    }
+    report(results)
+
+    out = args.out or os.path.join(
+        RESULTS_DIR, f"{results['meta']['revision']}-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(results, f, indent=2, default=str)
+    print(f"Results written to {out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"❌ Regression {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"✅ No regressions beyond {args.tolerance:.0%} against {args.baseline}")
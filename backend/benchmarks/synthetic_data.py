@@ -0,0 +1,127 @@
+"""
+Synthetic users, postings and applications for load tests, built on
+JobScraper's random postings.
+
+    python -m backend.benchmarks.synthetic_data --users 1000 --jobs 5000 --applications 20
+
+seeds the configured DATABASE_URL directly; load_suite calls seed() on its
+own scratch database before starting the load.
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from backend.job_scraper import JobScraper
+from backend.benchmarks.bench_prompt_builder import SKILLS, synthetic_resume
+
+LOCATIONS = ["Remote", "San Francisco", "New York", "Seattle", "Austin"]
+# Rough shape of a real pipeline: most applications never hear back
+STATUS_WEIGHTS = {"applied": 50, "seen": 15, "rejected": 20, "interview": 8, "ghosted": 7}
+REASONS = ["Position filled", "Not enough experience", "Skills mismatch", "Location"]
+
+_scraper = JobScraper()
+
+
+def synthetic_user(tag: str) -> Dict:
+    """An intake payload (UserCreate fields) with a unique email"""
+    return {
+        "full_name": f"Load User {tag}",
+        "email": f"load-{tag}@example.com",
+        "phone": "555-010-0000",
+        "location_preference": random.choice(LOCATIONS),
+        "years_experience": random.randint(1, 15),
+        "skills": random.sample(SKILLS, 5),
+        "desired_roles": random.sample(_scraper.job_titles, 2),
+    }
+
+
+def synthetic_postings(count: int, tag: str) -> List[Dict]:
+    """``count`` JobScraper postings in the shape ingest_jobs takes, with unique URLs"""
+    postings = []
+    while len(postings) < count:
+        for job in _scraper.search_jobs():
+            index = len(postings)
+            postings.append({
+                "title": job["title"],
+                "company": job["company"],
+                "description": f"{job['description']} Requirements: {', '.join(random.sample(SKILLS, 4))}.",
+                "location": job["location"],
+                "source": "synthetic",
+                "url": f"https://jobs.example.com/{tag}/{index}",
+                "posted_date": datetime.strptime(job["posted_date"], "%Y-%m-%d"),
+            })
+    return postings[:count]
+
+
+def seed(db, users: int, jobs: int, applications_per_user: int) -> List[int]:
+    """
+    Insert ``users`` users with base resumes, ``jobs`` postings and up to
+    ``applications_per_user`` tailored versions and applications each, then
+    rebuild user_stats. Returns the user ids.
+    """
+    from backend.app.users.models import User, BaseResume, ResumeVersion, JobApplication
+    from backend.app.services.job_ingest import ingest_jobs
+    from backend.app.services.stats import rebuild_user_stats
+
+    tag = str(time.time_ns())
+    job_ids = [job.id for job in ingest_jobs(db, synthetic_postings(jobs, tag))]
+
+    people = [User(**synthetic_user(f"{tag}-{i}")) for i in range(users)]
+    db.add_all(people)
+    db.flush()
+    resumes = [BaseResume(user_id=user.id, file_path="/dev/null", content=synthetic_resume())
+               for user in people]
+    db.add_all(resumes)
+    db.flush()
+
+    now = datetime.utcnow()
+    statuses, weights = zip(*STATUS_WEIGHTS.items())
+    for user, resume in zip(people, resumes):
+        applied_to = random.sample(job_ids, min(applications_per_user, len(job_ids)))
+        versions = [ResumeVersion(base_resume_id=resume.id, job_id=job_id, content=resume.content)
+                    for job_id in applied_to]
+        db.add_all(versions)
+        db.flush()
+        applications = []
+        for version in versions:
+            status = random.choices(statuses, weights)[0]
+            created = now - timedelta(days=random.randint(1, 60))
+            applications.append({
+                "user_id": user.id,
+                "job_id": version.job_id,
+                "resume_version_id": version.id,
+                "status": status,
+                "rejection_reason": random.choice(REASONS) if status == "rejected" else None,
+                "created_at": created,
+                "last_status_update": created + timedelta(hours=random.randint(1, 200)) if status != "applied" else None,
+            })
+        db.bulk_insert_mappings(JobApplication, applications)
+
+    user_ids = [user.id for user in people]
+    for user_id in user_ids:
+        rebuild_user_stats(db, user_id)
+    db.commit()
+    return user_ids
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--jobs", type=int, default=500)
+    parser.add_argument("--applications", type=int, default=20, help="per user")
+    args = parser.parse_args()
+
+    from backend.app.db.database import SessionLocal
+    from backend.app.db.migrate import upgrade_database
+
+    upgrade_database()
+    session = SessionLocal()
+    try:
+        start = time.perf_counter()
+        ids = seed(session, args.users, args.jobs, args.applications)
+        print(f"✅ Seeded {len(ids)} users, {args.jobs} jobs, {len(ids) * args.applications} applications "
+              f"in {time.perf_counter() - start:.1f}s")
+    finally:
+        session.close()
@@ -1,25 +1,51 @@
 import os
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
+import json
 from datetime import datetime, timedelta
 import pickle
-from typing import List, Dict
+import threading
+from typing import List, Dict, Optional, Iterable, Tuple
+from backend.app.services.email_status import classify_subject, reconcile_statuses
+
+# Messages per batched metadata request; Gmail caps a batch at 100 calls
+BATCH_SIZE = int(os.getenv("GMAIL_BATCH_SIZE", "50"))
+METADATA_HEADERS = ['Subject', 'Date', 'From']
+
+# Serializes read-modify-write of the checkpoint file between scanner threads
+_state_lock = threading.Lock()
 
 class EmailScanner:
-    def __init__(self):
+    def __init__(self, state_path: str = 'gmail_sync_state.json', discovery_url: Optional[str] = None,
+                 http=None, batch_size: int = BATCH_SIZE):
         self.SCOPES = ['https://www.googleapis.com/auth/gmail.readonly']
         self.creds = None
         self.service = None
         
+        # Where each account's last synced historyId, and the ids of messages
+        # that could not be fetched (retried by the next scan), are checkpointed
+        self.state_path = state_path
+        # Point at a local discovery server (with an unauthenticated ``http``) for testing
+        self.discovery_url = discovery_url
+        self.http = http
+        self.batch_size = min(batch_size, 100)
+        
     def authenticate(self):
         """Authenticate with Gmail API"""
+        # The Google client libraries take a while to import; only pay for them when scanning
+        from googleapiclient.discovery import build
+
+        if self.discovery_url:
+            self.service = build('gmail', 'v1', http=self.http, discoveryServiceUrl=self.discovery_url,
+                                 static_discovery=False, cache_discovery=False)
+            return
+
         if os.path.exists('token.pickle'):
             with open('token.pickle', 'rb') as token:
                 self.creds = pickle.load(token)
                 
         if not self.creds or not self.creds.valid:
+            from google_auth_oauthlib.flow import InstalledAppFlow
+            from google.auth.transport.requests import Request
+
             if self.creds and self.creds.expired and self.creds.refresh_token:
                 self.creds.refresh(Request())
             else:
@@ -32,55 +58,186 @@ class EmailScanner:
                 
         self.service = build('gmail', 'v1', credentials=self.creds)
         
-    def scan_emails(self) -> List[Dict]:
-        """Scan emails for job application statuses"""
-        if not self.service:
-            self.authenticate()
-            
-        try:
-            # Get emails from the last 30 days
-            query = f'after:{(datetime.now() - timedelta(days=30)).strftime("%Y/%m/%d")}'
+    def _load_states(self) -> Dict[str, Dict]:
+        """Checkpoints of every account, keyed by account"""
+        if not os.path.exists(self.state_path):
+            return {}
+        with open(self.state_path) as f:
+            return json.load(f)
+
+    def save_state(self, account: str, state: Dict):
+        """
+        Checkpoint ``state`` (as returned by scan_emails) for ``account``.
+        Call it only once the scanned emails have been stored, so a failure
+        in between scans the same messages again.
+        """
+        with _state_lock:
+            states = self._load_states()
+            states[account] = dict(state, synced_at=datetime.now().isoformat())
+            tmp_path = f"{self.state_path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(states, f)
+            os.replace(tmp_path, self.state_path)
+
+    def _list_all_message_ids(self, query: str) -> List[str]:
+        """Page through messages().list until nextPageToken runs out"""
+        ids = []
+        page_token = None
+        while True:
             results = self.service.users().messages().list(
                 userId='me',
-                q=query
+                q=query,
+                pageToken=page_token,
+                maxResults=500
             ).execute()
-            
-            messages = results.get('messages', [])
+            ids.extend(m['id'] for m in results.get('messages', []))
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                return ids
+
+    def _list_new_message_ids(self, start_history_id: str) -> Tuple[List[str], str]:
+        """Message ids added since ``start_history_id`` and the latest historyId"""
+        ids = []
+        page_token = None
+        latest = start_history_id
+        while True:
+            results = self.service.users().history().list(
+                userId='me',
+                startHistoryId=start_history_id,
+                historyTypes=['messageAdded'],
+                pageToken=page_token,
+                maxResults=500
+            ).execute()
+            for record in results.get('history', []):
+                ids.extend(added['message']['id'] for added in record.get('messagesAdded', []))
+            latest = results.get('historyId', latest)
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                # A message can show up in several history records
+                return list(dict.fromkeys(ids)), latest
+
+    def _fetch_headers(self, message_ids: Iterable[str]) -> Tuple[List[Dict], List[str]]:
+        """
+        Fetch Subject/Date/From for every message in batched metadata
+        requests. Returns the messages and the ids that still failed after a
+        retry; messages deleted in the meantime (404) are neither.
+        """
+        messages = []
+        pending = list(message_ids)
+        retried = False
+
+        while pending:
+            failed = []
+
+            def on_response(request_id, response, exception):
+                if exception is not None:
+                    if getattr(getattr(exception, 'resp', None), 'status', None) != 404:
+                        failed.append(request_id)
+                    return
+                headers = response.get('payload', {}).get('headers', [])
+                messages.append({
+                    'id': response['id'],
+                    'headers': {h['name']: h['value'] for h in headers},
+                })
+
+            for start in range(0, len(pending), self.batch_size):
+                batch = self.service.new_batch_http_request(callback=on_response)
+                for message_id in pending[start:start + self.batch_size]:
+                    batch.add(self.service.users().messages().get(
+                        userId='me',
+                        id=message_id,
+                        format='metadata',
+                        metadataHeaders=METADATA_HEADERS
+                    ), request_id=message_id)
+                batch.execute()
+
+            # Give rate-limited or transiently failed calls one more round
+            if failed and not retried:
+                pending, retried = failed, True
+            else:
+                if failed:
+                    print(f"Could not fetch {len(failed)} messages, retrying them next scan")
+                return messages, failed
+        return messages, []
+
+    def scan_emails(self, incremental: bool = True, account: str = 'me') -> Tuple[List[Dict], Dict]:
+        """
+        Scan emails for job application statuses.
+
+        With ``incremental`` and a checkpoint stored for ``account`` only
+        messages added since the last scan are fetched (Gmail history API);
+        otherwise the last 30 days are listed in full. Either way every
+        result page is followed and headers are fetched in batches.
+
+        Returns the status emails and the account's new state: the latest
+        historyId and the ids of messages that failed to fetch, which the
+        next scan fetches again whatever the mode. Pass the state to
+        save_state once the emails are stored.
+        """
+        from googleapiclient.errors import HttpError
+
+        if not self.service:
+            self.authenticate()
+
+        try:
+            state = self._load_states().get(account, {})
+            start_history_id = state.get('history_id') if incremental else None
+            message_ids = None
+            latest_history_id = None
+
+            if start_history_id:
+                try:
+                    message_ids, latest_history_id = self._list_new_message_ids(start_history_id)
+                except HttpError as e:
+                    # 404 means the checkpoint is older than Gmail keeps history
+                    if e.resp.status != 404:
+                        raise
+                    print("Gmail history checkpoint expired, running a full sync")
+
+            if message_ids is None:
+                # Read historyId first so nothing arriving during the listing is missed next time
+                latest_history_id = self.service.users().getProfile(userId='me').execute()['historyId']
+                query = f'after:{(datetime.now() - timedelta(days=30)).strftime("%Y/%m/%d")}'
+                message_ids = self._list_all_message_ids(query)
+
+            # Messages a previous scan could not fetch are not in this scan's history
+            messages, failed = self._fetch_headers(dict.fromkeys(state.get('pending_ids', []) + message_ids))
             email_logs = []
-            
             for message in messages:
-                msg = self.service.users().messages().get(
-                    userId='me',
-                    id=message['id']
-                ).execute()
-                
-                headers = msg['payload']['headers']
-                subject = next((h['value'] for h in headers if h['name'] == 'Subject'), '')
-                date = next((h['value'] for h in headers if h['name'] == 'Date'), '')
-                
+                headers = message['headers']
+                subject = headers.get('Subject', '')
+
                 # Simple status detection based on subject
                 status = self._detect_status(subject)
-                
+
                 if status:
                     email_logs.append({
+                        'id': message['id'],
                         'subject': subject,
-                        'date': date,
+                        'from': headers.get('From', ''),
+                        'date': headers.get('Date', ''),
                         'status': status
                     })
-                    
-            return email_logs
-            
+
+            return email_logs, {'history_id': str(latest_history_id), 'pending_ids': failed}
+
         except Exception as e:
             raise Exception(f"Error scanning emails: {str(e)}")
+
+    def sync_application_statuses(self, db, user_id: int, incremental: bool = True) -> int:
+        """
+        Scan for new status emails and apply them to the user's job
+        applications in one bulk update. The sync checkpoint, kept per user,
+        only moves forward once the update is committed. Returns the number
+        of applications whose status changed.
+        """
+        account = f"user-{user_id}"
+        email_logs, state = self.scan_emails(incremental=incremental, account=account)
+        updated = reconcile_statuses(db, user_id, email_logs)
+        db.commit()
+        self.save_state(account, state)
+        return updated
             
     def _detect_status(self, subject: str) -> str:
         """Detect application status from email subject"""
-        subject = subject.lower()
-        
-        if any(word in subject for word in ['rejection', 'unfortunately', 'not moving forward']):
-            return 'rejected'
-        elif any(word in subject for word in ['application received', 'thank you for applying']):
-            return 'received'
-        elif any(word in subject for word in ['interview', 'next steps']):
-            return 'interview'
-        return None 
\ No newline at end of file
+        return classify_subject(subject)
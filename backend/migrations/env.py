@@ -0,0 +1,60 @@
+"""
+Alembic environment. The database comes from DATABASE_URL via the app's
+engine (so engine profiles apply); the target metadata is the app's models.
+
+    alembic -c backend/alembic.ini upgrade head
+    python -m backend.app.db.migrate          # same, and adopts create_all databases
+"""
+from logging.config import fileConfig
+import os
+import sys
+
+from alembic import context
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.app.db.database import Base, DATABASE_URL, engine  # noqa: E402
+from backend.app.users import models  # noqa: E402,F401
+
+config = context.config
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline():
+    context.configure(
+        url=DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=DATABASE_URL.startswith("sqlite"),
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    def run(connection):
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            # SQLite can only change columns by recreating the table
+            render_as_batch=connection.dialect.name == "sqlite",
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        run(connection)
+        return
+    with engine.connect() as connection:
+        run(connection)
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
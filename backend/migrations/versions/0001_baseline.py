@@ -0,0 +1,102 @@
+"""Baseline: the original schema, as Base.metadata.create_all first built it
+
+Databases created by create_all before migrations existed are stamped at
+this revision by ``python -m backend.app.db.migrate`` instead of running it;
+0001a-0001e then add what later models added, skipping whatever such a
+database already has.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("full_name", sa.String(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("phone", sa.String()),
+        sa.Column("location_preference", sa.String(), nullable=False),
+        sa.Column("years_experience", sa.Integer(), nullable=False),
+        sa.Column("skills", sa.JSON(), nullable=False),
+        sa.Column("desired_roles", sa.JSON(), nullable=False),
+        sa.Column("linkedin_url", sa.String()),
+        sa.Column("salary_expectation", sa.Integer(), nullable=True),
+        sa.Column("preferred_industries", sa.JSON(), nullable=True),
+        sa.Column("work_arrangements", sa.JSON(), nullable=True),
+        sa.Column("visa_sponsorship", sa.Boolean()),
+        sa.Column("relocation_willingness", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "base_resumes",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("file_path", sa.String(), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_base_resumes_id", "base_resumes", ["id"])
+
+    op.create_table(
+        "jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("company", sa.String(), nullable=False),
+        sa.Column("description", sa.Text(), nullable=False),
+        sa.Column("location", sa.String(), nullable=False),
+        sa.Column("source", sa.String(), nullable=False),
+        sa.Column("url", sa.String(), nullable=False),
+        sa.Column("salary_range", sa.String(), nullable=True),
+        sa.Column("work_arrangement",
+                  sa.Enum("FULL_TIME", "PART_TIME", "CONTRACT", "FREELANCE", name="workarrangement"),
+                  nullable=True),
+        sa.Column("industry", sa.String(), nullable=True),
+        sa.Column("visa_sponsorship", sa.Boolean()),
+        sa.Column("relocation_assistance", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_jobs_id", "jobs", ["id"])
+
+    op.create_table(
+        "resume_versions",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("base_resume_id", sa.Integer(), sa.ForeignKey("base_resumes.id"), nullable=False),
+        sa.Column("job_id", sa.Integer(), sa.ForeignKey("jobs.id"), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_resume_versions_id", "resume_versions", ["id"])
+
+    op.create_table(
+        "job_applications",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("job_id", sa.Integer(), sa.ForeignKey("jobs.id"), nullable=False),
+        sa.Column("resume_version_id", sa.Integer(), sa.ForeignKey("resume_versions.id"), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("rejection_reason", sa.String()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_job_applications_id", "job_applications", ["id"])
+
+
+def downgrade():
+    for table in ("job_applications", "resume_versions", "jobs", "base_resumes", "users"):
+        op.drop_table(table)
+    sa.Enum(name="workarrangement").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,98 @@
+"""Jobs keyed on (source, normalized url)
+
+Adds jobs.normalized_url and jobs.posted_date (bulk ingest). Existing rows
+get their normalized URL and a lower-cased source, the same values ingest
+computes. Jobs that turn out to be the same posting are merged into the
+oldest one, with their resume versions and applications moved to it, so
+the (source, normalized_url) unique constraint can be added.
+
+Revision ID: 0001a
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from collections import defaultdict
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001a"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# Tables holding a jobs.id; "job_terms" only exists on create_all databases
+JOB_REFERENCES = ("resume_versions", "job_applications", "job_terms")
+
+# Frozen copy of the ingest key (utils.text) as of this revision
+TRACKING_PARAMS = {"ref", "refid", "trk", "trackingid", "src", "source", "gclid", "fbclid"}
+
+
+def _normalize_url(url):
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = parts.path.rstrip("/") or "/"
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith("utm_")
+    )
+    return urlunsplit(((parts.scheme or "https").lower(), host, path, urlencode(query), ""))
+
+
+def _normalize_source(source):
+    return (source or "unknown").strip().lower()
+
+
+def _merge_duplicates(bind):
+    jobs = sa.table("jobs", sa.column("id"), sa.column("source"), sa.column("url"), sa.column("normalized_url"))
+    groups = defaultdict(list)
+    for job_id, source, url in bind.execute(sa.select(jobs.c.id, jobs.c.source, jobs.c.url).order_by(jobs.c.id)):
+        key = (_normalize_source(source), _normalize_url(url))
+        groups[key].append(job_id)
+        bind.execute(jobs.update().where(jobs.c.id == job_id)
+                     .values(source=key[0], normalized_url=key[1]))
+
+    tables = set(sa.inspect(bind).get_table_names())
+    for ids in groups.values():
+        keep, duplicates = ids[0], ids[1:]
+        if not duplicates:
+            continue
+        for table_name in JOB_REFERENCES:
+            if table_name not in tables:
+                continue
+            table = sa.table(table_name, sa.column("job_id"))
+            if table_name == "job_terms":
+                # Same description terms as the kept job, or close enough; not worth merging
+                bind.execute(table.delete().where(table.c.job_id.in_(duplicates)))
+            else:
+                bind.execute(table.update().where(table.c.job_id.in_(duplicates)).values(job_id=keep))
+        bind.execute(jobs.delete().where(jobs.c.id.in_(duplicates)))
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    columns = {column["name"] for column in inspector.get_columns("jobs")}
+    if "posted_date" not in columns:
+        op.add_column("jobs", sa.Column("posted_date", sa.DateTime(timezone=True), nullable=True))
+    unique = {index["name"] for index in inspector.get_indexes("jobs")}
+    unique |= {constraint["name"] for constraint in inspector.get_unique_constraints("jobs")}
+    if "uq_jobs_source_normalized_url" in unique:
+        return
+
+    if "normalized_url" not in columns:
+        op.add_column("jobs", sa.Column("normalized_url", sa.String(), nullable=True))
+    _merge_duplicates(op.get_bind())
+    with op.batch_alter_table("jobs") as batch:
+        batch.alter_column("normalized_url", existing_type=sa.String(), nullable=False)
+        batch.create_unique_constraint("uq_jobs_source_normalized_url", ["source", "normalized_url"])
+
+
+def downgrade():
+    # Merged jobs stay merged
+    with op.batch_alter_table("jobs") as batch:
+        batch.drop_constraint("uq_jobs_source_normalized_url", type_="unique")
+        batch.drop_column("normalized_url")
+        batch.drop_column("posted_date")
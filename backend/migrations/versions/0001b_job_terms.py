@@ -0,0 +1,62 @@
+"""Stored job description terms and application status times
+
+Adds job_terms (each job's distinct description tokens, for skill matching
+in SQL) filled from the existing jobs, and job_applications.last_status_update.
+
+Revision ID: 0001b
+Revises: 0001a
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001b"
+down_revision = "0001a"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def _tokenize(text):
+    # Frozen copy of utils.text.tokenize as of this revision
+    return set((text or "").lower().split())
+
+
+def _fill_terms(bind):
+    jobs = sa.table("jobs", sa.column("id"), sa.column("description"))
+    job_terms = sa.table("job_terms", sa.column("job_id"), sa.column("term"))
+    last_id = 0
+    while True:
+        batch = bind.execute(sa.select(jobs.c.id, jobs.c.description).where(jobs.c.id > last_id)
+                             .order_by(jobs.c.id).limit(BATCH_SIZE)).all()
+        if not batch:
+            return
+        rows = [{"job_id": job_id, "term": term} for job_id, description in batch
+                for term in _tokenize(description)]
+        if rows:
+            bind.execute(job_terms.insert(), rows)
+        last_id = batch[-1][0]
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if "last_status_update" not in {column["name"] for column in inspector.get_columns("job_applications")}:
+        op.add_column("job_applications",
+                      sa.Column("last_status_update", sa.DateTime(timezone=True), nullable=True))
+    if inspector.has_table("job_terms"):
+        return
+    op.create_table(
+        "job_terms",
+        sa.Column("job_id", sa.Integer(), sa.ForeignKey("jobs.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("term", sa.String(), primary_key=True),
+    )
+    op.create_index("ix_job_terms_term", "job_terms", ["term"])
+    _fill_terms(op.get_bind())
+
+
+def downgrade():
+    op.drop_table("job_terms")
+    with op.batch_alter_table("job_applications") as batch:
+        batch.drop_column("last_status_update")
@@ -0,0 +1,44 @@
+"""Per-user statistics table
+
+Adds user_stats, the counters services/stats.py keeps up to date as
+applications are written. Rows of existing users start out with NULL
+skill and role matches, which makes their first stats read rebuild them
+from the user's applications.
+
+Revision ID: 0001c
+Revises: 0001b
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001c"
+down_revision = "0001b"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if sa.inspect(op.get_bind()).has_table("user_stats"):
+        return
+    op.create_table(
+        "user_stats",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("total_applications", sa.Integer(), nullable=False),
+        sa.Column("applied", sa.Integer(), nullable=False),
+        sa.Column("seen", sa.Integer(), nullable=False),
+        sa.Column("rejected", sa.Integer(), nullable=False),
+        sa.Column("ghosted", sa.Integer(), nullable=False),
+        sa.Column("interview", sa.Integer(), nullable=False),
+        sa.Column("resume_versions", sa.Integer(), nullable=False),
+        sa.Column("response_hours_total", sa.Float(), nullable=False),
+        sa.Column("response_count", sa.Integer(), nullable=False),
+        sa.Column("rejection_reasons", sa.JSON(), nullable=False),
+        sa.Column("skill_matches", sa.JSON(), nullable=True),
+        sa.Column("role_matches", sa.JSON(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+
+def downgrade():
+    op.drop_table("user_stats")
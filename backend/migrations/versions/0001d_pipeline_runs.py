@@ -0,0 +1,43 @@
+"""Pipeline run queue
+
+Adds pipeline_runs, the table /search-jobs queues runs in and
+services/run_queue.py drains.
+
+Revision ID: 0001d
+Revises: 0001c
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001d"
+down_revision = "0001c"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if sa.inspect(op.get_bind()).has_table("pipeline_runs"):
+        return
+    op.create_table(
+        "pipeline_runs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("progress", sa.JSON(), nullable=True),
+        sa.Column("result", sa.JSON(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("worker_id", sa.String(), nullable=True),
+        sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_pipeline_runs_id", "pipeline_runs", ["id"])
+    op.create_index("ix_pipeline_runs_user_id", "pipeline_runs", ["user_id"])
+    op.create_index("ix_pipeline_runs_status", "pipeline_runs", ["status"])
+
+
+def downgrade():
+    op.drop_table("pipeline_runs")
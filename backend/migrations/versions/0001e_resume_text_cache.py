@@ -0,0 +1,38 @@
+"""Resume content hashes and the extracted-text cache
+
+Adds base_resumes.content_hash (sha256 of the uploaded file, NULL for
+resumes uploaded before it) and resume_texts, extracted text keyed by that
+hash.
+
+Revision ID: 0001e
+Revises: 0001d
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001e"
+down_revision = "0001d"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if "content_hash" not in {column["name"] for column in inspector.get_columns("base_resumes")}:
+        op.add_column("base_resumes", sa.Column("content_hash", sa.String(64), nullable=True))
+        op.create_index("ix_base_resumes_content_hash", "base_resumes", ["content_hash"])
+    if not inspector.has_table("resume_texts"):
+        op.create_table(
+            "resume_texts",
+            sa.Column("content_hash", sa.String(64), primary_key=True),
+            sa.Column("text", sa.Text(), nullable=False),
+            sa.Column("extracted_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+
+
+def downgrade():
+    op.drop_table("resume_texts")
+    op.drop_index("ix_base_resumes_content_hash", table_name="base_resumes")
+    with op.batch_alter_table("base_resumes") as batch:
+        batch.drop_column("content_hash")
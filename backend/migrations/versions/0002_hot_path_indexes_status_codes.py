@@ -0,0 +1,72 @@
+"""Hot-path indexes and SMALLINT application status codes
+
+Adds indexes for the queries the app actually runs: applications by user
+and status (stats, email reconciliation), applications by job, resume
+versions by base resume, base resumes by user and jobs by normalized URL
+(ingest dedup). job_applications.status becomes a SMALLINT code; see
+APPLICATION_STATUS_CODES in app/users/models.py.
+
+Revision ID: 0002
+Revises: 0001e
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001e"
+branch_labels = None
+depends_on = None
+
+# Frozen copy of APPLICATION_STATUS_CODES as of this revision
+STATUS_CODES = {"applied": 1, "seen": 2, "rejected": 3, "interview": 4, "ghosted": 5}
+
+INDEXES = [
+    ("ix_job_applications_job_id", "job_applications", ["job_id"]),
+    ("ix_resume_versions_base_resume_id", "resume_versions", ["base_resume_id"]),
+    ("ix_base_resumes_user_id", "base_resumes", ["user_id"]),
+    ("ix_jobs_normalized_url", "jobs", ["normalized_url"]),
+]
+
+
+def _case(column: str, mapping: dict) -> str:
+    # Keys and values are plain identifiers or ints, so repr() is valid SQL
+    whens = " ".join(f"WHEN {key!r} THEN {value!r}" for key, value in mapping.items())
+    return f"CASE {column} {whens} END"
+
+
+def upgrade():
+    bind = op.get_bind()
+    unknown = bind.execute(
+        sa.text("SELECT DISTINCT status FROM job_applications WHERE status NOT IN :known")
+        .bindparams(sa.bindparam("known", list(STATUS_CODES), expanding=True))
+    ).scalars().all()
+    if unknown:
+        raise RuntimeError(f"job_applications has statuses with no code: {unknown}; map them first")
+
+    with op.batch_alter_table("job_applications") as batch:
+        batch.add_column(sa.Column("status_code", sa.SmallInteger(), nullable=True))
+    op.execute(f"UPDATE job_applications SET status_code = {_case('status', STATUS_CODES)}")
+    with op.batch_alter_table("job_applications") as batch:
+        batch.drop_column("status")
+        batch.alter_column("status_code", new_column_name="status", existing_type=sa.SmallInteger(),
+                           nullable=False)
+
+    op.create_index("ix_job_applications_user_status", "job_applications", ["user_id", "status"])
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
+    op.drop_index("ix_job_applications_user_status", table_name="job_applications")
+
+    with op.batch_alter_table("job_applications") as batch:
+        batch.add_column(sa.Column("status_name", sa.String(), nullable=True))
+    op.execute(f"UPDATE job_applications SET status_name = "
+               f"{_case('status', {code: name for name, code in STATUS_CODES.items()})}")
+    with op.batch_alter_table("job_applications") as batch:
+        batch.drop_column("status")
+        batch.alter_column("status_name", new_column_name="status", existing_type=sa.String(),
+                           nullable=False)
@@ -0,0 +1,31 @@
+"""Keyset listing indexes
+
+Adds (user_id, created_at, id) on job_applications and replaces the
+single-column resume_versions.base_resume_id index with
+(base_resume_id, created_at, id), so the cursor-paginated listings and the
+applications export read an index range in order instead of sorting.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_job_applications_user_created", "job_applications", ["user_id", "created_at", "id"])
+    op.create_index("ix_resume_versions_base_resume_created", "resume_versions",
+                    ["base_resume_id", "created_at", "id"])
+    # Covered by the leading column of the composite index
+    op.drop_index("ix_resume_versions_base_resume_id", table_name="resume_versions")
+
+
+def downgrade():
+    op.create_index("ix_resume_versions_base_resume_id", "resume_versions", ["base_resume_id"])
+    op.drop_index("ix_resume_versions_base_resume_created", table_name="resume_versions")
+    op.drop_index("ix_job_applications_user_created", table_name="job_applications")
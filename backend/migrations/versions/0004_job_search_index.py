@@ -0,0 +1,69 @@
+"""Full-text search index over jobs
+
+SQLite: an external-content FTS5 table ``jobs_fts`` over title, company,
+description and location, kept in sync with ``jobs`` by triggers and filled
+from the existing rows. Postgres: a stored generated ``search_vector``
+tsvector column (title weighted A, company and location B, description C)
+with a GIN index. Queried by app/services/job_index.py.
+
+A batch_alter_table on ``jobs`` recreates the table on SQLite and drops the
+triggers; a later migration doing that must recreate them.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+FTS_COLUMNS = "title, company, description, location"
+
+SQLITE_UPGRADE = [
+    f"""CREATE VIRTUAL TABLE jobs_fts USING fts5(
+        {FTS_COLUMNS}, content='jobs', content_rowid='id', tokenize='porter unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER jobs_fts_insert AFTER INSERT ON jobs BEGIN
+        INSERT INTO jobs_fts(rowid, {FTS_COLUMNS})
+        VALUES (new.id, new.title, new.company, new.description, new.location);
+    END""",
+    f"""CREATE TRIGGER jobs_fts_delete AFTER DELETE ON jobs BEGIN
+        INSERT INTO jobs_fts(jobs_fts, rowid, {FTS_COLUMNS})
+        VALUES ('delete', old.id, old.title, old.company, old.description, old.location);
+    END""",
+    f"""CREATE TRIGGER jobs_fts_update AFTER UPDATE OF {FTS_COLUMNS} ON jobs BEGIN
+        INSERT INTO jobs_fts(jobs_fts, rowid, {FTS_COLUMNS})
+        VALUES ('delete', old.id, old.title, old.company, old.description, old.location);
+        INSERT INTO jobs_fts(rowid, {FTS_COLUMNS})
+        VALUES (new.id, new.title, new.company, new.description, new.location);
+    END""",
+    "INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild')",
+]
+
+POSTGRES_VECTOR = """
+    setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('english'::regconfig, coalesce(company, '') || ' ' || coalesce(location, '')), 'B') ||
+    setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'C')
+"""
+
+
+def upgrade():
+    if op.get_bind().dialect.name == "sqlite":
+        for statement in SQLITE_UPGRADE:
+            op.execute(statement)
+        return
+    op.execute(f"ALTER TABLE jobs ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ({POSTGRES_VECTOR}) STORED")
+    op.create_index("ix_jobs_search_vector", "jobs", ["search_vector"], postgresql_using="gin")
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "sqlite":
+        for trigger in ("jobs_fts_update", "jobs_fts_delete", "jobs_fts_insert"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS jobs_fts")
+        return
+    op.drop_index("ix_jobs_search_vector", table_name="jobs")
+    op.execute("ALTER TABLE jobs DROP COLUMN search_vector")
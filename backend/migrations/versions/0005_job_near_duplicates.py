@@ -0,0 +1,45 @@
+"""Near-duplicate job clusters
+
+Adds jobs.cluster_id, the id of the canonical posting of a role seen on
+several boards, plus job_fingerprints (MinHash signatures) and
+job_lsh_buckets (their LSH bands), written by app/services/job_dedup.py.
+Existing jobs are fingerprinted with
+``python -m backend.app.services.job_dedup backfill``.
+
+cluster_id is added with a plain ALTER TABLE rather than batch mode so
+SQLite keeps the jobs table, and with it the jobs_fts triggers from 0004.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("jobs", sa.Column("cluster_id", sa.Integer(), nullable=True))
+    op.create_index("ix_jobs_cluster_id", "jobs", ["cluster_id"])
+    op.create_table(
+        "job_fingerprints",
+        sa.Column("job_id", sa.Integer(), sa.ForeignKey("jobs.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("signature", sa.LargeBinary(), nullable=False),
+    )
+    op.create_table(
+        "job_lsh_buckets",
+        sa.Column("bucket", sa.BigInteger(), primary_key=True),
+        sa.Column("job_id", sa.Integer(), sa.ForeignKey("jobs.id", ondelete="CASCADE"), primary_key=True),
+    )
+
+
+def downgrade():
+    op.drop_table("job_lsh_buckets")
+    op.drop_table("job_fingerprints")
+    op.drop_index("ix_jobs_cluster_id", table_name="jobs")
+    # Native DROP COLUMN (SQLite 3.35+), again to keep the jobs_fts triggers
+    op.drop_column("jobs", "cluster_id")
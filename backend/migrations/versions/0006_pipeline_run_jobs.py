@@ -0,0 +1,25 @@
+"""Postings handed to a pipeline run
+
+Adds pipeline_runs.job_ids: the jobs the scheduler's shared board search
+found for the run's user (app/services/scheduler.py). NULL for runs queued
+by /search-jobs, which search for themselves.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("pipeline_runs", sa.Column("job_ids", sa.JSON(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("pipeline_runs", "job_ids")
@@ -1,34 +1,96 @@
-import os
-from openai import OpenAI
 from dotenv import load_dotenv
+from backend.app.resume_cache import ResumeCache, cache_key, get_resume_cache
+from backend.app.prompt_builder import build_prompt_inputs, restore_omitted, OMITTED_NOTE, trim_job_description, RESUME_TOKEN_BUDGET, JOB_TOKEN_BUDGET
+# One OpenAI client per process, built with retries off: the LLM executor owns retries and rate limits
+from backend.app.resume_agent import DELTA_MODE, DELTA_PROMPT, CUSTOMIZE_SECONDS, get_openai_client
+from backend.app.telemetry import timed
+from backend.app.resume_delta import DeltaError, labelled_resume, parse_edits, apply_edits, record
 
 load_dotenv()
 
+MODEL = "gpt-4"
+# Bump whenever the prompt below changes so cached results are not reused
+PROMPT_VERSION = f"writer-3:{'delta' if DELTA_MODE else 'full'}:{RESUME_TOKEN_BUDGET}:{JOB_TOKEN_BUDGET}"
+
 class ResumeAgent:
-    def __init__(self):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    def __init__(self, cache: ResumeCache = None, client=None):
+        self.client = client or get_openai_client()
+        self.cache = cache or get_resume_cache()
+        # Token counts of the last prompt built, before and after trimming
+        self.last_prompt_stats = None
         
     def customize_resume(self, resume_content: str, job_description: str) -> str:
         """
-        Customizes a resume based on the job description using GPT-4
+        Customizes a resume based on the job description using GPT-4.
+        Identical (resume, job description, model, prompt) requests are
+        served from the shared resume cache. In delta mode the model only
+        returns edits to the sections it changes; invalid edits fall back
+        to a full rewrite.
         """
+        with timed(CUSTOMIZE_SECONDS, outcome="error") as labels:
+            key = cache_key(resume_content, job_description, MODEL, PROMPT_VERSION)
+            cached = self.cache.get(key)
+            if cached is not None:
+                labels["outcome"] = "cache"
+                return cached
+
+            content = None
+            if DELTA_MODE:
+                content = self._customize_by_delta(resume_content, job_description)
+                labels["outcome"] = "delta"
+            if content is None:
+                content = self._regenerate(resume_content, job_description)
+                labels["outcome"] = "full"
+            self.cache.set(key, content)
+            return content
+
+    def _customize_by_delta(self, resume_content: str, job_description: str):
+        job_text = trim_job_description(job_description, model=MODEL)
+        resume_blocks, blocks = labelled_resume(resume_content, job_text, model=MODEL)
+        try:
+            response = self.client.chat.completions.create(
+                model=MODEL,
+                messages=[
+                    {"role": "system", "content": "You are an expert resume writer."},
+                    {"role": "user", "content": DELTA_PROMPT.format(job_text=job_text, resume_blocks=resume_blocks)}
+                ],
+                temperature=0.7
+            )
+        except Exception as e:
+            raise Exception(f"Error customizing resume: {str(e)}")
+
+        try:
+            edits = parse_edits(response.choices[0].message.content, blocks)
+            content = apply_edits(resume_content, edits)
+        except DeltaError as e:
+            print(f"⚠️ Resume delta rejected, regenerating in full: {e}")
+            record("delta_fallbacks")
+            return None
+        record("delta_applied", len(edits))
+        return content
+
+    def _regenerate(self, resume_content: str, job_description: str) -> str:
+        resume_excerpt, job_text, self.last_prompt_stats, omitted = build_prompt_inputs(
+            resume_content, job_description, model=MODEL
+        )
         prompt = f"""
         You are an expert resume writer. Customize the following resume to match the job description.
         Focus on highlighting relevant skills and experiences that match the job requirements.
         Keep the same format and structure, but modify the content to be more relevant.
         
         Job Description:
-        {job_description}
+        {job_text}
         
         Original Resume:
-        {resume_content}
+        {resume_excerpt}
         
         Return the customized resume in the same format as the original.
+        {OMITTED_NOTE if omitted else ""}
         """
         
         try:
             response = self.client.chat.completions.create(
-                model="gpt-4",
+                model=MODEL,
                 messages=[
                     {"role": "system", "content": "You are an expert resume writer."},
                     {"role": "user", "content": prompt}
@@ -36,6 +98,6 @@ class ResumeAgent:
                 temperature=0.7
             )
             
-            return response.choices[0].message.content
+            return restore_omitted(response.choices[0].message.content, omitted)
         except Exception as e:
-            raise Exception(f"Error customizing resume: {str(e)}") 
\ No newline at end of file
+            raise Exception(f"Error customizing resume: {str(e)}")